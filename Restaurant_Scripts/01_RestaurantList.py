@@ -9,10 +9,24 @@ CSV file named ``<CityName>_RestaurantList.csv`` inside a
 Usage
 -----
 $ python restaurant_scraper.py <eater_article_url>
+$ python restaurant_scraper.py --batch eater_urls.txt [--workers 8]
 
 Example
 -------
 $ python restaurant_scraper.py https://boston.eater.com/maps/best-restaurants-boston-38
+
+Downloads go through the shared on-disk HTTP cache (see ``http_cache.py``);
+pass ``--offline`` to run from the cache only or ``--no-cache`` to bypass it.
+Fetch and parse timings are appended to ``data/crawl_events.jsonl`` (see
+``crawl_metrics.py``).
+
+Batch mode
+----------
+``--batch`` reads one Eater URL per line (blank lines and ``#`` comments are
+ignored). Articles are downloaded concurrently and parsed in a process pool.
+Lists for the same city are merged with duplicates removed by Eater slug,
+each city is written to its own ``<City>_RestaurantList.csv``, and every city
+together goes to ``data/All_Cities_Restaurants.csv``.
 """
 
 import argparse
@@ -20,11 +34,16 @@ import csv
 import os
 import re
 import ssl
-from typing import Dict, List
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional
 from urllib.parse import urlparse
 
-import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+
+import crawl_metrics
+import http_cache
+import transport
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -60,17 +79,73 @@ def extract_city_name(url: str) -> str:
     return "UnknownCity"
 
 
-def fetch_html(url: str) -> str:
-    """Download *url* and return the HTML as text."""
-    resp = requests.get(url, headers=HEADERS, timeout=30, verify=False)
+def _requests_fetch(url: str, extra_headers: Dict[str, str]):
+    """Fetcher for :mod:`http_cache`: returns ``(status, headers, body)``."""
+    transport.take_connect_time()
+    start = time.perf_counter()
+    try:
+        resp = transport.session.get(url, headers={**HEADERS, **extra_headers}, timeout=30)
+    except Exception:
+        crawl_metrics.log.fetch(url, "error", time.perf_counter() - start, transport.take_connect_time())
+        raise
+    connect = transport.take_connect_time()
+    outcome = "revalidated" if resp.status_code == 304 else "error" if resp.status_code >= 400 else "ok"
+    crawl_metrics.log.fetch(url, outcome, time.perf_counter() - start, connect,
+                            max(0.0, resp.elapsed.total_seconds() - connect), len(resp.content),
+                            resp.status_code)
+    if resp.status_code == 304:
+        return 304, dict(resp.headers), b""
     resp.raise_for_status()
-    return resp.text
+    return resp.status_code, dict(resp.headers), resp.content
+
+
+def fetch_html(url: str) -> str:
+    """Download *url* (or answer it from the HTTP cache) and return the HTML as text."""
+    started, start = time.time(), time.perf_counter()
+    resp = http_cache.cache.fetch(url, _requests_fetch)
+    if resp.stored_at < started:
+        crawl_metrics.log.fetch(url, "cache", time.perf_counter() - start, n_bytes=len(resp.body),
+                                status=resp.status)
+    return resp.text()
+
+
+FIELDNAMES = ["name", "description", "address", "phone", "website", "image"]
+
+
+# Only the <section|div class="c-mapstack__card"> subtrees are ever used; the
+# strainer keeps the rest of the article out of the tree entirely.
+CARD_STRAINER = SoupStrainer(["section", "div"], class_="c-mapstack__card")
+
+VISIT_WEBSITE_RE = re.compile(r"visit website", re.I)
+TEL_RE = re.compile(r"^tel:")
+
+# <div> classes inside a card and the field each one holds
+CARD_DIV_FIELDS = {
+    "c-entry-content": "description",
+    "c-mapstack__address": "address",
+    "c-mapstack__phone-url": "phone",
+    "c-mapstack__photo": "image",
+}
 
 
-def parse_restaurants(html: str) -> List[Dict[str, str]]:
+def parse_restaurants(html: str, targeted: bool = True) -> List[Dict[str, str]]:
     """Parse the Eater HTML and return a list of restaurant dicts."""
+    return list(parse_restaurants_by_slug(html, targeted).values())
 
-    soup = BeautifulSoup(html, "lxml")
+
+def parse_restaurants_by_slug(html: str, targeted: bool = True) -> Dict[str, Dict[str, str]]:
+    """Parse the Eater HTML and return restaurant dicts keyed by Eater slug.
+
+    ``targeted=True`` builds only the card subtrees and locates each card's
+    fields in a single walk; ``targeted=False`` is the original full-document
+    parse, kept for benchmarking. Both return the same rows.
+    """
+    if targeted:
+        soup = BeautifulSoup(html, "lxml", parse_only=CARD_STRAINER)
+        locate = _locate_card_tags
+    else:
+        soup = BeautifulSoup(html, "lxml")
+        locate = _find_card_tags
 
     # Eater list pages use <section class="c-mapstack__card">; keep a
     # fallback for the occasional <div class="c-mapstack__card">.
@@ -83,59 +158,97 @@ def parse_restaurants(html: str) -> List[Dict[str, str]]:
         if not slug or slug in restaurants:
             continue  # skip duplicates / malformed cards
 
-        # --- Name ----------------------------------------------------------------
-        name_tag = card.find("h1")
-        name = name_tag.get_text(strip=True) if name_tag else ""
-        if not name:
-            continue  # name is mandatory
-
-        # --- Description ---------------------------------------------------------
-        desc_tag = card.find("div", class_="c-entry-content")
-        description = (
-            desc_tag.find("p").get_text(strip=True)
-            if desc_tag and desc_tag.find("p") else ""
-        )
-
-        # --- Address -------------------------------------------------------------
-        addr_tag = card.find("div", class_="c-mapstack__address")
-        address = ""
-        if addr_tag:
-            a = addr_tag.find("a")
-            address = a.get_text(strip=True) if a else addr_tag.get_text(strip=True)
-
-        # --- Phone ---------------------------------------------------------------
-        phone_tag = card.find("div", class_="c-mapstack__phone-url")
-        phone = ""
-        if phone_tag:
-            tel_link = phone_tag.find("a", href=re.compile(r"^tel:"))
-            phone = tel_link.get_text(strip=True) if tel_link else ""
-
-        # --- Website -------------------------------------------------------------
-        site_tag = card.find("a", string=re.compile(r"visit website", re.I))
-        website = site_tag["href"] if site_tag and site_tag.has_attr("href") else ""
-
-        # --- Image ---------------------------------------------------------------
-        img = ""
-        photo_tag = card.find("div", class_="c-mapstack__photo")
-        if photo_tag:
-            span = photo_tag.find("span", class_="e-image__image")
-            if span and span.has_attr("data-original"):
-                img = span["data-original"]
-            else:
-                img_tag = photo_tag.find("img")
-                if img_tag and img_tag.has_attr("src"):
-                    img = img_tag["src"]
-
-        restaurants[slug] = {
-            "name": name,
-            "description": description,
-            "address": address,
-            "phone": phone,
-            "website": website,
-            "image": img,
-        }
-
-    return list(restaurants.values())
+        row = _card_row(locate(card))
+        if row:
+            restaurants[slug] = row
+
+    return restaurants
+
+
+def _find_card_tags(card: Tag) -> Dict[str, Optional[Tag]]:
+    """Locate a card's field tags with one ``find`` per field."""
+    return {
+        "name": card.find("h1"),
+        "description": card.find("div", class_="c-entry-content"),
+        "address": card.find("div", class_="c-mapstack__address"),
+        "phone": card.find("div", class_="c-mapstack__phone-url"),
+        "website": card.find("a", string=VISIT_WEBSITE_RE),
+        "image": card.find("div", class_="c-mapstack__photo"),
+    }
+
+
+def _locate_card_tags(card: Tag) -> Dict[str, Optional[Tag]]:
+    """Locate a card's field tags in a single walk over its descendants."""
+    found: Dict[str, Optional[Tag]] = {}
+    for el in card.descendants:
+        if not isinstance(el, Tag):
+            continue
+        if el.name == "h1":
+            found.setdefault("name", el)
+        elif el.name == "div":
+            for cls in el.get("class") or ():
+                field = CARD_DIV_FIELDS.get(cls)
+                if field:
+                    found.setdefault(field, el)
+        elif el.name == "a" and el.string is not None and VISIT_WEBSITE_RE.search(el.string):
+            found.setdefault("website", el)
+        if len(found) == 6:
+            break
+    return found
+
+
+def _card_row(tags: Dict[str, Optional[Tag]]) -> Optional[Dict[str, str]]:
+    """Turn a card's field tags into a restaurant dict (``None`` if it has no name)."""
+
+    # --- Name ----------------------------------------------------------------
+    name_tag = tags.get("name")
+    name = name_tag.get_text(strip=True) if name_tag else ""
+    if not name:
+        return None  # name is mandatory
+
+    # --- Description ---------------------------------------------------------
+    desc_tag = tags.get("description")
+    desc_p = desc_tag.find("p") if desc_tag else None
+    description = desc_p.get_text(strip=True) if desc_p else ""
+
+    # --- Address -------------------------------------------------------------
+    addr_tag = tags.get("address")
+    address = ""
+    if addr_tag:
+        a = addr_tag.find("a")
+        address = a.get_text(strip=True) if a else addr_tag.get_text(strip=True)
+
+    # --- Phone ---------------------------------------------------------------
+    phone_tag = tags.get("phone")
+    phone = ""
+    if phone_tag:
+        tel_link = phone_tag.find("a", href=TEL_RE)
+        phone = tel_link.get_text(strip=True) if tel_link else ""
+
+    # --- Website -------------------------------------------------------------
+    site_tag = tags.get("website")
+    website = site_tag["href"] if site_tag and site_tag.has_attr("href") else ""
+
+    # --- Image ---------------------------------------------------------------
+    img = ""
+    photo_tag = tags.get("image")
+    if photo_tag:
+        span = photo_tag.find("span", class_="e-image__image")
+        if span and span.has_attr("data-original"):
+            img = span["data-original"]
+        else:
+            img_tag = photo_tag.find("img")
+            if img_tag and img_tag.has_attr("src"):
+                img = img_tag["src"]
+
+    return {
+        "name": name,
+        "description": description,
+        "address": address,
+        "phone": phone,
+        "website": website,
+        "image": img,
+    }
 
 
 def save_csv(city: str, rows: List[Dict[str, str]]) -> str:
@@ -149,32 +262,126 @@ def save_csv(city: str, rows: List[Dict[str, str]]) -> str:
     safe_city = re.sub(r"\s+", "_", city)
     path = os.path.join(folder_path, f"{safe_city}_RestaurantList.csv")
 
-    fieldnames = ["name", "description", "address", "phone", "website", "image"]
     with open(path, "w", newline="", encoding="utf-8") as fh:
-        writer = csv.DictWriter(fh, fieldnames=fieldnames)
+        writer = csv.DictWriter(fh, fieldnames=FIELDNAMES)
         writer.writeheader()
         writer.writerows(rows)
     return os.path.abspath(path)
 
 
+def save_merged_csv(by_city: Dict[str, Dict[str, Dict[str, str]]]) -> str:
+    """Write every city's restaurants to ``data/All_Cities_Restaurants.csv`` and return the path."""
+    os.makedirs("data", exist_ok=True)
+    path = os.path.join("data", "All_Cities_Restaurants.csv")
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.DictWriter(fh, fieldnames=["city", "slug"] + FIELDNAMES)
+        writer.writeheader()
+        for city, restaurants in by_city.items():
+            for slug, row in restaurants.items():
+                writer.writerow({"city": city, "slug": slug, **row})
+    return os.path.abspath(path)
+
+
+# ---------------------------------------------------------------------------
+# Batch mode
+# ---------------------------------------------------------------------------
+
+def _timed_parse(html: str):
+    """Process-pool worker: ``(parse_restaurants_by_slug(html), seconds taken)``."""
+    start = time.perf_counter()
+    restaurants = parse_restaurants_by_slug(html)
+    return restaurants, time.perf_counter() - start
+
+
+def read_url_list(path: str) -> List[str]:
+    """Return the Eater URLs listed in *path*, one per line."""
+    with open(path, encoding="utf-8") as fh:
+        lines = (line.strip() for line in fh)
+        return [line for line in lines if line and not line.startswith("#")]
+
+
+def scrape_batch(urls: List[str], workers: int) -> Dict[str, Dict[str, Dict[str, str]]]:
+    """Fetch *urls* concurrently, parse them in a process pool, and merge them per city.
+
+    Returns ``{city: {slug: restaurant}}``. Lists are merged in input order, so
+    when a slug appears in several lists of a city the first one wins.
+    """
+    parsed: Dict[str, object] = {}
+    with ThreadPoolExecutor(max_workers=workers) as fetchers, \
+            ProcessPoolExecutor(max_workers=workers) as parsers:
+        downloads = {fetchers.submit(fetch_html, url): url for url in urls}
+        for future in as_completed(downloads):
+            url = downloads[future]
+            try:
+                html = future.result()
+            except Exception as e:
+                print(f"Failed to download {url}: {e}")
+                continue
+            parsed[url] = (parsers.submit(_timed_parse, html), len(html))
+
+        by_city: Dict[str, Dict[str, Dict[str, str]]] = {}
+        for url in urls:
+            if url not in parsed:
+                continue
+            future, n_bytes = parsed[url]
+            try:
+                restaurants, seconds = future.result()
+            except Exception as e:
+                print(f"Failed to parse {url}: {e}")
+                continue
+            crawl_metrics.log.parsed(url, n_bytes, seconds)
+            city = extract_city_name(url)
+            merged = by_city.setdefault(city, {})
+            for slug, row in restaurants.items():
+                merged.setdefault(slug, row)
+            print(f"{city}: {len(restaurants)} restaurants from {url}")
+    return by_city
+
+
 # ---------------------------------------------------------------------------
 # CLI Entrypoint
 # ---------------------------------------------------------------------------
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Scrape an Eater restaurant list")
-    parser.add_argument("url", help="Eater \"best restaurants\" article URL")
+    parser.add_argument("url", nargs="?", help="Eater \"best restaurants\" article URL")
+    parser.add_argument("--batch", metavar="FILE", help="file with one Eater article URL per line")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4,
+                        help="concurrent downloads and parser processes in batch mode")
+    parser.add_argument("--offline", action="store_true",
+                        help="answer every request from the HTTP cache, never the network")
+    parser.add_argument("--no-cache", action="store_true", help="bypass the HTTP cache")
+    parser.add_argument("--events", default=crawl_metrics.DEFAULT_PATH,
+                        help="JSONL file for per-request timing events ('' to disable)")
     args = parser.parse_args()
+    http_cache.configure(offline=args.offline or None, enabled=not args.no_cache)
+    if args.events:
+        crawl_metrics.log.open(args.events)
+    if not args.url and not args.batch:
+        parser.error("give an Eater URL or --batch FILE")
+
+    if args.batch:
+        by_city = scrape_batch(read_url_list(args.batch), max(1, args.workers))
+        for city, restaurants in by_city.items():
+            csv_path = save_csv(city, list(restaurants.values()))
+            print(f"{city}: {len(restaurants)} restaurants saved to {csv_path}")
+        print(f"Done! All cities saved to {save_merged_csv(by_city)}")
+        print(transport.report())
+        crawl_metrics.log.close()
+        return
 
     city = extract_city_name(args.url)
     print(f"Detected city: {city}\nDownloading article…")
 
     html = fetch_html(args.url)
-    restaurants = parse_restaurants(html)
+    with crawl_metrics.log.parse(args.url, len(html)):
+        restaurants = parse_restaurants(html)
     print(f"Found {len(restaurants)} restaurants. Saving…")
 
     csv_path = save_csv(city, restaurants)
     print(f"Done! CSV saved to {csv_path}")
+    print(transport.report())
+    crawl_metrics.log.close()
 
 
 if __name__ == "__main__":
@@ -8,35 +8,80 @@ saves PDF or HTML menu files locally, and writes results to **data/restaurant_wi
 
 Heuristics used
 ---------------
-1. **Direct wine links**: anchor tags whose text or href contains
-   ``wine``, ``vino``, or ``vin``.
-2. **Menu-ish links**: fallback to links containing ``menu``, ``dinner``,
-   ``drinks``, ``beverage``, or ``happy hour``.
-   Up to 10 pages scanned for wine keywords.
+Links are extracted once per page and scored by ``link_ranker.py`` from their
+text, URL path and file type.
+
+1. **Direct wine links**: the best scoring anchor whose text or path names
+   ``wine``, ``vino``, ``vin``, ``by the glass`` and the like.
+2. **Menu-ish links**: otherwise menu, dinner, drinks, beverage and bar links
+   are fetched best-first and scanned for wine keywords. Links found on those
+   pages are followed one more hop (e.g. /menus → /menus/drinks), within a
+   per-restaurant budget of 10 pages and 8 MB.
 3. **PDF fallback**: links to PDF files with wine or drinks-related names,
-   or from domains where PDF content contains wine references.
+   or from domains where PDF content contains wine references. PDFs are
+   streamed: only the first chunks are checked for wine keywords, and an
+   accepted file is written to disk from that same download.
 
 If no wine content is found, records **"No wines found"**.
+
+Restaurants are searched concurrently: an asyncio driver keeps up to
+``--concurrency`` restaurants in flight (each search runs on a worker thread)
+while no more than ``--per-host`` requests hit the same host at once.
+Requests are paced by per-host and per-hosting-platform token buckets
+(``--rate`` / ``--platform-rate``, see ``crawl_scheduler.py``); ``429``/``503``
+answers pause that host for its ``Retry-After`` and are retried (a host that
+asks for more than two minutes is skipped for the rest of the run), and free
+workers pick restaurants on hosts that are ready rather than waiting.
+Results are written in input order, exactly as a sequential run would.
+
+Each restaurant's result is committed to a state store as soon as it is
+finished (see ``crawl_state.py``). ``--resume`` continues an interrupted run,
+and restaurants whose homepage links are unchanged since their last
+successful discovery reuse that result (``--full`` searches everything).
+
+Every page and PDF goes through the shared on-disk HTTP cache (see
+``http_cache.py``), so re-runs revalidate instead of re-downloading, and
+over the pooled keep-alive session from ``transport.py``.
+
+Timing for every fetch, parse and heuristic stage is appended to
+``data/crawl_events.jsonl``; ``python crawl_metrics.py`` summarizes a run.
+
+Usage
+-----
+$ python 02_WineList.py [--concurrency 16] [--per-host 2] [--rate 2] [--platform-rate 6]
+                        [--offline | --no-cache]
+                        [--resume] [--full] [--events data/crawl_events.jsonl]
 """
 
+import argparse
+import asyncio
 import csv
 import glob
+import hashlib
+import heapq
 import os
 import re
-import ssl
 import sys
-from typing import List, Tuple
-from urllib.parse import urljoin, urlparse
-import urllib.request
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
 
 from bs4 import BeautifulSoup
 
+import crawl_metrics
+import crawl_scheduler
+import crawl_state
+import http_cache
+import link_ranker
+import transport
+
 # ---------------------------------------------------------------------------
 # Network helpers
 # ---------------------------------------------------------------------------
 
-context = ssl._create_unverified_context()
-
 HEADERS = {
     "User-Agent": (
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
@@ -45,26 +90,202 @@ HEADERS = {
     )
 }
 
+DEFAULT_CONCURRENCY = 16
+DEFAULT_PER_HOST = 2
+
+
+class HostLimiter:
+    """Caps the number of simultaneous requests made to any one host."""
+
+    def __init__(self, per_host: int) -> None:
+        self.per_host = per_host
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            sem = self._slots.get(host)
+            if sem is None:
+                sem = self._slots[host] = threading.BoundedSemaphore(self.per_host)
+        return sem
+
+
+host_limiter = HostLimiter(DEFAULT_PER_HOST)
+scheduler = crawl_scheduler.DomainScheduler()
+
+MAX_RETRIES = 2
+THROTTLE_STATUSES = (429, 503)
+
+
+def _throttled(url: str, resp, attempt: int) -> bool:
+    """Back off *url*'s buckets after a 429/503; return True if it is worth retrying."""
+    if resp.status_code not in THROTTLE_STATUSES:
+        return False
+    wait = crawl_scheduler.parse_retry_after(resp.headers.get("Retry-After"))
+    if wait is None:
+        wait = 5.0 * 2 ** attempt
+    scheduler.backoff(url, wait)
+    return attempt < MAX_RETRIES and wait <= crawl_scheduler.MAX_RETRY_WAIT
+
+
+def _fetch_outcome(status: int) -> str:
+    if status == 304:
+        return "revalidated"
+    if status in THROTTLE_STATUSES:
+        return "throttled"
+    return "error" if status >= 400 else "ok"
+
+
+def _timed_get(url: str, headers: Dict[str, str], stream: bool = False):
+    """``session.get`` returning ``(response, start, connect seconds, TTFB seconds)``.
+
+    Failed requests are recorded as ``error`` fetch events before re-raising.
+    """
+    transport.take_connect_time()
+    start = time.perf_counter()
+    try:
+        resp = transport.session.get(url, headers=headers, timeout=30, stream=stream)
+    except Exception:
+        crawl_metrics.log.fetch(url, "error", time.perf_counter() - start, transport.take_connect_time())
+        raise
+    connect = transport.take_connect_time()
+    return resp, start, connect, max(0.0, resp.elapsed.total_seconds() - connect)
+
+def _session_fetch(url: str, extra_headers: Dict[str, str]):
+    """Fetcher for :mod:`http_cache`: returns ``(status, headers, body)``."""
+    for attempt in range(MAX_RETRIES + 1):
+        scheduler.acquire(url)
+        with host_limiter.slot(url):
+            resp, start, connect, ttfb = _timed_get(url, {**HEADERS, **extra_headers})
+        crawl_metrics.log.fetch(url, _fetch_outcome(resp.status_code), time.perf_counter() - start,
+                                connect, ttfb, len(resp.content), resp.status_code)
+        scheduler.observe(url, resp.headers)
+        if not _throttled(url, resp, attempt):
+            break
+    if resp.status_code == 304:
+        return 304, dict(resp.headers), b""
+    resp.raise_for_status()
+    return resp.status_code, dict(resp.headers), resp.content
+
 def pull(url: str) -> str:
-    req = urllib.request.Request(url, headers=HEADERS)
-    with urllib.request.urlopen(req, context=context, timeout=30) as resp:
-        data = resp.read()
-        ctype = resp.headers.get("Content-Type", "").lower()
+    started, start = time.time(), time.perf_counter()
+    resp = http_cache.cache.fetch(url, _session_fetch)
+    if resp.stored_at < started:
+        crawl_metrics.log.fetch(url, "cache", time.perf_counter() - start, n_bytes=len(resp.body),
+                                status=resp.status)
+    data = resp.body
+    ctype = resp.header("Content-Type").lower()
     if "pdf" in ctype or url.lower().endswith(".pdf"):
         return data.decode("latin1", errors="ignore")
     return data.decode("utf-8", errors="ignore")
 
-def download_pdf(url: str, city: str, restaurant: str) -> str:
+PDF_CHUNK_BYTES = 64 * 1024
+PDF_SNIFF_BYTES = 512 * 1024
+
+
+def stream_pdf(url: str, city: str, restaurant: str, sniff: bool = False,
+               budget: Optional[link_ranker.CrawlBudget] = None) -> str:
+    """Stream *url* into ``data/{city}_Menus/{city}_{restaurant}.pdf`` and return the path.
+
+    With ``sniff=True`` the first ``PDF_SNIFF_BYTES`` are scanned for wine
+    keywords chunk by chunk; if none show up the download is abandoned and
+    ``""`` is returned. Bytes already read are reused for the saved file, so
+    an accepted PDF is fetched exactly once. A stale cached copy is
+    revalidated first, and a ``304`` saves the cached body.
+
+    The bytes actually read (or served from the cache) are charged to
+    *budget* as one page, also when the download fails.
+    """
+    chunks: List[bytes] = []
+    try:
+        return _stream_pdf(url, city, restaurant, sniff, chunks)
+    finally:
+        if budget is not None:
+            budget.spend(sum(len(chunk) for chunk in chunks))
+
+
+def _stream_pdf(url: str, city: str, restaurant: str, sniff: bool, chunks: List[bytes]) -> str:
     filename = f"{city}_{restaurant}.pdf".replace(" ", "_")
     folder = os.path.join("data", f"{city}_Menus")
-    os.makedirs(folder, exist_ok=True)
     filepath = os.path.join(folder, filename)
-    try:
-        req = urllib.request.Request(url, headers=HEADERS)
-        with urllib.request.urlopen(req, context=context, timeout=30) as resp:
-            with open(filepath, "wb") as f:
-                f.write(resp.read())
+    cache = http_cache.cache
+
+    def save_cached(entry: http_cache.CachedResponse) -> str:
+        chunks.append(entry.body)
+        if sniff and not page_mentions_wine(entry.body[:PDF_SNIFF_BYTES].decode("latin1")):
+            return ""
+        os.makedirs(folder, exist_ok=True)
+        with open(filepath, "wb") as f:
+            f.write(entry.body)
         return filepath
+
+    start = time.perf_counter()
+    cached = cache.get(url) if cache.enabled else None
+    if cached is not None and (cache.offline or cache.is_fresh(cached)):
+        crawl_metrics.log.fetch(url, "cache", time.perf_counter() - start, n_bytes=len(cached.body),
+                                status=cached.status)
+        return save_cached(cached)
+    if cache.enabled and cache.offline:
+        raise http_cache.CacheMiss(f"{url} is not cached (offline run)")
+
+    request_headers = {**HEADERS, **cache.validators(cached)} if cached is not None else HEADERS
+    scheduler.acquire(url)
+    with host_limiter.slot(url):
+        resp, start, connect, ttfb = _timed_get(url, request_headers, stream=True)
+        with resp:
+            scheduler.observe(url, resp.headers)
+            _throttled(url, resp, MAX_RETRIES)
+            if resp.status_code >= 400 or resp.status_code == 304:
+                crawl_metrics.log.fetch(url, _fetch_outcome(resp.status_code), time.perf_counter() - start,
+                                        connect, ttfb, status=resp.status_code)
+            resp.raise_for_status()
+            if resp.status_code == 304 and cached is not None:
+                return save_cached(cache.revalidated(cached, dict(resp.headers)))
+            status, headers = resp.status_code, dict(resp.headers)
+            body = resp.iter_content(PDF_CHUNK_BYTES)
+            matched = not sniff
+            seen, tail = 0, b""
+            while not matched and seen < PDF_SNIFF_BYTES:
+                chunk = next(body, b"")
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                seen += len(chunk)
+                # carry a short tail so keywords split across chunks still match
+                matched = page_mentions_wine((tail + chunk).decode("latin1"))
+                tail = chunk[-64:]
+            if not matched:
+                crawl_metrics.log.fetch(url, "sniff-rejected", time.perf_counter() - start,
+                                        connect, ttfb, seen, status)
+                return ""
+
+            os.makedirs(folder, exist_ok=True)
+            part_path = filepath + ".part"
+            try:
+                with open(part_path, "wb") as f:
+                    for chunk in chunks:
+                        f.write(chunk)
+                    for chunk in body:
+                        f.write(chunk)
+                        chunks.append(chunk)
+            except Exception:
+                try:
+                    os.remove(part_path)
+                except OSError:
+                    pass
+                raise
+    os.replace(part_path, filepath)
+    crawl_metrics.log.fetch(url, "ok", time.perf_counter() - start, connect, ttfb,
+                            sum(len(chunk) for chunk in chunks), status)
+
+    if cache.enabled:
+        cache.store(url, status, headers, b"".join(chunks))
+    return filepath
+
+def download_pdf(url: str, city: str, restaurant: str) -> str:
+    try:
+        return stream_pdf(url, city, restaurant)
     except Exception as e:
         print(f"Failed to download PDF for {restaurant}: {e}")
         return ""
@@ -110,100 +331,222 @@ def load_restaurants() -> List[dict]:
 # ---------------------------------------------------------------------------
 
 WINE_RE = re.compile(r"(wine|vino|vin\\s(?:rouge|blanc)?|by the glass|by the bottle)", re.I)
-MENU_RE = re.compile(r"(menu|dinner|lunch|drink|drinks|beverage|happy)", re.I)
-
-def candidate_links(soup: BeautifulSoup, base_url: str) -> List[Tuple[str, bool]]:
-    links: List[Tuple[str, bool]] = []
-    for a in soup.find_all("a", href=True):
-        text = a.get_text(" ", strip=True)
-        href = a["href"]
-        if not href or href.startswith("#"):
-            continue
-        abs_url = urljoin(base_url, href)
-        combined = f"{text} {href}".lower()
-        has_wine = bool(re.search(r"wine|vino|vin", combined))
-        if has_wine or MENU_RE.search(combined):
-            links.append((abs_url, has_wine))
-    links.sort(key=lambda t: (not t[1]))  # wine links first
-    return links
+PDF_MENU_NAME_RE = re.compile(r"wine|drink|menu|beverage", re.I)
+
+SUCCESS_STATUSES = ("Wine link found", "Wine found inside menu page", "Wine PDF link")
+
+# Per-restaurant crawl budget for steps 2 and 3
+MAX_MENU_PAGES = 10
+MAX_MENU_BYTES = 8 * 1024 * 1024
+MAX_LINK_DEPTH = 2
 
 
 def page_mentions_wine(html: str) -> bool:
     return bool(WINE_RE.search(html))
 
 
-def find_wine_menu(start_url: str, city: str, restaurant: str) -> Tuple[str, str]:
-    try:
-        homepage_html = pull(start_url)
-    except Exception as e:
-        return "", f"Error fetching homepage: {e}"
+def homepage_fingerprint(soup: BeautifulSoup) -> str:
+    """Hash of the homepage's links, the only part of it discovery depends on."""
+    links = sorted(f"{a['href']} {a.get_text(' ', strip=True)}" for a in soup.find_all("a", href=True))
+    return hashlib.sha256("\n".join(links).encode("utf-8")).hexdigest()
 
-    soup = BeautifulSoup(homepage_html, "lxml")
 
+def parse_html(html: str, url: str) -> BeautifulSoup:
+    """``BeautifulSoup(html, "lxml")`` with a timed parse event."""
+    with crawl_metrics.log.parse(url, len(html)):
+        return BeautifulSoup(html, "lxml")
+
+
+def search_homepage(soup: BeautifulSoup, start_url: str, city: str, restaurant: str) -> Tuple[str, str]:
     # 1. direct wine links
-    for url, has_wine in candidate_links(soup, start_url):
-        if has_wine:
-            return url, "Wine link found"
-
-    # 2. menu-ish pages
-    for url, _ in candidate_links(soup, start_url)[:10]:
-        try:
-            html = pull(url)
-        except Exception:
+    with crawl_metrics.log.stage("direct link", restaurant) as stage:
+        anchors = link_ranker.extract_anchors(soup, start_url)
+        direct = link_ranker.best_wine_link(anchors)
+        stage["outcome"] = "found" if direct else "none"
+    if direct:
+        return direct.url, "Wine link found"
+
+    # 2./3. best-first over menu-ish pages and PDFs, following links up to
+    # MAX_LINK_DEPTH hops from the homepage within the crawl budget
+    frontier = link_ranker.Frontier(visited=[start_url])
+    frontier.push(anchors, depth=1)
+    budget = link_ranker.CrawlBudget(MAX_MENU_PAGES, MAX_MENU_BYTES)
+    while frontier and not budget.exhausted:
+        link, depth = frontier.pop()
+
+        if link.pdf:
+            with crawl_metrics.log.stage("pdf fallback", restaurant) as stage:
+                # a menu-like file name is enough; otherwise sniff the content
+                named_like_menu = bool(PDF_MENU_NAME_RE.search(urlparse(link.url).path))
+                try:
+                    saved = stream_pdf(link.url, city, restaurant, sniff=not named_like_menu, budget=budget)
+                except Exception:
+                    saved = ""
+                stage["outcome"] = "found" if saved else "none"
+            if saved:
+                return link.url, "Wine PDF link"
             continue
-        if page_mentions_wine(html):
-            save_html_menu(html, city, restaurant)
-            return url, "Wine found inside menu page"
-
-    # 3. PDF fallback
-    for a in soup.find_all("a", href=True):
-        href = a["href"]
-        full_url = urljoin(start_url, href)
-        if href.lower().endswith(".pdf"):
+
+        with crawl_metrics.log.stage("menu page", restaurant) as stage:
             try:
-                pdf_text = pull(full_url)
-                if page_mentions_wine(pdf_text) or re.search(r"wine|drink|menu|beverage", href, re.I):
-                    download_pdf(full_url, city, restaurant)
-                    return full_url, "Wine PDF link"
+                html = pull(link.url)
             except Exception:
+                budget.spend(0)
+                stage["outcome"] = "error"
                 continue
+            budget.spend(len(html))
+            found = page_mentions_wine(html)
+            stage["outcome"] = "found" if found else "none"
+            if found:
+                save_html_menu(html, city, restaurant)
+            elif depth < MAX_LINK_DEPTH:
+                frontier.push(link_ranker.extract_anchors(parse_html(html, link.url), link.url), depth + 1)
+        if found:
+            return link.url, "Wine found inside menu page"
 
     return "", "No wines found"
 
+# ---------------------------------------------------------------------------
+# Crawl engine
+# ---------------------------------------------------------------------------
+
+def search_restaurant(rest: dict, state: Optional[crawl_state.CrawlState] = None,
+                      run_id: int = 0, incremental: bool = True) -> dict:
+    """Run the wine menu search for one restaurant row and return its output row.
+
+    With a *state* store the result is recorded as soon as it is known; rows
+    already finished in *run_id* and unchanged homepages reuse stored results.
+    """
+    name = rest.get("name", "Unknown")
+    website = rest.get("website", "").strip()
+    city = rest.get("city", "UnknownCity").replace(" ", "_")
+    key = crawl_state.restaurant_key(city, name)
+    previous = state.get(key) if state is not None else None
+
+    if previous and previous["run_id"] == run_id and previous["website"] == website:
+        return {
+            "name": name,
+            "website": website,
+            "wine_menu_url": previous["wine_menu_url"],
+            "status": previous["status"],
+            "city": city,
+        }
+
+    fingerprint = ""
+    if not website:
+        menu_url, status = "", "No website listed"
+    else:
+        print(f"🔎 Searching wine menu for {name} in {city}…")
+        with crawl_metrics.log.stage("homepage", name) as stage:
+            try:
+                homepage_html = pull(website)
+                soup = parse_html(homepage_html, website)
+            except Exception as e:
+                soup = None
+                menu_url, status = "", f"Error fetching homepage: {e}"
+            stage["outcome"] = "ok" if soup is not None else "error"
+        if soup is not None:
+            fingerprint = homepage_fingerprint(soup)
+            if (incremental and previous and previous["website"] == website
+                    and previous["fingerprint"] == fingerprint
+                    and previous["status"] in SUCCESS_STATUSES):
+                print(f"   ↺ {name}: homepage unchanged, keeping previous result")
+                menu_url, status = previous["wine_menu_url"], previous["status"]
+            else:
+                menu_url, status = search_homepage(soup, website, city, name)
+
+    result = {
+        "name": name,
+        "website": website,
+        "wine_menu_url": menu_url,
+        "status": status,
+        "city": city,
+    }
+    if state is not None:
+        state.record(key, result, fingerprint, run_id)
+    return result
+
+
+async def crawl(restaurants: List[dict], concurrency: int,
+                search: Callable[[dict], dict] = search_restaurant) -> List[dict]:
+    """Search every restaurant with at most *concurrency* in flight; keeps input order.
+
+    Whenever a worker is free it takes the pending restaurant whose host the
+    scheduler can serve soonest, so throttled hosts don't hold up the rest.
+    """
+    loop = asyncio.get_running_loop()
+    results: List[Optional[dict]] = [None] * len(restaurants)
+    pending = [(0.0, i) for i in range(len(restaurants))]  # (ready at, index)
+
+    def next_index() -> Optional[int]:
+        while pending:
+            ready_at, i = heapq.heappop(pending)
+            website = restaurants[i].get("website", "").strip()
+            if not website:
+                return i
+            # re-queue only if its host has to wait and someone else is ready sooner
+            wait = scheduler.ready_in(website)
+            ready = time.monotonic() + wait
+            if wait > 0 and pending and pending[0][0] < ready:
+                heapq.heappush(pending, (ready, i))
+                continue
+            return i
+        return None
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        async def worker() -> None:
+            while True:
+                i = next_index()
+                if i is None:
+                    return
+                results[i] = await loop.run_in_executor(pool, search, restaurants[i])
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return results
+
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Find wine menus for scraped restaurants")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="restaurants searched at the same time (1 = sequential)")
+    parser.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST,
+                        help="maximum simultaneous requests to a single host")
+    parser.add_argument("--rate", type=crawl_scheduler.positive_rate, default=crawl_scheduler.DEFAULT_HOST_RATE,
+                        help="requests per second allowed to a single host")
+    parser.add_argument("--platform-rate", type=crawl_scheduler.positive_rate, default=crawl_scheduler.DEFAULT_PLATFORM_RATE,
+                        help="requests per second allowed to a shared hosting platform (Squarespace, Wix …)")
+    parser.add_argument("--offline", action="store_true",
+                        help="answer every request from the HTTP cache, never the network")
+    parser.add_argument("--no-cache", action="store_true", help="bypass the HTTP cache")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue the last interrupted run, skipping finished restaurants")
+    parser.add_argument("--full", action="store_true",
+                        help="search every restaurant even if its homepage is unchanged")
+    parser.add_argument("--state", default=crawl_state.DEFAULT_PATH,
+                        help="per-restaurant state database")
+    parser.add_argument("--events", default=crawl_metrics.DEFAULT_PATH,
+                        help="JSONL file for per-request timing events ('' to disable)")
+    args = parser.parse_args()
+    if args.events:
+        crawl_metrics.log.open(args.events)
+    http_cache.configure(offline=args.offline or None, enabled=not args.no_cache)
+
     restaurants = load_restaurants()
     if not restaurants:
         print("No restaurant list CSVs found. Run restaurant_scraper.py first.", file=sys.stderr)
         sys.exit(1)
 
-    out_rows = []
-    for rest in restaurants:
-        name = rest.get("name", "Unknown")
-        website = rest.get("website", "").strip()
-        city = rest.get("city", "UnknownCity").replace(" ", "_")
-        if not website:
-            out_rows.append({
-                "name": name,
-                "website": "",
-                "wine_menu_url": "",
-                "status": "No website listed",
-                "city": city,
-            })
-            continue
-
-        print(f"🔎 Searching wine menu for {name} in {city}…")
-        menu_url, status = find_wine_menu(website, city, name)
-        out_rows.append({
-            "name": name,
-            "website": website,
-            "wine_menu_url": menu_url,
-            "status": status,
-            "city": city,
-        })
+    host_limiter.per_host = max(1, args.per_host)
+    transport.configure(per_host=host_limiter.per_host)
+    scheduler.host_rate = args.rate
+    scheduler.platform_rate = args.platform_rate
+    state = crawl_state.CrawlState(args.state)
+    run_id = state.begin_run(resume=args.resume)
+    search = partial(search_restaurant, state=state, run_id=run_id, incremental=not args.full)
+    out_rows = asyncio.run(crawl(restaurants, max(1, args.concurrency), search))
 
     os.makedirs("data", exist_ok=True)
     out_path = os.path.join("data", "restaurant_wine_offerings.csv")
@@ -212,7 +555,11 @@ def main() -> None:
         writer.writeheader()
         writer.writerows(out_rows)
 
+    state.finish_run(run_id)
+    state.close()
+    crawl_metrics.log.close()
     print(f"✅ Results written to {out_path}")
+    print(transport.report())
 
 
 if __name__ == "__main__":
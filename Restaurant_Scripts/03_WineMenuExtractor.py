@@ -12,101 +12,356 @@ The output CSV includes:
 - restaurant
 - wine_name (or line item)
 - wine_section (e.g., 'by the glass', 'by the bottle', etc.)
+- producer, vintage, region, country, price_glass, price_bottle (filled in
+  by site-specific extractors, empty for the generic heuristic)
+- extractor (which extractor produced the row)
+
+Menus whose site or layout is known (``site_extractors.py``: matched by the
+page's canonical domain or by a layout fingerprint) are parsed by their own
+extractor; everything else, and any known layout that yields no wines, goes
+through the generic line heuristic below.
+
+HTML pages are reduced to their visible text one block per line
+(``menu_html.py``), skipping scripts, styles, navigation and footers.
+PDF menus use their text layer; only pages without usable text (scans) are
+OCRed (``pdf_text.py``).
+A line group counts as a wine when it names any of the grapes, styles or
+appellations in ``wine_lexicon.py`` (matched in one regex pass, ignoring case
+and accents).
+
+Menu files are parsed in a process pool (``--workers``, default one per CPU;
+``--workers 1`` parses in-process). Rows are written in the same order as a
+sequential run, and a file that fails to parse is reported and skipped.
+
+Entries are streamed: each file's rows are flushed to the CSV (and the
+optional ``--jsonl`` / ``--parquet`` outputs) as soon as they are extracted,
+so memory stays flat and an interrupted run keeps what it already wrote.
+
+Results are cached per file content in ``data/extract_cache.sqlite``
+(``extract_cache.py``): a re-run only parses menus that are new or changed
+and reuses the stored entries for the rest. ``--refresh`` re-extracts all.
+
+Usage
+-----
+$ python 03_WineMenuExtractor.py [--workers 4] [--jsonl out.jsonl] [--parquet out.parquet] [--refresh]
 """
 
+import argparse
+import json
 import os
 import re
 import csv
 import glob
-from bs4 import BeautifulSoup
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import site_extractors
+import wine_lexicon
+from extract_cache import ExtractCache
+from menu_html import html_lines
+from pdf_text import pdf_text
+from script_utils import file_digest
+from site_extractors import STRUCTURED_FIELDS
+from wine_lexicon import mentions_wine
 
 WINE_SECTION_RE = re.compile(r"by the glass|by the bottle|glass pours|bottles", re.I)
+ENTRY_END_RE = re.compile(r"\$\d+|\d{2}\s*$|[\.:;\-]\s*$")
+MAX_ENTRY_WORDS = 12
+
+# Bump when the extraction logic changes so cached results are redone;
+# changes to wine_lexicon.py are picked up automatically.
+EXTRACTOR_VERSION = "6"
 
 
 def extract_from_html(filepath, city, restaurant):
-    with open(filepath, "r", encoding="utf-8") as f:
-        soup = BeautifulSoup(f, "lxml")
-        text = soup.get_text("\n", strip=True)
-    return extract_wines_from_text(text, city, restaurant)
+    with open(filepath, "r", encoding="utf-8", errors="replace") as f:
+        html = f.read()
+
+    extractor = (site_extractors.for_domain(site_extractors.page_domain(html))
+                 or site_extractors.for_content("html", html))
+    if extractor is not None and extractor.kind == "html":
+        entries = _site_entries(extractor, html, city, restaurant)
+        if entries:
+            return entries
+        extractor = None
+
+    lines = html_lines(html)
+    return extract_from_lines(lines, city, restaurant, extractor)
 
 
 def extract_from_pdf(filepath, city, restaurant):
     try:
-        import PyPDF2
+        import PyPDF2  # noqa: F401
     except ImportError:
         print("PyPDF2 is required to extract from PDFs. Run 'pip install PyPDF2'.")
-        return []
+        return None
 
-    lines = []
     try:
-        with open(filepath, "rb") as f:
-            reader = PyPDF2.PdfReader(f)
-            for page in reader.pages:
-                lines.append(page.extract_text())
+        text = pdf_text(filepath)
+    except ImportError:
+        print(f"{filepath} has scanned pages; OCR needs 'pip install pdf2image pytesseract' "
+              "and the poppler and tesseract binaries.")
+        return None
     except Exception as e:
         print(f"Error reading PDF {filepath}: {e}")
-        return []
+        return None
+
+    return extract_from_lines(text.splitlines(), city, restaurant)
 
+
+def extract_from_lines(lines, city, restaurant, extractor=None):
+    """Text extractor for *lines* (given, or found by fingerprint), else the generic heuristic."""
     text = "\n".join(lines)
+    if extractor is None or extractor.kind != "text":
+        extractor = site_extractors.for_content("text", text)
+    if extractor is not None:
+        entries = _site_entries(extractor, lines, city, restaurant)
+        if entries:
+            return entries
     return extract_wines_from_text(text, city, restaurant)
 
 
+def _site_entries(extractor, content, city, restaurant):
+    return [{"city": city, "restaurant": restaurant, **row, "extractor": extractor.name}
+            for row in extractor.extract(content)]
+
+
 def extract_wines_from_text(text, city, restaurant):
     entries = []
-    lines = text.splitlines()
     section = ""
-    buffer = ""
+    buffer = []  # lines of the entry being collected
+    n_words = 0
 
-    for line in lines:
+    for line in text.splitlines():
         line = line.strip()
         if not line:
             continue
 
         # Detect section
         if WINE_SECTION_RE.search(line):
-            section = line.strip()
+            section = line
             continue
 
         # Append line to buffer and decide when to finalize
-        buffer += (" " + line if buffer else line)
+        buffer.append(line)
+        n_words += len(line.split())
 
         # Heuristic: finalize buffer if the line ends with price or punctuation
-        if re.search(r"\$\d+|\d{2}\s*$|[\.:;\-]\s*$", line) or len(buffer.split()) > 12:
-            if any(word in buffer.lower() for word in [
-                "chardonnay", "cabernet", "pinot", "riesling", "merlot",
-                "sauvignon", "rose", "sparkling", "bordeaux", "barolo", "tempranillo"
-            ]):
+        if ENTRY_END_RE.search(line) or n_words > MAX_ENTRY_WORDS:
+            candidate = " ".join(buffer)
+            if mentions_wine(candidate):
                 entries.append({
                     "city": city,
                     "restaurant": restaurant,
                     "wine_section": section,
-                    "wine_name": buffer.strip(),
+                    "wine_name": candidate,
+                    **{field: "" for field in STRUCTURED_FIELDS},
+                    "extractor": "generic",
                 })
-            buffer = ""  # reset
+            buffer = []  # reset
+            n_words = 0
 
     return entries
 
 
+def list_menu_files():
+    """Return ``(filepath, city, restaurant)`` for every saved menu, in a stable order."""
+    jobs = []
+    for folder in sorted(glob.glob("data/*_Menus")):
+        city = os.path.basename(folder).replace("_Menus", "")
+        for ext in (".html", ".pdf"):
+            for filepath in sorted(glob.glob(os.path.join(folder, f"*{ext}"))):
+                restaurant = os.path.basename(filepath).replace(ext, "").replace(f"{city}_", "")
+                jobs.append((filepath, city, restaurant))
+    return jobs
+
+
+def is_pdf(filepath):
+    """Some servers send PDF menus as text/html; 02 then saves them as .html."""
+    with open(filepath, "rb") as f:
+        return f.read(5) == b"%PDF-"
+
+
+def extract_file(job):
+    """Extract one menu file; never raises, so one bad file can't stop the run.
+
+    Returns ``None`` when the file could not be read, so the failure is not cached.
+    """
+    filepath, city, restaurant = job
+    try:
+        if filepath.endswith(".pdf") or is_pdf(filepath):
+            return extract_from_pdf(filepath, city, restaurant)
+        return extract_from_html(filepath, city, restaurant)
+    except Exception as e:
+        print(f"Error extracting {filepath}: {e}")
+        return None
+
+
+def _from_cache(job, rows):
+    _, city, restaurant = job
+    return [{"city": city, "restaurant": restaurant, **row} for row in rows]
+
+
+def _store(cache, digest, entries):
+    if entries is None:
+        return []
+    cache.put(digest, [{k: v for k, v in e.items() if k not in ("city", "restaurant")} for e in entries])
+    return entries
+
+
+def iter_entries(jobs, workers, cache):
+    """Yield each file's entries in job order.
+
+    Files are hashed here; unchanged ones come from *cache* and only new or
+    changed ones are parsed. With a pool, at most ``2 * workers`` files are
+    being parsed at once, so memory stays flat however many menus there are.
+    """
+    if workers <= 1:
+        for job in jobs:
+            digest = file_digest(job[0])
+            rows = cache.get(digest)
+            if rows is not None:
+                yield _from_cache(job, rows)
+            else:
+                yield _store(cache, digest, extract_file(job))
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        window = deque()  # (job, digest, cached rows or None, future or None)
+        running = 0
+
+        def pop():
+            nonlocal running
+            job, digest, rows, future = window.popleft()
+            if future is None:
+                return _from_cache(job, rows)
+            running -= 1
+            return _store(cache, digest, future.result())
+
+        for job in jobs:
+            digest = file_digest(job[0])
+            rows = cache.get(digest)
+            if rows is not None:
+                window.append((job, digest, rows, None))
+            else:
+                window.append((job, digest, None, pool.submit(extract_file, job)))
+                running += 1
+            # hand back finished work in order; wait only when the pool is full
+            while window and (window[0][3] is None or window[0][3].done() or running >= 2 * workers):
+                yield pop()
+        while window:
+            yield pop()
+
+
+# ---------------------------------------------------------------------------
+# Output sinks
+# ---------------------------------------------------------------------------
+
+FIELDNAMES = ["city", "restaurant", "wine_section", "wine_name"] + STRUCTURED_FIELDS + ["extractor"]
+
+
+class CsvSink:
+    """Writes entries to a CSV file, flushing after every menu file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._fh = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._fh, fieldnames=FIELDNAMES)
+        self._writer.writeheader()
+
+    def write(self, entries):
+        self._writer.writerows(entries)
+        self._fh.flush()
+
+    def close(self):
+        self._fh.close()
+
+
+class JsonlSink:
+    """Writes one JSON object per entry."""
+
+    def __init__(self, path):
+        self.path = path
+        self._fh = open(path, "w", encoding="utf-8")
+
+    def write(self, entries):
+        for entry in entries:
+            self._fh.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._fh.flush()
+
+    def close(self):
+        self._fh.close()
+
+
+class ParquetSink:
+    """Writes entries to Parquet in row groups of ``batch_size`` (needs pyarrow)."""
+
+    def __init__(self, path, batch_size=10_000):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.path = path
+        self._pa = pa
+        self._schema = pa.schema([(name, pa.string()) for name in FIELDNAMES])
+        self._writer = pq.ParquetWriter(path, self._schema)
+        self._batch_size = batch_size
+        self._pending = []
+
+    def write(self, entries):
+        self._pending.extend(entries)
+        if len(self._pending) >= self._batch_size:
+            self._flush()
+
+    def _flush(self):
+        if self._pending:
+            columns = {name: [e.get(name, "") for e in self._pending] for name in FIELDNAMES}
+            self._writer.write_table(self._pa.Table.from_pydict(columns, schema=self._schema))
+            self._pending = []
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+
+
+def open_sinks(args):
+    os.makedirs("data", exist_ok=True)
+    sinks = [CsvSink(os.path.join("data", "wine_menu_extracted.csv"))]
+    if args.jsonl:
+        sinks.append(JsonlSink(args.jsonl))
+    if args.parquet:
+        try:
+            sinks.append(ParquetSink(args.parquet))
+        except ImportError:
+            print("pyarrow is required for Parquet output. Run 'pip install pyarrow'.")
+    return sinks
+
+
 def main():
-    all_entries = []
-    folders = glob.glob("data/*_Menus")
+    parser = argparse.ArgumentParser(description="Extract wine entries from saved menus")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="parser processes (1 = parse in this process)")
+    parser.add_argument("--jsonl", help="also write entries to this JSON Lines file")
+    parser.add_argument("--parquet", help="also write entries to this Parquet file")
+    parser.add_argument("--refresh", action="store_true",
+                        help="re-extract every file instead of reusing cached results")
+    args = parser.parse_args()
 
-    for folder in folders:
-        city = os.path.basename(folder).replace("_Menus", "")
-        for filepath in glob.glob(os.path.join(folder, "*.html")):
-            restaurant = os.path.basename(filepath).replace(".html", "").replace(f"{city}_", "")
-            all_entries.extend(extract_from_html(filepath, city, restaurant))
-        for filepath in glob.glob(os.path.join(folder, "*.pdf")):
-            restaurant = os.path.basename(filepath).replace(".pdf", "").replace(f"{city}_", "")
-            all_entries.extend(extract_from_pdf(filepath, city, restaurant))
-
-    out_path = os.path.join("data", "wine_menu_extracted.csv")
-    with open(out_path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=["city", "restaurant", "wine_section", "wine_name"])
-        writer.writeheader()
-        writer.writerows(all_entries)
-
-    print(f"✅ Extracted wine data written to {out_path}")
+    sinks = open_sinks(args)
+    cache = ExtractCache(f"{EXTRACTOR_VERSION}-{wine_lexicon.DIGEST}", refresh=args.refresh)
+    total = 0
+    try:
+        for entries in iter_entries(list_menu_files(), args.workers, cache):
+            for sink in sinks:
+                sink.write(entries)
+            total += len(entries)
+    finally:
+        for sink in sinks:
+            sink.close()
+        cache.close()
+
+    for sink in sinks:
+        print(f"✅ Extracted wine data ({total} entries) written to {sink.path}")
+    print(cache.report())
 
 
 if __name__ == "__main__":
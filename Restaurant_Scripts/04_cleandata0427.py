@@ -1,8 +1,73 @@
+"""
+Wine Menu Cleaner
+=================
+Splits each extracted menu line (``data/wine_menu_extracted.csv`` from
+``03_WineMenuExtractor.py``) into the structured ``HEADERS`` columns with an
+LLM.
+
+Menu lines are sent in batches: one request carries ``--batch-size`` lines,
+each tagged with its row id, and the model answers with a JSON array of
+objects keyed by those ids. Up to ``--concurrency`` batches are in flight at
+once; a batch that fails (API error, unparseable reply, missing ids) is
+retried with exponential backoff, and rows still unanswered after the last
+attempt are written with empty values. Replies are parsed as strict JSON and
+every object is checked against ``HEADERS`` (all columns, no extras, strings
+or null); an object that does not fit counts as unanswered.
+
+Runs are crash-safe: each finished row is appended to a journal
+(``<output>.journal.jsonl``, ``normalize_journal.py``) with the hash of its
+input and fsynced as soon as its answer arrives. Re-running the same command
+skips rows the journal already answered and re-queues only the failed ones
+(an answer with every column null counts as failed), so an interrupted run
+costs nothing to pick up again. The output CSV is rebuilt in input order at
+the end of every run. Delete the journal to pay for a fresh pass.
+
+Identical lines are only sent once. Answers are memoized in
+``data/normalize_memo.sqlite`` (``normalize_memo.py``) by a canonical form of
+the menu line that ignores case, spacing, bullets, dashes and prices, so a
+wine seen on another menu or in an earlier crawl is not paid for again. Only
+cache misses go to the model; the answer is fanned out to every duplicate
+row, with city, restaurant, the original line and its prices taken from that
+row. ``--no-memo`` skips the stored answers (duplicates within the run are
+still sent once).
+
+Before any of that, ``wine_line_parser.py`` parses every line (vintage,
+prices, country, varietal, producer …); rows it fully resolves are written
+from the parser and never reach the model. ``--no-fast-path`` turns this off.
+
+Every model call (tokens, latency, queue wait, retries, batch size, rows
+parsed) is logged to ``data/llm_events.jsonl`` (``--events``); see
+``llm_metrics.py`` for the throughput / latency / cost report.
+
+``--api-base`` (or ``OPENAI_API_BASE``) points the client at another
+OpenAI-compatible endpoint, e.g. a local stub server for tests.
+
+Usage
+-----
+$ python 04_cleandata0427.py [--input data/wine_menu_extracted.csv] [--output processed_wine_menu.csv]
+      [--batch-size 20] [--concurrency 8] [--retries 4] [--api-base http://localhost:8000/v1]
+      [--memo data/normalize_memo.sqlite | --no-memo] [--no-fast-path] [--journal out.journal.jsonl]
+      [--events data/llm_events.jsonl]
+"""
+
+import argparse
+import asyncio
 import csv
+import json
+import math
 import openai
 import os
+import random
+import re
+import time
 from dotenv import load_dotenv
 
+import llm_metrics
+import normalize_memo
+from normalize_journal import Journal, input_hash
+from normalize_memo import NormalizeMemo, canonical_line
+from wine_line_parser import parse_row
+
 # Load environment variables
 load_dotenv()
 openai.api_key = os.getenv("OPENAI_API_KEY")
@@ -11,6 +76,13 @@ openai.api_key = os.getenv("OPENAI_API_KEY")
 INPUT_FILE = "/workspaces/codespaces-blank//Restaurant_Data/wine_menu_extracted.csv"
 OUTPUT_FILE = "processed_wine_menu.csv"
 
+MODEL = "gpt-4"
+DEFAULT_BATCH_SIZE = 20
+DEFAULT_CONCURRENCY = 8
+DEFAULT_RETRIES = 4
+BACKOFF_BASE = 1.0  # seconds; doubled on every retry, plus jitter
+BACKOFF_MAX = 30.0
+
 # Define the output CSV headers
 HEADERS = [
     "City",
@@ -36,19 +108,80 @@ HEADERS = [
     "Sources",
 ]
 
-# Function to call the LLM
-def call_llm(row):
+# filled in from each row itself, never shared between duplicate lines
+ROW_FIELDS = ["City", "Restaurant", "Menu Wine Name", "Price", "Price by Glass", "Price by Bottle"]
+
+FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+
+def row_text(row):
+    """Combine a CSV row into the single string the LLM sees."""
+    return f"{row['city']}, {row['restaurant']}, {row['wine_section']}, {row['wine_name']}"
+
+
+def empty_row():
+    return {header: None for header in HEADERS}
+
+
+def is_answered(structured):
+    return any(value for value in structured.values())
+
+
+def wine_fields(structured):
+    """The part of an answer that describes the wine, not the menu row."""
+    return {header: structured.get(header) for header in HEADERS if header not in ROW_FIELDS}
+
+
+def with_row_details(out, row, parsed):
+    """Fill the row-specific columns from *row* itself and its parsed prices."""
+    out["City"] = row["city"]
+    out["Restaurant"] = row["restaurant"]
+    out["Menu Wine Name"] = row["wine_name"]
+    out["Price"] = parsed.price or None
+    out["Price by Glass"] = parsed.price_glass or None
+    out["Price by Bottle"] = parsed.price_bottle or None
+    return out
+
+
+def fan_out(fields, row):
+    """A structured row for *row* built from memoized wine *fields* plus the row's own details."""
+    out = empty_row()
+    out.update(fields)
+    return with_row_details(out, row, parse_row(row))
+
+
+def parsed_row(row, parsed):
+    """A structured row straight from the line parser, for rows it fully resolved."""
+    out = empty_row()
+    out.update({
+        "Brand": parsed.producer,
+        "Wine Name": parsed.wine_name,
+        "Vintage": parsed.vintage,
+        "Region": parsed.region or None,
+        "State": parsed.state or None,
+        "Country": parsed.country,
+        "Wine Type": parsed.wine_type or None,
+        "Varietal": parsed.varietal,
+    })
+    return with_row_details(out, row, parsed)
+
+
+# Function to build the prompt for a batch of rows
+def batch_prompt(batch):
     """
-    Calls the LLM to process a row and return structured data.
+    *batch* is a list of ``(row id, row text)``; the reply must be a JSON array with one object per id.
     """
-    prompt = f"""
-You are a wine data expert. Take the following row of wine menu data and split it into the following columns:
+    rows = json.dumps([{"id": row_id, "row": text} for row_id, text in batch], ensure_ascii=False)
+    return f"""
+You are a wine data expert. Each item below is one row of wine menu data, with an "id".
+Split every row into the following columns:
 {', '.join(HEADERS)}
 
-Row: {row}
+Rows: {rows}
 
-Return ONLY a valid, minified JSON object with the exact schema:
+Return ONLY a valid, minified JSON array with exactly one object per row, in any order, each with the exact schema:
 {{
+    "id": integer (the row's id),
     "City": string|null,
     "Restaurant": string|null,
     "Menu Wine Name": string|null,
@@ -74,50 +207,282 @@ Return ONLY a valid, minified JSON object with the exact schema:
 Use null for missing values. Do not add extra keys or comments.
     """.strip()
 
-    try:
-        response = openai.ChatCompletion.create(
-            model="gpt-4",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.2,
+
+def validate_row(item):
+    """
+    Check one reply object against ``HEADERS``: every column present, no extra keys (besides "id"),
+    each value a string or null and "Sources" a list of strings. Numbers are taken as strings.
+    Raises ``ValueError`` if the object does not fit.
+    """
+    columns = set(item) - {"id"}
+    if columns != set(HEADERS):
+        raise ValueError(f"missing {sorted(set(HEADERS) - columns)}, unexpected {sorted(columns - set(HEADERS))}")
+    structured = {}
+    for header in HEADERS:
+        value = item[header]
+        if header == "Sources":
+            value = [] if value is None else value
+            if not isinstance(value, list) or not all(isinstance(source, str) for source in value):
+                raise ValueError(f"Sources is not a list of strings: {value!r}")
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = str(value)
+        elif value is not None and not isinstance(value, str):
+            raise ValueError(f"{header} is not a string: {value!r}")
+        structured[header] = value
+    return structured
+
+
+def parse_batch_reply(content, ids):
+    """
+    Map row id -> structured row from the model's JSON array; rows it did not answer, or answered
+    with an object that fails :func:`validate_row`, are left out (and so retried).
+    """
+    data = json.loads(FENCE_RE.sub("", content.strip()))
+    if isinstance(data, dict):
+        # some models wrap the array: {"rows": [...]}
+        data = next((value for value in data.values() if isinstance(value, list)), [])
+    if not isinstance(data, list):
+        raise ValueError("reply is not a JSON array")
+    wanted = set(ids)
+    answers = {}
+    for item in data:
+        if not isinstance(item, dict):
+            continue
+        try:
+            row_id = int(item.get("id"))
+        except (TypeError, ValueError):
+            continue
+        if row_id not in wanted:
+            continue
+        try:
+            answers[row_id] = validate_row(item)
+        except ValueError as e:
+            print(f"Invalid answer for row {row_id}: {e}")
+    return answers
+
+
+# Function to call the LLM for one batch, with retry and backoff
+async def call_llm_batch(batch, semaphore, retries=DEFAULT_RETRIES, on_answers=None):
+    """
+    Returns row id -> structured row for every row in *batch*; rows that never got a valid answer
+    map to ``None``. *on_answers* is called with every partial result as soon as it arrives.
+    """
+    answers = {}
+    pending = list(batch)
+    for attempt in range(retries + 1):
+        sent = pending
+        queued = time.perf_counter()
+        started = None
+        response = None
+        outcome = "error"
+        try:
+            async with semaphore:
+                started = time.perf_counter()
+                response = await openai.ChatCompletion.acreate(
+                    model=MODEL,
+                    messages=[{"role": "user", "content": batch_prompt(pending)}],
+                    temperature=0.2,
+                )
+            latency = time.perf_counter() - started
+            outcome = "parse-error"
+            content = response["choices"][0]["message"]["content"]
+            new = parse_batch_reply(content, [row_id for row_id, _ in pending])
+            answers.update(new)
+            if new and on_answers is not None:
+                on_answers(new)
+            pending = [(row_id, text) for row_id, text in pending if row_id not in answers]
+            if not new:
+                error = "no row in the reply could be used"
+            else:
+                outcome = "partial" if pending else "ok"
+                error = f"{len(pending)} rows missing from the reply"
+        except Exception as e:
+            if response is None:
+                latency = time.perf_counter() - (started or queued)
+            error = e
+        llm_metrics.log.call(
+            MODEL, attempt, [text for _, text in sent], [text for _, text in pending], outcome,
+            latency, wait=(started or time.perf_counter()) - queued,
+            usage=response.get("usage") if isinstance(response, dict) else None,
+            error="" if outcome == "ok" else str(error),
         )
-        content = response["choices"][0]["message"]["content"]
-        return eval(content)  # Convert the JSON string to a Python dictionary
-    except Exception as e:
-        print(f"Error calling LLM for row: {row}\n{e}")
-        return {header: None for header in HEADERS}  # Return empty values if LLM fails
+        if not pending:
+            break
+        if attempt < retries:
+            delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt) * (1 + random.random())
+            print(f"Batch of {len(pending)} rows failed ({error}); retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+        else:
+            print(f"Giving up on {len(pending)} rows after {retries + 1} attempts: {error}")
+
+    failed = {row_id: None for row_id, _ in pending}
+    answers.update(failed)
+    if failed and on_answers is not None:
+        on_answers(failed)
+    return answers
+
+
+async def normalize_rows(texts, batch_size, concurrency, retries, on_answers=None):
+    """
+    Structured rows for *texts*, in the same order (``None`` where the LLM failed).
+    *on_answers* is called with answers as they arrive (index into *texts* -> row or ``None``).
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    indexed = list(enumerate(texts))
+    batches = [indexed[i:i + batch_size] for i in range(0, len(indexed), batch_size)]
+    results = [None] * len(texts)
+    done = 0
+
+    async def run(batch):
+        nonlocal done
+        answers = await call_llm_batch(batch, semaphore, retries, on_answers)
+        for row_id, structured in answers.items():
+            results[row_id] = structured
+        done += len(batch)
+        print(f"Processed {done}/{len(texts)} rows")
+
+    await asyncio.gather(*(run(batch) for batch in batches))
+    return results
 
 
 # Function to process the CSV file
-def process_csv(input_file, output_file):
+def process_csv(input_file, output_file, batch_size=DEFAULT_BATCH_SIZE,
+                concurrency=DEFAULT_CONCURRENCY, retries=DEFAULT_RETRIES, memo_path=normalize_memo.DEFAULT_PATH,
+                fast_path=True, journal_path=None):
     """
     Processes the input CSV file and writes the structured data to the output CSV file.
+
+    Every LLM answer is appended to a journal (*journal_path*, by default next to
+    the output) as soon as its batch finishes. Rows already answered in the
+    journal are not sent again; rows that failed are. The output is rebuilt in
+    input order at the end.
+
+    Rows the line parser fully resolves are written without the LLM. Of the
+    rest, only the first row of each canonical line not already in the memo is sent
+    to the LLM; every other row is filled in from that answer or the memo.
     """
-    with open(input_file, "r", encoding="utf-8") as infile, open(
-        output_file, "w", newline="", encoding="utf-8"
-    ) as outfile:
-        reader = csv.DictReader(infile)
-        writer = csv.DictWriter(outfile, fieldnames=HEADERS)
-        writer.writeheader()
+    with open(input_file, "r", encoding="utf-8") as infile:
+        rows = list(csv.DictReader(infile))
+    batch_size = max(1, batch_size)
+
+    parsed = [parse_row(row) for row in rows] if fast_path else [None] * len(rows)
+    resolved = {i for i, p in enumerate(parsed) if p is not None and p.resolved}
 
-        for row in reader:
-            # Combine the row into a single string for the LLM
-            row_data = f"{row['city']}, {row['restaurant']}, {row['wine_section']}, {row['wine_name']}"
-            print(f"Processing row: {row_data}")
+    # one representative row per canonical line; lines with no words are sent as they are
+    keys = [canonical_line(row["wine_name"]) or f"#row{i}" for i, row in enumerate(rows)]
+    first = {}
+    for i, key in enumerate(keys):
+        if i not in resolved:
+            first.setdefault(key, i)
 
-            # Call the LLM to process the row
-            structured_data = call_llm(row_data)
+    memo = NormalizeMemo(MODEL, memo_path) if memo_path else None
+    known = memo.get_many(first) if memo else {}
+    candidates = [i for key, i in first.items() if key not in known]
+
+    # rows a previous (interrupted) run already paid for
+    journal = Journal(journal_path or f"{output_file}.journal.jsonl")
+    journaled = journal.load()
+    hashes = {i: input_hash(MODEL, row_text(rows[i])) for i in candidates}
+    answered = {}
+    requeued = 0
+    for i in candidates:
+        status, data = journaled.get(hashes[i], (None, None))
+        if status == "ok" and data and is_answered(data):
+            answered[keys[i]] = (i, data)
+        elif status is not None:  # failed, or an all-null answer journaled as ok
+            requeued += 1
+    reused = len(answered)
+    to_send = [i for i in candidates if keys[i] not in answered]
+
+    def record(new_answers):
+        journal.append((hashes[to_send[j]], "ok" if structured and is_answered(structured) else "failed",
+                        structured) for j, structured in new_answers.items())
+
+    start = time.perf_counter()
+    try:
+        answers = asyncio.run(normalize_rows([row_text(rows[i]) for i in to_send], batch_size,
+                                             concurrency, retries, on_answers=record))
+    finally:
+        journal.close()
+    elapsed = time.perf_counter() - start
+    llm_metrics.log.finished(len(rows), len(to_send), batch_size, concurrency, elapsed)
 
-            # Write the structured data to the output file
-            writer.writerow(structured_data)
+    for i, structured in zip(to_send, answers):
+        if structured is not None and is_answered(structured):
+            answered[keys[i]] = (i, structured)
+    if memo:
+        memo.put_many({key: wine_fields(structured) for key, (_, structured) in answered.items()})
+        memo.close()
+
+    results = []
+    for i, (row, key) in enumerate(zip(rows, keys)):
+        if i in resolved:
+            results.append(parsed_row(row, parsed[i]))
+        elif key in answered and answered[key][0] == i:
+            results.append(answered[key][1])  # the row the LLM actually saw
+        elif key in answered:
+            results.append(fan_out(wine_fields(answered[key][1]), row))
+        elif key in known:
+            results.append(fan_out(known[key], row))
+        else:
+            results.append(empty_row())
+
+    with open(output_file, "w", newline="", encoding="utf-8") as outfile:
+        writer = csv.DictWriter(outfile, fieldnames=HEADERS)
+        writer.writeheader()
+        writer.writerows(results)
+
+    saved = len(rows) - len(to_send)
+    hit_rate = saved / len(rows) if rows else 0.0
+    calls_saved = math.ceil(len(rows) / batch_size) - math.ceil(len(to_send) / batch_size)
+    print(f"Normalized {len(rows)} rows in {elapsed:.1f}s")
+    print(f"Line parser: {len(resolved)} rows fully resolved without the LLM")
+    print(f"Journal {journal.path}: {reused} answers reused from an earlier run, "
+          f"{requeued} failed rows re-queued, {sum(a is None for a in answers)} failed this run")
+    print(f"Normalization memo: {len(known)} lines from the memo, {len(to_send)} sent to the LLM; "
+          f"{saved}/{len(rows)} rows ({hit_rate:.0%}) answered without a call, ~{calls_saved} requests saved")
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Split extracted wine menu lines into structured columns")
+    parser.add_argument("--input", default=INPUT_FILE, help="CSV written by 03_WineMenuExtractor.py")
+    parser.add_argument("--output", default=OUTPUT_FILE, help="structured CSV to write")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="menu lines per LLM request")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="LLM requests in flight at once")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES,
+                        help="retries per batch before its rows are left empty")
+    parser.add_argument("--model", default=MODEL, help="chat model to use")
+    parser.add_argument("--api-base", default=os.getenv("OPENAI_API_BASE"),
+                        help="OpenAI-compatible endpoint, e.g. a local stub server")
+    parser.add_argument("--memo", default=normalize_memo.DEFAULT_PATH,
+                        help="SQLite memo of earlier answers, keyed by canonical menu line")
+    parser.add_argument("--no-memo", action="store_true", help="don't read or write the memo")
+    parser.add_argument("--journal", help="answer journal to resume from (default: <output>.journal.jsonl)")
+    parser.add_argument("--no-fast-path", action="store_true",
+                        help="send every row to the LLM, even those the line parser resolves")
+    parser.add_argument("--events", default=llm_metrics.DEFAULT_PATH,
+                        help="JSONL file for per-call latency/token events ('' to disable)")
+    args = parser.parse_args()
+    MODEL = args.model
+    if args.api_base:
+        openai.api_base = args.api_base
+
     # Ensure the OpenAI API key is set
     if not openai.api_key:
         print("Error: OpenAI API key not found. Please set it in the .env file.")
         exit(1)
 
     # Process the CSV file
-    print(f"Processing file: {INPUT_FILE}")
-    process_csv(INPUT_FILE, OUTPUT_FILE)
-    print(f"Processed data saved to: {OUTPUT_FILE}")
\ No newline at end of file
+    if args.events:
+        llm_metrics.log.open(args.events)
+    print(f"Processing file: {args.input}")
+    try:
+        process_csv(args.input, args.output, args.batch_size, args.concurrency, args.retries,
+                    None if args.no_memo else args.memo, not args.no_fast_path, args.journal)
+    finally:
+        llm_metrics.log.close()
+    print(f"Processed data saved to: {args.output}")
+    if args.events:
+        print(f"Call metrics in {args.events}; run 'python llm_metrics.py {args.events}' for a report")
@@ -0,0 +1,107 @@
+# bench_extract_wines.py
+"""
+Benchmark for ``extract_wines_from_text``
+=========================================
+Times the original line loop (string buffer, 11-word substring check) against
+the current one (list buffer, single-pass ``wine_lexicon`` regex) on the text
+of saved HTML menus, and reports lines per second and entries found by each.
+
+Usage
+-----
+$ python bench_extract_wines.py ../Restaurant_Data/*_Menus/*.html [--repeat 5] [--scale 20]
+
+``--scale`` repeats each menu's text to simulate a long PDF menu.
+"""
+
+import argparse
+import os
+import re
+from html.parser import HTMLParser
+
+from script_utils import best_of, load_script
+
+
+class _TextCollector(HTMLParser):
+    """Visible text of a page, one line per text node (like ``get_text("\\n")``)."""
+
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("script", "style"):
+            self._skip += 1
+
+    def handle_endtag(self, tag):
+        if tag in ("script", "style") and self._skip:
+            self._skip -= 1
+
+    def handle_data(self, data):
+        if not self._skip and data.strip():
+            self.lines.append(data.strip())
+
+
+def page_text(path):
+    collector = _TextCollector()
+    with open(path, encoding="utf-8", errors="ignore") as fh:
+        collector.feed(fh.read())
+    return "\n".join(collector.lines)
+
+
+LEGACY_WORDS = ["chardonnay", "cabernet", "pinot", "riesling", "merlot",
+                "sauvignon", "rose", "sparkling", "bordeaux", "barolo", "tempranillo"]
+
+
+def legacy_extract(text, city, restaurant, section_re):
+    """The loop as it was before ``wine_lexicon``, kept for comparison."""
+    entries = []
+    section = ""
+    buffer = ""
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if section_re.search(line):
+            section = line.strip()
+            continue
+        buffer += (" " + line if buffer else line)
+        if re.search(r"\$\d+|\d{2}\s*$|[\.:;\-]\s*$", line) or len(buffer.split()) > 12:
+            if any(word in buffer.lower() for word in LEGACY_WORDS):
+                entries.append({"city": city, "restaurant": restaurant,
+                                "wine_section": section, "wine_name": buffer.strip()})
+            buffer = ""
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark extract_wines_from_text on saved menus")
+    parser.add_argument("menus", nargs="+", help="saved HTML menu files")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per version; the best is reported")
+    parser.add_argument("--scale", type=int, default=1, help="repeat each menu's text this many times")
+    args = parser.parse_args()
+
+    extractor = load_script("03_WineMenuExtractor.py", "wine_menu_extractor")
+    total_lines = 0
+    total_old = total_new = 0.0
+    found_old = found_new = 0
+    for path in args.menus:
+        text = "\n".join([page_text(path)] * args.scale)
+        n_lines = text.count("\n") + 1
+        old, old_rows = best_of(args.repeat, legacy_extract, text, "", "", extractor.WINE_SECTION_RE)
+        new, new_rows = best_of(args.repeat, extractor.extract_wines_from_text, text, "", "")
+        total_lines += n_lines
+        total_old += old
+        total_new += new
+        found_old += len(old_rows)
+        found_new += len(new_rows)
+        print(f"{os.path.basename(path)}: {n_lines} lines, "
+              f"old {old * 1000:.1f} ms ({len(old_rows)} wines), new {new * 1000:.1f} ms ({len(new_rows)} wines)")
+
+    print(f"Total: {total_lines} lines, old {total_lines / total_old:,.0f} lines/s, "
+          f"new {total_lines / total_new:,.0f} lines/s ({total_old / total_new:.2f}x the old speed); "
+          f"wines found {found_old} -> {found_new}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# bench_html_text.py
+"""
+Benchmark for menu HTML text extraction
+=======================================
+Times ``BeautifulSoup(html, "lxml").get_text("\\n", strip=True)`` (the old
+``extract_from_html`` path) against ``menu_html.html_lines`` on saved menus,
+and reports the time per MB plus how many lines and wine entries each
+produces.
+
+Usage
+-----
+$ python bench_html_text.py ../Restaurant_Data/*_Menus/*.html [--repeat 5]
+
+Without BeautifulSoup installed only the new path is timed.
+"""
+
+import argparse
+import os
+
+from menu_html import html_lines
+from script_utils import best_of, load_script
+
+
+def soup_lines(html):
+    from bs4 import BeautifulSoup
+
+    return BeautifulSoup(html, "lxml").get_text("\n", strip=True).splitlines()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTML-to-lines extraction on saved menus")
+    parser.add_argument("menus", nargs="+", help="saved HTML menu files")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per version; the best is reported")
+    args = parser.parse_args()
+
+    try:
+        import bs4  # noqa: F401
+        with_soup = True
+    except ImportError:
+        print("BeautifulSoup is not installed ('pip install beautifulsoup4 lxml'); timing html_lines only.")
+        with_soup = False
+
+    extractor = load_script("03_WineMenuExtractor.py", "wine_menu_extractor")
+    total_mb = total_old = total_new = 0.0
+    wines_old = wines_new = 0
+    for path in args.menus:
+        with open(path, encoding="utf-8", errors="replace") as fh:
+            html = fh.read()
+        mb = len(html.encode("utf-8")) / 2**20
+        total_mb += mb
+
+        new, lines = best_of(args.repeat, html_lines, html)
+        total_new += new
+        found = len(extractor.extract_wines_from_text("\n".join(lines), "", ""))
+        wines_new += found
+        report = f"{os.path.basename(path)} ({mb * 1024:.0f} KB): new {new * 1000:.1f} ms, {len(lines)} lines, {found} wines"
+
+        if with_soup:
+            old, old_lines = best_of(args.repeat, soup_lines, html)
+            total_old += old
+            old_found = len(extractor.extract_wines_from_text("\n".join(old_lines), "", ""))
+            wines_old += old_found
+            report += f" | soup {old * 1000:.1f} ms, {len(old_lines)} lines, {old_found} wines"
+        print(report)
+
+    summary = f"Total {total_mb:.1f} MB: html_lines {total_new / total_mb * 1000:.0f} ms/MB, {wines_new} wines"
+    if with_soup:
+        summary += (f"; soup {total_old / total_mb * 1000:.0f} ms/MB, {wines_old} wines "
+                    f"({total_old / total_new:.1f}x faster)")
+    print(summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# bench_parse_restaurants.py
+"""
+Benchmark for ``parse_restaurants``
+===================================
+Times the full-document parse against the targeted card-only parse on saved
+Eater list pages and checks that both return identical rows.
+
+Usage
+-----
+$ python bench_parse_restaurants.py saved_eater_page.html [more.html …] [--repeat 5]
+
+Save a page with e.g. ``curl -o boston.html https://boston.eater.com/maps/best-restaurants-boston-38``.
+``tests/fixtures/eater_city_page.html`` is a small page in the same markup.
+"""
+
+import argparse
+import os
+import sys
+
+from script_utils import best_of, load_script
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark parse_restaurants on saved Eater pages")
+    parser.add_argument("pages", nargs="+", help="saved Eater list HTML files")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per mode; the best is reported")
+    args = parser.parse_args()
+
+    scraper = load_script("01_RestaurantList.py", "restaurant_list")
+    total_full = total_fast = 0.0
+    for path in args.pages:
+        with open(path, encoding="utf-8") as fh:
+            html = fh.read()
+
+        full_rows = scraper.parse_restaurants(html, targeted=False)
+        fast_rows = scraper.parse_restaurants(html, targeted=True)
+        if full_rows != fast_rows:
+            print(f"❌ {path}: targeted parse differs from full parse", file=sys.stderr)
+            sys.exit(1)
+
+        full, _ = best_of(args.repeat, scraper.parse_restaurants, html, False)
+        fast, _ = best_of(args.repeat, scraper.parse_restaurants, html, True)
+        total_full += full
+        total_fast += fast
+        print(f"{os.path.basename(path)}: {len(fast_rows)} restaurants, "
+              f"full {full * 1000:.1f} ms, targeted {fast * 1000:.1f} ms, {full / fast:.1f}x")
+
+    print(f"Total: full {total_full * 1000:.1f} ms, targeted {total_fast * 1000:.1f} ms, "
+          f"{total_full / total_fast:.1f}x faster, identical output")
+
+
+if __name__ == "__main__":
+    main()
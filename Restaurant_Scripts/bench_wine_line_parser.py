@@ -0,0 +1,56 @@
+# bench_wine_line_parser.py
+"""
+Benchmark for ``wine_line_parser``
+==================================
+Parses every row of an extracted menu CSV with ``parse_row`` and reports
+lines per second, how many rows are fully resolved (and so skip the LLM in
+``04_cleandata0427.py``), and how often each field is filled in.
+
+Usage
+-----
+$ python bench_wine_line_parser.py [../Restaurant_Data/wine_menu_extracted.csv] [--repeat 5] [--scale 100]
+
+``--scale`` repeats the rows to time a larger crawl.
+"""
+
+import argparse
+import csv
+import os
+import time
+
+from wine_line_parser import ParsedLine, parse_row
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CSV = os.path.join(HERE, "..", "Restaurant_Data", "wine_menu_extracted.csv")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the deterministic wine line parser")
+    parser.add_argument("csv", nargs="?", default=DEFAULT_CSV, help="CSV written by 03_WineMenuExtractor.py")
+    parser.add_argument("--repeat", type=int, default=5, help="runs; the best is reported")
+    parser.add_argument("--scale", type=int, default=100, help="repeat the rows this many times")
+    args = parser.parse_args()
+
+    with open(args.csv, encoding="utf-8") as fh:
+        rows = list(csv.DictReader(fh))
+    workload = rows * args.scale
+
+    best = float("inf")
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        for row in workload:
+            parse_row(row)
+        best = min(best, time.perf_counter() - start)
+
+    parsed = [parse_row(row) for row in rows]
+    resolved = sum(p.resolved for p in parsed)
+    print(f"{len(workload)} lines in {best:.3f}s: {len(workload) / best:,.0f} lines/s "
+          f"({best / len(workload) * 1e6:.1f} µs/line)")
+    print(f"Fully resolved (no LLM call): {resolved}/{len(rows)} ({resolved / len(rows):.0%})")
+    for field in ParsedLine._fields:
+        filled = sum(bool(getattr(p, field)) for p in parsed)
+        print(f"  {field:<13} {filled:>5} ({filled / len(rows):.0%})")
+
+
+if __name__ == "__main__":
+    main()
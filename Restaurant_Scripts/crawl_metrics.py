@@ -0,0 +1,160 @@
+# crawl_metrics.py
+"""
+Crawl Timing Events
+===================
+Structured timing for the scraping scripts, written as one JSON object per
+line to ``data/crawl_events.jsonl``.
+
+Event kinds
+-----------
+``fetch``  one HTTP fetch: url, domain, stage, connect/TTFB/transfer/total ms,
+           bytes, status and outcome (``ok``, ``revalidated``, ``cache``,
+           ``throttled``, ``sniff-rejected``, ``error``)
+``parse``  one HTML parse: url, stage, bytes, parse ms
+``stage``  one heuristic step for a restaurant: stage name, duration, outcome
+
+Every event carries the run id and the heuristic stage active on its thread
+(``homepage``, ``direct link``, ``menu page``, ``pdf fallback``).
+
+Summary
+-------
+$ python crawl_metrics.py [data/crawl_events.jsonl] [--all-runs] [--top 10]
+
+prints p50/p95 latencies, the slowest domains and the time spent per stage
+for the latest run (or every run with ``--all-runs``).
+"""
+
+import argparse
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import urlparse
+
+from event_log import JsonlLog, load_events, ms as _ms, percentile
+
+DEFAULT_PATH = os.path.join("data", "crawl_events.jsonl")
+
+
+class EventLog(JsonlLog):
+    """Crawl event writer; every event also carries its thread's current stage."""
+
+    def __init__(self) -> None:
+        super().__init__(DEFAULT_PATH)
+        self._local = threading.local()
+
+    @property
+    def current_stage(self) -> str:
+        return getattr(self._local, "stage", "")
+
+    def context(self) -> dict:
+        return {"stage": self.current_stage}
+
+    def fetch(self, url: str, outcome: str, total: float, connect: float = 0.0,
+              ttfb: float = 0.0, n_bytes: int = 0, status: Optional[int] = None) -> None:
+        """Record one fetch; times are in seconds."""
+        self.emit(
+            "fetch", url=url, domain=urlparse(url).netloc.lower(), outcome=outcome,
+            status=status, bytes=n_bytes, connect_ms=_ms(connect), ttfb_ms=_ms(ttfb),
+            transfer_ms=_ms(max(0.0, total - connect - ttfb)), total_ms=_ms(total),
+        )
+
+    def parsed(self, url: str, n_bytes: int, seconds: float) -> None:
+        """Record an HTML parse timed elsewhere (e.g. in a worker process)."""
+        self.emit("parse", url=url, domain=urlparse(url).netloc.lower(), bytes=n_bytes,
+                  parse_ms=_ms(seconds))
+
+    @contextmanager
+    def parse(self, url: str, n_bytes: int) -> Iterator[None]:
+        """Time an HTML parse."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.parsed(url, n_bytes, time.perf_counter() - start)
+
+    @contextmanager
+    def stage(self, name: str, restaurant: str = "") -> Iterator[Dict[str, str]]:
+        """Mark *name* as this thread's stage and record how long it took.
+
+        The yielded dict's ``outcome`` can be set by the caller.
+        """
+        previous = self.current_stage
+        self._local.stage = name
+        info = {"outcome": ""}
+        start = time.perf_counter()
+        try:
+            yield info
+        finally:
+            self.emit("stage", restaurant=restaurant, duration_ms=_ms(time.perf_counter() - start),
+                      outcome=info["outcome"])
+            self._local.stage = previous
+
+
+log = EventLog()
+
+# ---------------------------------------------------------------------------
+# Summary command
+# ---------------------------------------------------------------------------
+
+def summarize(events: List[dict], top: int) -> str:
+    fetches = [e for e in events if e["kind"] == "fetch"]
+    network = [e for e in fetches if e["outcome"] != "cache"]
+    parses = [e for e in events if e["kind"] == "parse"]
+    stages = [e for e in events if e["kind"] == "stage"]
+    out: List[str] = []
+
+    out.append(f"Fetches: {len(fetches)} ({len(fetches) - len(network)} from cache), "
+               f"{sum(e['bytes'] for e in fetches) / 2**20:.1f} MB")
+    outcomes: Dict[str, int] = defaultdict(int)
+    for e in fetches:
+        outcomes[e["outcome"]] += 1
+    out.append("Outcomes: " + ", ".join(f"{k} {v}" for k, v in sorted(outcomes.items())))
+
+    out.append("")
+    out.append(f"{'network latency (ms)':<22}{'p50':>10}{'p95':>10}")
+    for field in ("connect_ms", "ttfb_ms", "transfer_ms", "total_ms"):
+        values = [e[field] for e in network]
+        out.append(f"{field[:-3]:<22}{percentile(values, 50):>10.0f}{percentile(values, 95):>10.0f}")
+    parse_ms = [e["parse_ms"] for e in parses]
+    out.append(f"{'parse':<22}{percentile(parse_ms, 50):>10.0f}{percentile(parse_ms, 95):>10.0f}")
+
+    by_domain: Dict[str, List[float]] = defaultdict(list)
+    for e in network:
+        by_domain[e["domain"]].append(e["total_ms"])
+    out.append("")
+    out.append(f"Slowest domains (top {top} by total fetch time)")
+    out.append(f"{'domain':<40}{'reqs':>6}{'total s':>10}{'p95 ms':>10}")
+    for domain, times in sorted(by_domain.items(), key=lambda kv: -sum(kv[1]))[:top]:
+        out.append(f"{domain[:39]:<40}{len(times):>6}{sum(times) / 1000:>10.1f}{percentile(times, 95):>10.0f}")
+
+    by_stage: Dict[str, List[float]] = defaultdict(list)
+    for e in stages:
+        by_stage[e["stage"]].append(e["duration_ms"])
+    out.append("")
+    out.append("Time per stage")
+    out.append(f"{'stage':<22}{'count':>7}{'total s':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for stage, times in sorted(by_stage.items(), key=lambda kv: -sum(kv[1])):
+        out.append(f"{stage:<22}{len(times):>7}{sum(times) / 1000:>10.1f}"
+                   f"{percentile(times, 50):>10.0f}{percentile(times, 95):>10.0f}")
+    return "\n".join(out)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Summarize crawl timing events")
+    parser.add_argument("path", nargs="?", default=DEFAULT_PATH, help="events JSONL file")
+    parser.add_argument("--all-runs", action="store_true", help="include every run, not just the latest")
+    parser.add_argument("--top", type=int, default=10, help="number of slow domains to list")
+    args = parser.parse_args()
+
+    events = load_events(args.path, args.all_runs)
+    if not events:
+        print(f"No events in {args.path}")
+        return
+    print(summarize(events, args.top))
+
+
+if __name__ == "__main__":
+    main()
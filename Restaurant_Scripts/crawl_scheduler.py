@@ -0,0 +1,176 @@
+# crawl_scheduler.py
+"""
+Polite Crawl Scheduler
+======================
+Per-domain rate limiting for ``02_WineList.py``.
+
+* Every host has a token bucket (``--rate`` requests per second, small burst).
+* Hosts on a shared hosting platform (Squarespace, Wix, Toast, BentoBox) also
+  draw from one bucket per platform (``--platform-rate``), because those
+  servers throttle by their own traffic, not by restaurant. The platform is
+  recognised from the host name or, for custom domains, from response headers.
+* ``429``/``503`` answers put the bucket on hold for the ``Retry-After``
+  period (or an exponential backoff when the header is missing). A host that
+  asks for more than ``MAX_RETRY_WAIT`` seconds is given up on for the rest of
+  the run: its buckets are held for ``MAX_RETRY_WAIT`` at most, and later
+  requests to it raise :class:`HostThrottled` instead of sleeping.
+* :meth:`DomainScheduler.ready_in` lets the crawl driver start whichever
+  restaurant's host can be served soonest, so idle capacity goes to other
+  hosts instead of waiting on a throttled one.
+"""
+
+import argparse
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Mapping, Optional
+from urllib.parse import urlparse
+
+DEFAULT_HOST_RATE = 2.0
+DEFAULT_PLATFORM_RATE = 6.0
+DEFAULT_BURST = 3
+MAX_RETRY_WAIT = 120.0
+
+PLATFORM_HOST_RES = {
+    "squarespace": re.compile(r"(?:^|\.)squarespace(?:-cdn)?\.com$", re.I),
+    "wix": re.compile(r"(?:^|\.)(?:wixsite|wix|wixstatic)\.com$", re.I),
+    "toast": re.compile(r"(?:^|\.)toasttab\.com$", re.I),
+    "bentobox": re.compile(r"(?:^|\.)(?:getbento|bentobox)\.com$", re.I),
+}
+
+# (header, substring of its value or "" for presence, platform)
+PLATFORM_HEADER_HINTS = (
+    ("server", "squarespace", "squarespace"),
+    ("x-wix-request-id", "", "wix"),
+    ("x-toast-request-id", "", "toast"),
+)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a ``Retry-After`` header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def positive_rate(value: str) -> float:
+    """``argparse`` type for ``--rate`` / ``--platform-rate``: a number of requests per second above 0."""
+    try:
+        rate = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{value!r} is not a number")
+    if not rate > 0:  # also rejects nan
+        raise argparse.ArgumentTypeError(f"must be greater than 0 requests per second, got {value}")
+    return rate
+
+
+class HostThrottled(Exception):
+    """Raised by :meth:`DomainScheduler.acquire` for a host that was given up on."""
+
+
+class TokenBucket:
+    """Classic token bucket with an optional hold (used for ``Retry-After``)."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.stamp = time.monotonic()
+        self.blocked_until = 0.0
+
+    def wait_time(self, now: float) -> float:
+        self.tokens = min(self.capacity, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+        wait = 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+        return max(wait, self.blocked_until - now)
+
+    def take(self) -> None:
+        self.tokens -= 1
+
+    def hold(self, until: float) -> None:
+        self.blocked_until = max(self.blocked_until, until)
+        self.tokens = 0.0
+
+
+class DomainScheduler:
+    """Thread-safe token buckets per host and per hosting platform."""
+
+    def __init__(self, host_rate: float = DEFAULT_HOST_RATE,
+                 platform_rate: float = DEFAULT_PLATFORM_RATE, burst: int = DEFAULT_BURST) -> None:
+        self.host_rate = host_rate
+        self.platform_rate = platform_rate
+        self.burst = burst
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._platforms: Dict[str, str] = {}
+        self._given_up: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _keys(self, url: str) -> List[str]:
+        host = urlparse(url).netloc.lower()
+        platform = self._platforms.get(host)
+        if platform is None:
+            platform = next((name for name, rx in PLATFORM_HOST_RES.items() if rx.search(host)), "")
+        return [host, f"platform:{platform}"] if platform else [host]
+
+    def _bucket(self, key: str) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            rate = self.platform_rate if key.startswith("platform:") else self.host_rate
+            bucket = self._buckets[key] = TokenBucket(rate, self.burst)
+        return bucket
+
+    def ready_in(self, url: str) -> float:
+        """Seconds until a request to *url* would be allowed (0 = now)."""
+        with self._lock:
+            now = time.monotonic()
+            return max(self._bucket(key).wait_time(now) for key in self._keys(url))
+
+    def acquire(self, url: str) -> None:
+        """Block until a request to *url* is allowed, then take its tokens.
+
+        Raises :class:`HostThrottled` if *url*'s host was given up on.
+        """
+        host = urlparse(url).netloc.lower()
+        while True:
+            with self._lock:
+                if host in self._given_up:
+                    raise HostThrottled(f"{host} asked to wait {self._given_up[host]:.0f}s; skipped for this run")
+                now = time.monotonic()
+                buckets = [self._bucket(key) for key in self._keys(url)]
+                wait = max(bucket.wait_time(now) for bucket in buckets)
+                if wait <= 0:
+                    for bucket in buckets:
+                        bucket.take()
+                    return
+            time.sleep(wait)
+
+    def backoff(self, url: str, seconds: float) -> None:
+        """Hold every bucket *url* draws from for *seconds*, at most ``MAX_RETRY_WAIT``.
+
+        A longer wait gives up on *url*'s host for the rest of the run.
+        """
+        with self._lock:
+            if seconds > MAX_RETRY_WAIT:
+                self._given_up[urlparse(url).netloc.lower()] = seconds
+            until = time.monotonic() + min(seconds, MAX_RETRY_WAIT)
+            for key in self._keys(url):
+                self._bucket(key).hold(until)
+
+    def observe(self, url: str, headers: Mapping[str, str]) -> None:
+        """Learn the hosting platform of *url*'s host from its response headers."""
+        host = urlparse(url).netloc.lower()
+        if host in self._platforms:
+            return
+        lowered = {k.lower(): v.lower() for k, v in headers.items()}
+        for header, needle, platform in PLATFORM_HEADER_HINTS:
+            if header in lowered and needle in lowered[header]:
+                with self._lock:
+                    self._platforms[host] = platform
+                return
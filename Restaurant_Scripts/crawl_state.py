@@ -0,0 +1,94 @@
+# crawl_state.py
+"""
+Crawl State Store
+=================
+Durable per-restaurant state for ``02_WineList.py``, kept in
+``data/wine_list_state.sqlite``.
+
+For every restaurant the store remembers the website, a fingerprint of its
+homepage links, the wine menu URL found, the status string and when it was
+recorded. Each result is committed as soon as the restaurant is finished, so
+a crashed run loses nothing:
+
+* ``--resume`` continues the last unfinished run and skips restaurants it
+  already completed;
+* restaurants whose homepage fingerprint is unchanged since their last
+  successful discovery reuse that result instead of being searched again.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+DEFAULT_PATH = os.path.join("data", "wine_list_state.sqlite")
+
+
+def restaurant_key(city: str, name: str) -> str:
+    """Stable identity of a restaurant across runs."""
+    return f"{city}|{name}"
+
+
+class CrawlState:
+    """SQLite-backed store of per-restaurant results and run bookkeeping."""
+
+    def __init__(self, path: str = DEFAULT_PATH) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS restaurants ("
+            " key TEXT PRIMARY KEY, name TEXT, city TEXT, website TEXT,"
+            " fingerprint TEXT, wine_menu_url TEXT, status TEXT,"
+            " updated_at REAL, run_id INTEGER)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS runs ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT, started_at REAL, finished_at REAL)"
+        )
+        self._db.commit()
+
+    def begin_run(self, resume: bool) -> int:
+        """Return the id of the run to record into, reusing an unfinished one on *resume*."""
+        with self._lock:
+            if resume:
+                row = self._db.execute(
+                    "SELECT id FROM runs WHERE finished_at IS NULL ORDER BY id DESC LIMIT 1"
+                ).fetchone()
+                if row:
+                    return row[0]
+            cur = self._db.execute("INSERT INTO runs (started_at) VALUES (?)", (time.time(),))
+            self._db.commit()
+            return cur.lastrowid
+
+    def finish_run(self, run_id: int) -> None:
+        with self._lock:
+            self._db.execute("UPDATE runs SET finished_at = ? WHERE id = ?", (time.time(), run_id))
+            self._db.commit()
+
+    def get(self, key: str) -> Optional[Dict[str, object]]:
+        with self._lock:
+            cur = self._db.execute(
+                "SELECT name, city, website, fingerprint, wine_menu_url, status, updated_at, run_id"
+                " FROM restaurants WHERE key = ?", (key,)
+            )
+            row = cur.fetchone()
+            if row is None:
+                return None
+            return dict(zip([c[0] for c in cur.description], row))
+
+    def record(self, key: str, result: Dict[str, str], fingerprint: str, run_id: int) -> None:
+        """Durably store one restaurant's output row."""
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO restaurants"
+                " (key, name, city, website, fingerprint, wine_menu_url, status, updated_at, run_id)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, result["name"], result["city"], result["website"], fingerprint,
+                 result["wine_menu_url"], result["status"], time.time(), run_id),
+            )
+            self._db.commit()
+
+    def close(self) -> None:
+        self._db.close()
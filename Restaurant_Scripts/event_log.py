@@ -0,0 +1,72 @@
+# event_log.py
+"""
+JSONL Event Log
+===============
+The pieces shared by ``crawl_metrics.py`` (scraping) and ``llm_metrics.py``
+(LLM enrichment): a thread-safe writer that appends one JSON object per line,
+tagged with its kind, run id and timestamp, and the helpers their report
+commands use to read the events back.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import List
+
+
+class JsonlLog:
+    """Thread-safe JSONL event writer; does nothing until :meth:`open` is called."""
+
+    def __init__(self, default_path: str) -> None:
+        self.default_path = default_path
+        self.run = ""
+        self._fh = None
+        self._lock = threading.Lock()
+
+    def open(self, path: str = "") -> None:
+        path = path or self.default_path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.run = time.strftime("%Y-%m-%dT%H:%M:%S")
+        self._fh = open(path, "a", encoding="utf-8")
+
+    def close(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def context(self) -> dict:
+        """Fields added to every event after kind, run and ts; subclasses extend this."""
+        return {}
+
+    def emit(self, kind: str, **fields) -> None:
+        if self._fh is None:
+            return
+        event = {"kind": kind, "run": self.run, "ts": round(time.time(), 3), **self.context(), **fields}
+        line = json.dumps(event, ensure_ascii=False)
+        with self._lock:
+            self._fh.write(line + "\n")
+            self._fh.flush()
+
+
+def ms(seconds: float) -> float:
+    return round(seconds * 1000, 1)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, min(len(ordered), round(pct / 100 * len(ordered) + 0.5)))
+    return ordered[rank - 1]
+
+
+def load_events(path: str, all_runs: bool) -> List[dict]:
+    """Events in *path*, only those of the latest run unless *all_runs*."""
+    with open(path, encoding="utf-8") as fh:
+        events = [json.loads(line) for line in fh if line.strip()]
+    if events and not all_runs:
+        latest = max(e.get("run", "") for e in events)
+        events = [e for e in events if e.get("run", "") == latest]
+    return events
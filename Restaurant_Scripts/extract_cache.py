@@ -0,0 +1,75 @@
+# extract_cache.py
+"""
+Menu Extraction Cache
+=====================
+Remembers what ``03_WineMenuExtractor.py`` extracted from each menu file, kept
+in ``data/extract_cache.sqlite``.
+
+Entries are keyed by the SHA-256 of the file's bytes plus the extractor
+version, so:
+
+* an unchanged menu is never parsed twice, whatever its name or folder;
+* editing a menu, or changing the extraction code or the wine lexicon (which
+  changes the version), re-extracts it.
+
+Each entry is stored without its city and restaurant (the caller adds them
+back), so the same file saved for two restaurants is shared.
+Rows left over from other extractor versions are dropped when the cache opens.
+``refresh=True`` ignores what is stored and overwrites it with fresh results.
+"""
+
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, List, Optional
+
+DEFAULT_PATH = os.path.join("data", "extract_cache.sqlite")
+
+Entry = Dict[str, str]
+
+
+class ExtractCache:
+    """SQLite store of extracted entries per (file hash, extractor version)."""
+
+    def __init__(self, version: str, path: str = DEFAULT_PATH, refresh: bool = False) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.version = version
+        self.path = path
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+        self._db = sqlite3.connect(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS menus ("
+            " digest TEXT, version TEXT, entries TEXT, updated_at REAL,"
+            " PRIMARY KEY (digest, version))"
+        )
+        self._db.execute("DELETE FROM menus WHERE version != ?", (version,))
+        self._db.commit()
+
+    def get(self, digest: str) -> Optional[List[Entry]]:
+        """Cached entries for a file hash, or ``None`` if it must be extracted."""
+        row = None
+        if not self.refresh:
+            row = self._db.execute(
+                "SELECT entries FROM menus WHERE digest = ? AND version = ?", (digest, self.version)
+            ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, digest: str, entries: List[Entry]) -> None:
+        self._db.execute(
+            "INSERT OR REPLACE INTO menus (digest, version, entries, updated_at) VALUES (?, ?, ?, ?)",
+            (digest, self.version, json.dumps(entries, ensure_ascii=False), time.time()),
+        )
+        self._db.commit()
+
+    def report(self) -> str:
+        return f"Extraction cache: {self.hits} files reused, {self.misses} extracted"
+
+    def close(self) -> None:
+        self._db.close()
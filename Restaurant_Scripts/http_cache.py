@@ -0,0 +1,256 @@
+# http_cache.py
+"""
+HTTP Response Cache
+===================
+Persistent on-disk cache shared by the scraping scripts
+(``01_RestaurantList.py`` and ``02_WineList.py``).
+
+* Bodies are stored content-addressed under ``data/http_cache/bodies/<sha256>``,
+  so identical pages served from several URLs are kept once.
+* An SQLite index maps each URL to its body, response headers, ``ETag`` and
+  ``Last-Modified``.
+* Entries younger than ``fresh_for`` seconds are answered straight from disk;
+  older ones are revalidated with ``If-None-Match`` / ``If-Modified-Since``
+  and a ``304`` reuses the stored body.
+* The total body size is capped; the least recently used entries are evicted.
+* ``offline=True`` answers from disk only and raises :class:`CacheMiss` for
+  anything that was never fetched.
+
+Each script plugs in its own *fetcher*: a callable ``fetcher(url, headers)``
+returning ``(status, headers, body)`` that returns status ``304`` instead of
+raising on a revalidation hit.
+
+Environment
+-----------
+``WINE_HTTP_CACHE_DIR``      cache folder (default ``data/http_cache``)
+``WINE_HTTP_CACHE_MAX_MB``   size cap in MB (default 500)
+``WINE_HTTP_CACHE_FRESH``    seconds an entry is served without revalidation (default 21600)
+``WINE_HTTP_CACHE_OFFLINE``  set to ``1`` for a cache-only run
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+Fetcher = Callable[[str, Dict[str, str]], Tuple[int, Dict[str, str], bytes]]
+
+DEFAULT_DIR = os.path.join("data", "http_cache")
+DEFAULT_MAX_BYTES = 500 * 1024 * 1024
+DEFAULT_FRESH_FOR = 6 * 60 * 60
+
+CHARSET_RE = re.compile(r"charset=([\w.:-]+)", re.I)
+
+
+class CacheMiss(Exception):
+    """Raised in offline mode when a URL has never been cached."""
+
+
+class CachedResponse:
+    """A stored response: status, lower-cased headers and raw body bytes."""
+
+    def __init__(self, url: str, status: int, headers: Dict[str, str], body: bytes,
+                 stored_at: float) -> None:
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.stored_at = stored_at
+
+    def header(self, name: str, default: str = "") -> str:
+        return self.headers.get(name.lower(), default)
+
+    def text(self) -> str:
+        """Decode the body using the charset from ``Content-Type`` (UTF-8 otherwise)."""
+        match = CHARSET_RE.search(self.header("content-type"))
+        encoding = match.group(1) if match else "utf-8"
+        try:
+            return self.body.decode(encoding, errors="replace")
+        except LookupError:
+            return self.body.decode("utf-8", errors="replace")
+
+
+class HttpCache:
+    """Content-addressed response cache with conditional revalidation and LRU eviction."""
+
+    def __init__(self, folder: str = DEFAULT_DIR, max_bytes: int = DEFAULT_MAX_BYTES,
+                 fresh_for: float = DEFAULT_FRESH_FOR, offline: bool = False,
+                 enabled: bool = True) -> None:
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.fresh_for = fresh_for
+        self.offline = offline
+        self.enabled = enabled
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+
+    # -- storage ------------------------------------------------------------
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(os.path.join(self.folder, "bodies"), exist_ok=True)
+            self._db = sqlite3.connect(os.path.join(self.folder, "index.sqlite"),
+                                       check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " url TEXT PRIMARY KEY, sha TEXT NOT NULL, status INTEGER NOT NULL,"
+                " headers TEXT NOT NULL, etag TEXT, last_modified TEXT,"
+                " size INTEGER NOT NULL, stored_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses(last_access)")
+            self._db.commit()
+        return self._db
+
+    def _body_path(self, sha: str) -> str:
+        return os.path.join(self.folder, "bodies", sha)
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        """Return the stored response for *url* (marking it recently used), or ``None``."""
+        with self._lock:
+            db = self._conn()
+            row = db.execute(
+                "SELECT sha, status, headers, stored_at FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            sha, status, headers, stored_at = row
+            try:
+                with open(self._body_path(sha), "rb") as fh:
+                    body = fh.read()
+            except OSError:
+                db.execute("DELETE FROM responses WHERE url = ?", (url,))
+                db.commit()
+                return None
+            db.execute("UPDATE responses SET last_access = ? WHERE url = ?", (time.time(), url))
+            db.commit()
+        return CachedResponse(url, status, json.loads(headers), body, stored_at)
+
+    def store(self, url: str, status: int, headers: Dict[str, str], body: bytes) -> CachedResponse:
+        """Save a fresh response for *url* and evict old entries if over the size cap."""
+        headers = {k.lower(): v for k, v in headers.items()}
+        sha = hashlib.sha256(body).hexdigest()
+        now = time.time()
+        with self._lock:
+            db = self._conn()
+            path = self._body_path(sha)
+            if not os.path.exists(path):
+                tmp = f"{path}.{threading.get_ident()}.tmp"
+                with open(tmp, "wb") as fh:
+                    fh.write(body)
+                os.replace(tmp, path)
+            previous = db.execute("SELECT sha FROM responses WHERE url = ?", (url,)).fetchone()
+            db.execute(
+                "INSERT OR REPLACE INTO responses"
+                " (url, sha, status, headers, etag, last_modified, size, stored_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, sha, status, json.dumps(headers), headers.get("etag"),
+                 headers.get("last-modified"), len(body), now, now),
+            )
+            if previous and previous[0] != sha:
+                self._drop_body_if_unused(previous[0])
+            db.commit()
+            self._evict()
+        return CachedResponse(url, status, headers, body, now)
+
+    def revalidated(self, entry: CachedResponse, headers: Dict[str, str]) -> CachedResponse:
+        """Record a ``304`` for *entry*: merge new headers and restart its freshness window."""
+        merged = dict(entry.headers)
+        merged.update({k.lower(): v for k, v in headers.items()})
+        now = time.time()
+        with self._lock:
+            db = self._conn()
+            db.execute(
+                "UPDATE responses SET headers = ?, etag = ?, last_modified = ?,"
+                " stored_at = ?, last_access = ? WHERE url = ?",
+                (json.dumps(merged), merged.get("etag"), merged.get("last-modified"),
+                 now, now, entry.url),
+            )
+            db.commit()
+        return CachedResponse(entry.url, entry.status, merged, entry.body, now)
+
+    def _drop_body_if_unused(self, sha: str) -> None:
+        db = self._conn()
+        if db.execute("SELECT 1 FROM responses WHERE sha = ? LIMIT 1", (sha,)).fetchone() is None:
+            try:
+                os.remove(self._body_path(sha))
+            except OSError:
+                pass
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            row = self._conn().execute(
+                "SELECT COALESCE(SUM(size), 0) FROM"
+                " (SELECT sha, MAX(size) AS size FROM responses GROUP BY sha)"
+            ).fetchone()
+        return int(row[0])
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the bodies fit under ``max_bytes``."""
+        total = self.total_bytes()
+        if total <= self.max_bytes:
+            return
+        db = self._conn()
+        for url, sha, size in db.execute(
+            "SELECT url, sha, size FROM responses ORDER BY last_access"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            db.execute("DELETE FROM responses WHERE url = ?", (url,))
+            if db.execute("SELECT 1 FROM responses WHERE sha = ? LIMIT 1", (sha,)).fetchone() is None:
+                self._drop_body_if_unused(sha)
+                total -= size
+        db.commit()
+
+    # -- fetching -----------------------------------------------------------
+
+    def is_fresh(self, entry: CachedResponse) -> bool:
+        return time.time() - entry.stored_at < self.fresh_for
+
+    @staticmethod
+    def validators(entry: CachedResponse) -> Dict[str, str]:
+        """Conditional request headers that let the server answer ``304``."""
+        headers: Dict[str, str] = {}
+        if entry.header("etag"):
+            headers["If-None-Match"] = entry.header("etag")
+        if entry.header("last-modified"):
+            headers["If-Modified-Since"] = entry.header("last-modified")
+        return headers
+
+    def fetch(self, url: str, fetcher: Fetcher) -> CachedResponse:
+        """Answer *url* from the cache, revalidating or fetching through *fetcher* as needed."""
+        if not self.enabled:
+            status, headers, body = fetcher(url, {})
+            return CachedResponse(url, status, {k.lower(): v for k, v in headers.items()},
+                                  body, time.time())
+
+        entry = self.get(url)
+        if entry is not None and (self.offline or self.is_fresh(entry)):
+            return entry
+        if self.offline:
+            raise CacheMiss(f"{url} is not cached (offline run)")
+
+        status, headers, body = fetcher(url, self.validators(entry) if entry else {})
+        if status == 304 and entry is not None:
+            return self.revalidated(entry, headers)
+        return self.store(url, status, headers, body)
+
+
+cache = HttpCache(
+    folder=os.environ.get("WINE_HTTP_CACHE_DIR", DEFAULT_DIR),
+    max_bytes=int(float(os.environ.get("WINE_HTTP_CACHE_MAX_MB", DEFAULT_MAX_BYTES / 2**20)) * 2**20),
+    fresh_for=float(os.environ.get("WINE_HTTP_CACHE_FRESH", DEFAULT_FRESH_FOR)),
+    offline=os.environ.get("WINE_HTTP_CACHE_OFFLINE", "") == "1",
+)
+
+
+def configure(offline: Optional[bool] = None, enabled: Optional[bool] = None) -> HttpCache:
+    """Apply command-line switches to the shared cache and return it."""
+    if offline is not None:
+        cache.offline = offline
+    if enabled is not None:
+        cache.enabled = enabled
+    return cache
@@ -0,0 +1,142 @@
+# link_ranker.py
+"""
+Link Ranker
+===========
+Scores the links on a restaurant page and drives the best-first menu crawl in
+``02_WineList.py``.
+
+Every anchor is extracted once per page and scored from precompiled
+patterns over its text, its URL path and its file type:
+
+* wine words (``wine``, ``vino``, ``by the glass`` …) score highest,
+* then drinks / beverage / bar words,
+* then generic menu words (``menu``, ``dinner``, ``lunch`` …),
+* PDFs get a small bonus so they are always candidates for the PDF fallback.
+
+Social, review and image links are dropped. :class:`Frontier` pops the best
+unvisited link first, with a penalty per hop away from the homepage, and
+:class:`CrawlBudget` caps how many pages and bytes one restaurant may cost.
+"""
+
+import heapq
+import re
+from typing import Iterable, List, NamedTuple, Optional, Set, Tuple
+from urllib.parse import urldefrag, urljoin, urlparse
+
+from bs4 import BeautifulSoup
+
+WINE_TERMS_RE = re.compile(r"wine|vino|\bvins?\b|by[\s_-]the[\s_-](?:glass|bottle)|sommelier|cellar", re.I)
+DRINK_TERMS_RE = re.compile(r"drinks?|beverages?|\bbar\b|cocktails?|happy", re.I)
+MENU_TERMS_RE = re.compile(r"menus?|dinner|lunch|brunch", re.I)
+SKIP_EXT_RE = re.compile(r"\.(?:jpe?g|png|gif|webp|svg|mp4|mov|zip|ics)$", re.I)
+SKIP_HOST_RE = re.compile(
+    r"(?:^|\.)(?:instagram|facebook|twitter|x|tiktok|youtube|yelp|linkedin|pinterest|google)\.com$", re.I
+)
+SKIP_SCHEMES = ("mailto:", "tel:", "javascript:", "sms:")
+
+HOP_PENALTY = 3
+
+
+class Anchor(NamedTuple):
+    url: str
+    text: str
+    score: int
+    wine: bool
+    pdf: bool
+
+
+def score_link(text: str, url: str) -> Tuple[int, bool, bool]:
+    """Return ``(score, mentions_wine, is_pdf)`` for a link."""
+    path = urlparse(url).path
+    is_pdf = path.lower().endswith(".pdf")
+    text_wine = bool(WINE_TERMS_RE.search(text))
+    path_wine = bool(WINE_TERMS_RE.search(path))
+
+    score = 0
+    if text_wine:
+        score += 10
+    if path_wine:
+        score += 8
+    if DRINK_TERMS_RE.search(text):
+        score += 5
+    if DRINK_TERMS_RE.search(path):
+        score += 4
+    if MENU_TERMS_RE.search(text):
+        score += 3
+    if MENU_TERMS_RE.search(path):
+        score += 2
+    if is_pdf:
+        score += 1
+    return score, text_wine or path_wine, is_pdf
+
+
+def extract_anchors(soup: BeautifulSoup, base_url: str) -> List[Anchor]:
+    """All useful, de-duplicated links on a page with their scores, in document order."""
+    anchors: List[Anchor] = []
+    seen: Set[str] = set()
+    for a in soup.find_all("a", href=True):
+        href = a["href"].strip()
+        if not href or href.startswith("#") or href.lower().startswith(SKIP_SCHEMES):
+            continue
+        url = urldefrag(urljoin(base_url, href))[0]
+        parsed = urlparse(url)
+        if url in seen or SKIP_HOST_RE.search(parsed.netloc) or SKIP_EXT_RE.search(parsed.path):
+            continue
+        seen.add(url)
+        text = a.get_text(" ", strip=True)
+        score, wine, pdf = score_link(text, url)
+        if score > 0:
+            anchors.append(Anchor(url, text, score, wine, pdf))
+    return anchors
+
+
+def best_wine_link(anchors: Iterable[Anchor]) -> Optional[Anchor]:
+    """The highest scoring link that names wine itself (first one on ties)."""
+    best: Optional[Anchor] = None
+    for anchor in anchors:
+        if anchor.wine and (best is None or anchor.score > best.score):
+            best = anchor
+    return best
+
+
+class Frontier:
+    """Priority queue of unvisited links, best score first, fewer hops first on ties."""
+
+    def __init__(self, visited: Iterable[str] = ()) -> None:
+        self._heap: List[Tuple[int, int, Anchor, int]] = []
+        self._seen: Set[str] = {urldefrag(url)[0] for url in visited}
+        self._order = 0
+
+    def push(self, anchors: Iterable[Anchor], depth: int) -> None:
+        for anchor in anchors:
+            if anchor.url in self._seen:
+                continue
+            self._seen.add(anchor.url)
+            priority = -(anchor.score - HOP_PENALTY * (depth - 1))
+            heapq.heappush(self._heap, (priority, self._order, anchor, depth))
+            self._order += 1
+
+    def pop(self) -> Tuple[Anchor, int]:
+        _, _, anchor, depth = heapq.heappop(self._heap)
+        return anchor, depth
+
+    def __bool__(self) -> bool:
+        return bool(self._heap)
+
+
+class CrawlBudget:
+    """Per-restaurant cap on pages fetched and bytes downloaded."""
+
+    def __init__(self, max_pages: int, max_bytes: int) -> None:
+        self.max_pages = max_pages
+        self.max_bytes = max_bytes
+        self.pages = 0
+        self.bytes = 0
+
+    def spend(self, n_bytes: int) -> None:
+        self.pages += 1
+        self.bytes += n_bytes
+
+    @property
+    def exhausted(self) -> bool:
+        return self.pages >= self.max_pages or self.bytes >= self.max_bytes
@@ -0,0 +1,178 @@
+# llm_metrics.py
+"""
+LLM Call Metrics
+================
+Per-call instrumentation for the enrichment step (``04_cleandata0427.py``),
+written as one JSON object per line to ``data/llm_events.jsonl``.
+
+Event kinds
+-----------
+``call``  one chat completion: model, attempt (0 = first try, 1+ = retries),
+          batch size, rows answered, queue wait and latency ms, prompt and
+          completion tokens, outcome (``ok``; ``partial``: some rows
+          answered; ``parse-error``: a reply with no usable row; ``error``:
+          the request failed), the input lines sent and the ones left
+          unanswered
+``run``   one ``process_csv`` run: input rows, rows sent to the model, batch
+          size, concurrency and wall time
+
+Report
+------
+$ python llm_metrics.py [data/llm_events.jsonl] [--all-runs] [--top 10]
+      [--prompt-price 0.03 --completion-price 0.06]
+
+prints throughput, p50/p99 latency, tokens and cost per 1k rows, a table per
+batch size (to tune ``--batch-size`` / ``--concurrency``) and the inputs that
+cost the most retries, failures and time. Prices are USD per 1k tokens; the
+defaults come from :data:`PRICES` for the logged model.
+"""
+
+import argparse
+import os
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from event_log import JsonlLog, load_events, ms as _ms, percentile
+
+DEFAULT_PATH = os.path.join("data", "llm_events.jsonl")
+OUTCOMES = ("ok", "partial", "parse-error", "error")  # always listed in the report, even at 0
+
+# USD per 1k (prompt, completion) tokens; override with --prompt-price / --completion-price
+PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4": (0.03, 0.06),
+    "gpt-4-turbo": (0.01, 0.03),
+    "gpt-4o": (0.0025, 0.01),
+    "gpt-4o-mini": (0.00015, 0.0006),
+    "gpt-3.5-turbo": (0.0005, 0.0015),
+}
+
+MAX_INPUT_CHARS = 160
+
+
+class CallLog(JsonlLog):
+    """JSONL writer for LLM call events; does nothing until :meth:`open` is called."""
+
+    def __init__(self) -> None:
+        super().__init__(DEFAULT_PATH)
+
+    def call(self, model: str, attempt: int, inputs: List[str], unanswered: List[str], outcome: str,
+             latency: float, wait: float = 0.0, usage: Optional[dict] = None, error: str = "") -> None:
+        """Record one chat completion; times are in seconds, *usage* is the API's token counts."""
+        usage = usage or {}
+        self.emit(
+            "call", model=model, attempt=attempt, batch=len(inputs), answered=len(inputs) - len(unanswered),
+            outcome=outcome, wait_ms=_ms(wait), latency_ms=_ms(latency),
+            prompt_tokens=int(usage.get("prompt_tokens", 0)), completion_tokens=int(usage.get("completion_tokens", 0)),
+            inputs=[text[:MAX_INPUT_CHARS] for text in inputs],
+            unanswered=[text[:MAX_INPUT_CHARS] for text in unanswered],
+            error=error[:300],
+        )
+
+    def finished(self, rows: int, sent: int, batch_size: int, concurrency: int, seconds: float) -> None:
+        """Record a whole run, for throughput and cost per row."""
+        self.emit("run", rows=rows, sent=sent, batch_size=batch_size, concurrency=concurrency,
+                  seconds=round(seconds, 3))
+
+
+log = CallLog()
+
+# ---------------------------------------------------------------------------
+# Report command
+# ---------------------------------------------------------------------------
+
+def call_cost(event: dict, prompt_price: Optional[float], completion_price: Optional[float]) -> float:
+    default_prompt, default_completion = PRICES.get(event.get("model", ""), (0.0, 0.0))
+    prompt = default_prompt if prompt_price is None else prompt_price
+    completion = default_completion if completion_price is None else completion_price
+    return (event["prompt_tokens"] * prompt + event["completion_tokens"] * completion) / 1000
+
+
+def summarize(events: List[dict], top: int, prompt_price: Optional[float] = None,
+              completion_price: Optional[float] = None) -> str:
+    calls = [e for e in events if e["kind"] == "call"]
+    runs = [e for e in events if e["kind"] == "run"]
+    out: List[str] = []
+
+    rows = sum(e["rows"] for e in runs)
+    sent = sum(e["sent"] for e in runs)
+    seconds = sum(e["seconds"] for e in runs)
+    retries = sum(1 for e in calls if e["attempt"] > 0)
+    answered = sum(e["answered"] for e in calls)
+    asked = sum(e["batch"] for e in calls)
+    prompt_tokens = sum(e["prompt_tokens"] for e in calls)
+    completion_tokens = sum(e["completion_tokens"] for e in calls)
+    cost = sum(call_cost(e, prompt_price, completion_price) for e in calls)
+
+    out.append(f"Runs: {len(runs)}, {rows} rows ({sent} sent to the model) in {seconds:.1f}s"
+               + (f" = {rows / seconds:.1f} rows/s, {sent / seconds:.1f} model rows/s" if seconds else ""))
+    out.append(f"Calls: {len(calls)} ({retries} retries); parse success {answered}/{asked} rows"
+               + (f" ({answered / asked:.0%})" if asked else ""))
+    outcomes: Dict[str, int] = {outcome: 0 for outcome in OUTCOMES}
+    for e in calls:
+        outcomes[e["outcome"]] = outcomes.get(e["outcome"], 0) + 1
+    out.append("Outcomes: " + ", ".join(f"{k} {v}" for k, v in outcomes.items()))
+    out.append(f"Tokens: {prompt_tokens} prompt + {completion_tokens} completion; cost ${cost:.2f}")
+    if rows:
+        out.append(f"Per 1k rows: ${cost / rows * 1000:.2f}, {(prompt_tokens + completion_tokens) / rows * 1000:,.0f} tokens"
+                   + (f" (per 1k rows sent: ${cost / sent * 1000:.2f})" if sent else ""))
+
+    latency = [e["latency_ms"] for e in calls]
+    wait = [e["wait_ms"] for e in calls]
+    out.append("")
+    out.append(f"{'per call (ms)':<22}{'p50':>10}{'p99':>10}{'max':>10}")
+    out.append(f"{'latency':<22}{percentile(latency, 50):>10.0f}{percentile(latency, 99):>10.0f}"
+               f"{max(latency, default=0):>10.0f}")
+    out.append(f"{'queue wait':<22}{percentile(wait, 50):>10.0f}{percentile(wait, 99):>10.0f}"
+               f"{max(wait, default=0):>10.0f}")
+
+    by_batch: Dict[int, List[dict]] = defaultdict(list)
+    for e in calls:
+        by_batch[e["batch"]].append(e)
+    out.append("")
+    out.append("By batch size")
+    out.append(f"{'batch':>6}{'calls':>7}{'p50 ms':>9}{'p99 ms':>9}{'ms/row':>8}{'tok/row':>9}{'parsed':>8}{'retry':>7}")
+    for size, group in sorted(by_batch.items()):
+        rows_asked = sum(e["batch"] for e in group)
+        tokens = sum(e["prompt_tokens"] + e["completion_tokens"] for e in group)
+        lat = [e["latency_ms"] for e in group]
+        out.append(f"{size:>6}{len(group):>7}{percentile(lat, 50):>9.0f}{percentile(lat, 99):>9.0f}"
+                   f"{sum(lat) / rows_asked:>8.0f}{tokens / rows_asked:>9.0f}"
+                   f"{sum(e['answered'] for e in group) / rows_asked:>8.0%}"
+                   f"{sum(e['attempt'] > 0 for e in group) / len(group):>7.0%}")
+
+    # an input shares its call's latency and tokens with the rest of its batch
+    per_input: Dict[str, List[float]] = defaultdict(lambda: [0, 0, 0.0])  # calls, failures, ms
+    for e in calls:
+        unanswered = set(e["unanswered"])
+        for text in e["inputs"]:
+            stats = per_input[text]
+            stats[0] += 1
+            stats[1] += text in unanswered
+            stats[2] += e["latency_ms"] / max(1, e["batch"])
+    worst = sorted(per_input.items(), key=lambda kv: (-kv[1][1], -kv[1][0], -kv[1][2]))[:top]
+    out.append("")
+    out.append(f"Worst inputs (top {top} by failed answers, then calls)")
+    out.append(f"{'calls':>6}{'failed':>7}{'ms':>8}  input")
+    for text, (n_calls, failures, ms) in worst:
+        out.append(f"{n_calls:>6}{failures:>7}{ms:>8.0f}  {text[:90]}")
+    return "\n".join(out)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Report LLM enrichment latency, tokens and cost")
+    parser.add_argument("path", nargs="?", default=DEFAULT_PATH, help="events JSONL file")
+    parser.add_argument("--all-runs", action="store_true", help="include every run, not just the latest")
+    parser.add_argument("--top", type=int, default=10, help="number of worst inputs to list")
+    parser.add_argument("--prompt-price", type=float, help="USD per 1k prompt tokens (default: by model)")
+    parser.add_argument("--completion-price", type=float, help="USD per 1k completion tokens (default: by model)")
+    args = parser.parse_args()
+
+    events = load_events(args.path, args.all_runs)
+    if not events:
+        print(f"No events in {args.path}")
+        return
+    print(summarize(events, args.top, args.prompt_price, args.completion_price))
+
+
+if __name__ == "__main__":
+    main()
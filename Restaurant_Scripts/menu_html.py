@@ -0,0 +1,125 @@
+# menu_html.py
+"""
+Menu HTML to Lines
+==================
+Turns a saved menu page into the lines ``03_WineMenuExtractor.py`` scans,
+without building a BeautifulSoup tree.
+
+* The page is streamed through lxml's HTML parser with a *target* object
+  (SAX-style callbacks; no tree is built). Without lxml the standard library
+  ``html.parser`` drives the same callbacks.
+* Text inside ``script``, ``style``, ``noscript``, ``nav``, ``footer`` and
+  similar non-content elements is dropped while parsing.
+* Lines break only at block boundaries (paragraphs, list items, table rows,
+  headings, ``<br>`` …). Inline markup such as ``<b>Chardonnay</b> Napa $18``
+  stays on one line, which ``get_text("\\n")`` would split in two; inline
+  elements other than text formatting are separated by a space, so
+  ``<span>Glass</span><span>$10</span>`` reads ``Glass $10``.
+"""
+
+import re
+from html.parser import HTMLParser
+from typing import List
+
+SKIP_TAGS = frozenset({
+    "script", "style", "noscript", "template", "nav", "footer", "head",
+    "svg", "iframe", "select", "button",
+})
+
+BLOCK_TAGS = frozenset({
+    "address", "article", "aside", "blockquote", "body", "br", "caption", "dd", "details",
+    "div", "dl", "dt", "fieldset", "figcaption", "figure", "form", "h1", "h2", "h3", "h4",
+    "h5", "h6", "header", "hr", "html", "label", "li", "main", "ol", "p", "pre", "section", "summary",
+    "table", "tbody", "tfoot", "thead", "tr", "ul",
+})
+
+# text-level formatting that may sit inside a word ("<b>R</b>osé"); every other
+# inline element (span, a, td …) is separated from its neighbours by a space
+PHRASE_TAGS = frozenset({"b", "i", "em", "strong", "u", "s", "small", "sup", "sub", "mark", "font"})
+
+SPACE_RE = re.compile(r"\s+")
+
+
+class LineCollector:
+    """Parser target: collects visible text and breaks lines at block tags."""
+
+    def __init__(self) -> None:
+        self.lines: List[str] = []
+        self._parts: List[str] = []
+        self._skip = 0
+
+    def _flush(self) -> None:
+        if self._parts:
+            line = SPACE_RE.sub(" ", "".join(self._parts)).strip()
+            if line:
+                self.lines.append(line)
+            self._parts = []
+
+    def start(self, tag: str, attrib=None) -> None:
+        if tag in SKIP_TAGS:
+            self._skip += 1
+        elif self._skip:
+            return
+        elif tag in BLOCK_TAGS:
+            self._flush()
+        elif tag not in PHRASE_TAGS:
+            self._parts.append(" ")
+
+    def end(self, tag: str) -> None:
+        if tag in SKIP_TAGS:
+            if self._skip:
+                self._skip -= 1
+        elif self._skip:
+            return
+        elif tag in BLOCK_TAGS:
+            self._flush()
+        elif tag not in PHRASE_TAGS:
+            self._parts.append(" ")
+
+    def data(self, text: str) -> None:
+        if not self._skip:
+            self._parts.append(text)
+
+    def close(self) -> List[str]:
+        self._flush()
+        return self.lines
+
+
+class _StdlibDriver(HTMLParser):
+    """Feeds ``html.parser`` events to a :class:`LineCollector`."""
+
+    def __init__(self, target: LineCollector) -> None:
+        super().__init__(convert_charrefs=True)
+        self.target = target
+
+    def handle_starttag(self, tag, attrs):
+        self.target.start(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        # <br/>, <hr/>: a boundary, never an open element
+        if tag not in SKIP_TAGS:
+            self.target.start(tag)
+
+    def handle_endtag(self, tag):
+        self.target.end(tag)
+
+    def handle_data(self, data):
+        self.target.data(data)
+
+
+def html_lines(markup: str) -> List[str]:
+    """Visible text lines of an HTML page, one per block."""
+    target = LineCollector()
+    if not markup.strip():
+        return []
+    try:
+        from lxml import etree
+    except ImportError:
+        driver = _StdlibDriver(target)
+        driver.feed(markup)
+        driver.close()
+        return target.close()
+
+    parser = etree.HTMLParser(target=target, remove_comments=True)
+    parser.feed(markup)
+    return parser.close()
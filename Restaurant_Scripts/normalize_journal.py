@@ -0,0 +1,74 @@
+# normalize_journal.py
+"""
+Normalization Journal
+=====================
+Append-only record of every LLM answer ``04_cleandata0427.py`` receives, so an
+interrupted run can be picked up without paying for the same rows again.
+
+Each finished row is one JSON line::
+
+    {"hash": "<sha256 of model + row input>", "status": "ok", "data": {...}, "at": 1718000000.0}
+
+``status`` is ``"ok"`` (``data`` holds the validated columns) or ``"failed"``
+(every retry failed; ``data`` is null). Lines are flushed and fsynced as soon
+as each reply is parsed, so what is on disk survives a crash or a kill. A
+line torn by a crash mid-write is ignored on load.
+
+On restart the caller skips rows whose hash has an ``ok`` entry and sends the
+rest again, failed ones included. Because rows are matched by the hash of
+their input (and the model), an edited or reordered input CSV is handled too.
+"""
+
+import hashlib
+import json
+import os
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+Record = Tuple[str, Optional[Dict[str, object]]]  # (status, data)
+
+
+def input_hash(model: str, text: str) -> str:
+    return hashlib.sha256(f"{model}\n{text}".encode("utf-8")).hexdigest()
+
+
+class Journal:
+    """JSONL journal of finished rows, keyed by input hash."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._fh = None
+
+    def load(self) -> Dict[str, Record]:
+        """The latest record per input hash (a later ``ok`` replaces an earlier ``failed``)."""
+        records: Dict[str, Record] = {}
+        if not os.path.exists(self.path):
+            return records
+        with open(self.path, encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    entry = json.loads(line)
+                    records[entry["hash"]] = (entry["status"], entry.get("data"))
+                except (ValueError, KeyError, TypeError):
+                    continue  # torn last line from a crash
+        return records
+
+    def append(self, entries: Iterable[Tuple[str, str, Optional[Dict[str, object]]]]) -> None:
+        """Durably append ``(hash, status, data)`` entries."""
+        if self._fh is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._fh = open(self.path, "a", encoding="utf-8")
+            if self._fh.tell():
+                # make sure a torn line from an earlier crash doesn't swallow the first new one
+                self._fh.write("\n")
+        now = time.time()
+        for row_hash, status, data in entries:
+            self._fh.write(json.dumps({"hash": row_hash, "status": status, "data": data, "at": now},
+                                      ensure_ascii=False) + "\n")
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+
+    def close(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
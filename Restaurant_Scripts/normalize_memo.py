@@ -0,0 +1,91 @@
+# normalize_memo.py
+"""
+Wine Normalization Memo
+=======================
+Remembers what the LLM in ``04_cleandata0427.py`` made of each menu line, kept
+in ``data/normalize_memo.sqlite``, so a wine is only paid for once however
+many menus and crawls it appears on.
+
+Lines are keyed by :func:`canonical_line`, which ignores case, accents,
+spacing, bullets, dashes, punctuation and prices, so
+``"• Gaspard — Chenin Blanc, Loire  $14"`` and ``"gaspard, chenin blanc loire 16"``
+share one entry. Vintages are kept (``2019`` and ``2020`` are different
+wines); a price is a ``$`` amount or the bare number(s) ending the line.
+
+Only fields that describe the wine are stored; the caller fills in the
+row-specific ones (city, restaurant, the original line and its prices).
+Entries are stored per model, so switching models does not reuse answers.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import time
+from typing import Dict, Iterable, Optional
+
+from wine_lexicon import fold
+
+DEFAULT_PATH = os.path.join("data", "normalize_memo.sqlite")
+
+Fields = Dict[str, object]
+
+PRICE = r"\d{1,4}(?:[.,]\d\d|\.)?"
+BARE_PRICE = r"\d{1,3}(?:[.,]\d\d|\.)?"  # no 4 digits: a year ending the line is a vintage
+PRICE_RE = re.compile(
+    rf"\$\s*{PRICE}(?:\s*/\s*\$?\s*{PRICE})*"                   # $14, $14/$56, $ 13
+    rf"|(?<![\w'‘’.,]){BARE_PRICE}(?:\s*/\s*{BARE_PRICE})*\s*$"  # a bare "14", "14/56" or "25./88." ending the line
+)
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def canonical_line(line: str) -> str:
+    """The memo key of a menu line: lower-case words without prices or punctuation."""
+    return " ".join(WORD_RE.findall(fold(PRICE_RE.sub(" ", line))))
+
+
+class NormalizeMemo:
+    """SQLite store of normalized wine fields per (canonical line, model)."""
+
+    def __init__(self, model: str, path: str = DEFAULT_PATH) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.model = model
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._db = sqlite3.connect(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS memo ("
+            " key TEXT, model TEXT, fields TEXT, updated_at REAL,"
+            " PRIMARY KEY (key, model))"
+        )
+        self._db.commit()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Fields]:
+        """Stored fields for every key that has them; counts hits and misses per key."""
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, Fields] = {}
+        for i in range(0, len(keys), 500):  # stay under SQLite's parameter limit
+            chunk = keys[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            for key, fields in self._db.execute(
+                f"SELECT key, fields FROM memo WHERE model = ? AND key IN ({marks})", (self.model, *chunk)
+            ):
+                found[key] = json.loads(fields)
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def get(self, key: str) -> Optional[Fields]:
+        return self.get_many([key]).get(key)
+
+    def put_many(self, entries: Dict[str, Fields]) -> None:
+        now = time.time()
+        self._db.executemany(
+            "INSERT OR REPLACE INTO memo (key, model, fields, updated_at) VALUES (?, ?, ?, ?)",
+            [(key, self.model, json.dumps(fields, ensure_ascii=False), now) for key, fields in entries.items()],
+        )
+        self._db.commit()
+
+    def close(self) -> None:
+        self._db.close()
@@ -0,0 +1,149 @@
+# ocr_cache.py
+"""
+OCR Result Cache
+================
+Persistent cache of Tesseract output, shared by ``pdf_text.py`` (the OCR
+fallback of ``03_WineMenuExtractor.py``) and ``extract_menu_pdf/extract.py``.
+
+* Entries are keyed by the SHA-256 of the PDF bytes, the page number
+  (1-based), the render DPI and the Tesseract config string, so the same
+  menu saved under another name or URL is still a hit, while a different
+  DPI or config is OCRed afresh.
+* Each entry holds the page text and the per-word confidences.
+* The total stored size is capped; least recently used pages are evicted.
+* The SQLite file is opened lazily and in WAL mode, so worker threads and
+  processes can share it.
+
+Environment
+-----------
+``WINE_OCR_CACHE``         cache file (default ``data/ocr_cache.sqlite``)
+``WINE_OCR_CACHE_MAX_MB``  size cap in MB (default 200)
+``WINE_OCR_CACHE_OFF``     set to ``1`` to disable the cache
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import List, NamedTuple, Optional
+
+DEFAULT_PATH = os.path.join("data", "ocr_cache.sqlite")
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+
+class OcrEntry(NamedTuple):
+    text: str
+    confidences: List[float]
+
+
+def pdf_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class OcrCache:
+    """SQLite store of OCR results per (PDF hash, page, DPI, config) with LRU eviction."""
+
+    def __init__(self, path: str = DEFAULT_PATH, max_bytes: int = DEFAULT_MAX_BYTES,
+                 enabled: bool = True) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                " pdf_sha TEXT NOT NULL, page INTEGER NOT NULL, dpi INTEGER NOT NULL,"
+                " config TEXT NOT NULL, text TEXT NOT NULL, confidences TEXT NOT NULL,"
+                " size INTEGER NOT NULL, last_access REAL NOT NULL,"
+                " PRIMARY KEY (pdf_sha, page, dpi, config))"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS pages_lru ON pages(last_access)")
+            self._db.commit()
+        return self._db
+
+    def has(self, pdf_sha: str, page: int, dpi: int, config: str) -> bool:
+        """True if the page is cached (does not count as a hit or mark it used)."""
+        if not self.enabled:
+            return False
+        with self._lock:
+            return self._conn().execute(
+                "SELECT 1 FROM pages WHERE pdf_sha = ? AND page = ? AND dpi = ? AND config = ?",
+                (pdf_sha, page, dpi, config),
+            ).fetchone() is not None
+
+    def get(self, pdf_sha: str, page: int, dpi: int, config: str) -> Optional[OcrEntry]:
+        """The cached OCR of a page (marking it recently used), or ``None``."""
+        if not self.enabled:
+            return None
+        key = (pdf_sha, page, dpi, config)
+        with self._lock:
+            db = self._conn()
+            row = db.execute(
+                "SELECT text, confidences FROM pages"
+                " WHERE pdf_sha = ? AND page = ? AND dpi = ? AND config = ?", key
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            db.execute(
+                "UPDATE pages SET last_access = ?"
+                " WHERE pdf_sha = ? AND page = ? AND dpi = ? AND config = ?", (time.time(), *key)
+            )
+            db.commit()
+        return OcrEntry(row[0], json.loads(row[1]))
+
+    def put(self, pdf_sha: str, page: int, dpi: int, config: str, text: str,
+            confidences: List[float]) -> None:
+        """Store a page's OCR and evict old pages if over the size cap."""
+        if not self.enabled:
+            return
+        conf_json = json.dumps([round(c, 1) for c in confidences])
+        size = len(text.encode("utf-8")) + len(conf_json)
+        with self._lock:
+            db = self._conn()
+            db.execute(
+                "INSERT OR REPLACE INTO pages"
+                " (pdf_sha, page, dpi, config, text, confidences, size, last_access)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (pdf_sha, page, dpi, config, text, conf_json, size, time.time()),
+            )
+            db.commit()
+            self._evict()
+
+    def total_bytes(self) -> int:
+        row = self._conn().execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()
+        return int(row[0])
+
+    def _evict(self) -> None:
+        """Drop least recently used pages until the cache fits under ``max_bytes``."""
+        total = self.total_bytes()
+        if total <= self.max_bytes:
+            return
+        db = self._conn()
+        for rowid, size in db.execute("SELECT rowid, size FROM pages ORDER BY last_access").fetchall():
+            if total <= self.max_bytes:
+                break
+            db.execute("DELETE FROM pages WHERE rowid = ?", (rowid,))
+            total -= size
+        db.commit()
+
+    def report(self) -> str:
+        return f"OCR cache: {self.hits} pages reused, {self.misses} OCRed"
+
+
+cache = OcrCache(
+    path=os.environ.get("WINE_OCR_CACHE", DEFAULT_PATH),
+    max_bytes=int(float(os.environ.get("WINE_OCR_CACHE_MAX_MB", DEFAULT_MAX_BYTES / 2**20)) * 2**20),
+    enabled=os.environ.get("WINE_OCR_CACHE_OFF", "") != "1",
+)
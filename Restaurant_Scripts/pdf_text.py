@@ -0,0 +1,148 @@
+# pdf_text.py
+"""
+PDF Menu Text
+=============
+One way to get text out of a menu PDF, used by ``03_WineMenuExtractor.py``.
+
+* The embedded text layer is read lazily, one page at a time, with PyPDF2.
+* A page whose text layer is empty or garbage (scanned image, broken font
+  encoding, ``(cid:12)`` runs …) is rendered on its own with pdf2image and
+  read with Tesseract. Text PDFs never pay for OCR, and scanned menus are
+  not lost.
+* OCR runs in a thread pool while later pages are still being read: the
+  ``pdftoppm`` and ``tesseract`` subprocesses do the work, so threads give
+  real parallelism across pages.
+* OCR results are kept in ``ocr_cache.py`` by PDF hash, page, DPI and
+  Tesseract config, so a menu is only ever OCRed once.
+
+Requirements
+------------
+``pip install PyPDF2`` for the text layer; OCR additionally needs
+``pip install pdf2image pytesseract`` plus the poppler and tesseract binaries.
+"""
+
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import ocr_cache
+from ocr_cache import OcrEntry
+from script_utils import file_digest
+
+DEFAULT_OCR_WORKERS = 2
+OCR_DPI = 300
+TESSERACT_CONFIG = "--psm 6"
+
+# a usable text layer has at least this much real text on the page
+MIN_TEXT_CHARS = 20
+MIN_WORDS = 3
+MIN_LETTER_RATIO = 0.5
+MAX_JUNK_RATIO = 0.1
+
+WORD_RE = re.compile(r"[^\W\d_]{2,}")
+CID_RE = re.compile(r"\(cid:\d+\)")
+
+
+class PageText(NamedTuple):
+    index: int
+    text: str
+    source: str  # "text" or "ocr"
+
+
+def is_usable(text: str) -> bool:
+    """True if a page's text layer looks like real text worth using."""
+    body = "".join(text.split())
+    if len(body) < MIN_TEXT_CHARS:
+        return False
+    junk = sum(len(cid) for cid in CID_RE.findall(text)) + body.count("\ufffd")
+    if junk / len(body) > MAX_JUNK_RATIO:
+        return False
+    letters = sum(ch.isalpha() for ch in body)
+    return letters / len(body) >= MIN_LETTER_RATIO and len(WORD_RE.findall(text)) >= MIN_WORDS
+
+
+def ocr_image(img) -> Tuple[str, List[float]]:
+    """OCR an image; return its text (one line per Tesseract line) and per-word confidences."""
+    import pytesseract
+
+    data = pytesseract.image_to_data(img, config=TESSERACT_CONFIG, output_type=pytesseract.Output.DICT)
+    lines: Dict[Tuple[int, int, int], List[str]] = {}
+    confidences: List[float] = []
+    for i, word in enumerate(data["text"]):
+        if not word.strip():
+            continue
+        key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+        lines.setdefault(key, []).append(word)
+        conf = float(data["conf"][i])
+        if conf >= 0:
+            confidences.append(conf)
+    return "\n".join(" ".join(words) for words in lines.values()), confidences
+
+
+def ocr_page(path: str, index: int, dpi: int = OCR_DPI, pdf_sha: Optional[str] = None) -> OcrEntry:
+    """Render page *index* (0-based) alone and OCR it, reusing a cached result if there is one."""
+    pdf_sha = pdf_sha or file_digest(path)
+    cached = ocr_cache.cache.get(pdf_sha, index + 1, dpi, TESSERACT_CONFIG)
+    if cached is not None:
+        return cached
+
+    from pdf2image import convert_from_path
+
+    text_parts: List[str] = []
+    confidences: List[float] = []
+    for img in convert_from_path(path, dpi=dpi, first_page=index + 1, last_page=index + 1):
+        text, page_confidences = ocr_image(img)
+        text_parts.append(text)
+        confidences.extend(page_confidences)
+    entry = OcrEntry("\n".join(text_parts), confidences)
+    ocr_cache.cache.put(pdf_sha, index + 1, dpi, TESSERACT_CONFIG, entry.text, entry.confidences)
+    return entry
+
+
+def _text_layer(page) -> str:
+    try:
+        return page.extract_text() or ""
+    except Exception:
+        # broken content streams are treated like pages without text
+        return ""
+
+
+def text_layer_pages(path: str) -> List[str]:
+    """The text layer of every page, ``""`` where it is not usable. No OCR."""
+    import PyPDF2
+
+    with open(path, "rb") as f:
+        reader = PyPDF2.PdfReader(f)
+        texts = [_text_layer(page) for page in reader.pages]
+    return [text if is_usable(text) else "" for text in texts]
+
+
+def pdf_pages(path: str, ocr_workers: int = DEFAULT_OCR_WORKERS) -> List[PageText]:
+    """Text of every page, from the text layer or from OCR where that is unusable.
+
+    Raises ``ImportError`` when a page needs OCR but pdf2image/pytesseract are
+    missing, so a partial result is never mistaken for a complete one.
+    """
+    import PyPDF2
+
+    pages: List[PageText] = []
+    pending = {}
+    pdf_sha = None
+    with open(path, "rb") as f, ThreadPoolExecutor(max_workers=max(1, ocr_workers)) as pool:
+        reader = PyPDF2.PdfReader(f)
+        for index, page in enumerate(reader.pages):
+            text = _text_layer(page)
+            if is_usable(text):
+                pages.append(PageText(index, text, "text"))
+            else:
+                pdf_sha = pdf_sha or file_digest(path)
+                pending[index] = pool.submit(ocr_page, path, index, OCR_DPI, pdf_sha)
+        for index, future in pending.items():
+            pages.append(PageText(index, future.result().text, "ocr"))
+    pages.sort(key=lambda p: p.index)
+    return pages
+
+
+def pdf_text(path: str, ocr_workers: int = DEFAULT_OCR_WORKERS) -> str:
+    """The whole PDF as one string, pages in order."""
+    return "\n".join(page.text for page in pdf_pages(path, ocr_workers))
@@ -0,0 +1,58 @@
+# script_utils.py
+"""
+Script Helpers
+==============
+Small helpers shared by the pipeline scripts, their caches and the
+``bench_*.py`` benchmarks:
+
+* :func:`load_script` imports a numbered script such as
+  ``03_WineMenuExtractor.py``, whose file name is not a valid module name.
+* :func:`best_of` times a call several times and keeps the fastest run.
+* :func:`file_digest` hashes a file's contents for the content-keyed caches
+  (``extract_cache.py``, ``ocr_cache.py``).
+"""
+
+import hashlib
+import importlib.util
+import os
+import sys
+import time
+from typing import Any, Callable, Tuple
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def load_script(filename: str, name: str):
+    """Import ``Restaurant_Scripts/<filename>`` as module *name* (once per process)."""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, os.path.join(HERE, filename))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return module
+
+
+def best_of(repeat: int, fn: Callable[..., Any], *args) -> Tuple[float, Any]:
+    """Run ``fn(*args)`` *repeat* times; return the fastest time in seconds and the last result."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 of a file's contents, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
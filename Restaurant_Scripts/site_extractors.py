@@ -0,0 +1,234 @@
+# site_extractors.py
+"""
+Site Extractors
+===============
+Structured wine extractors for menu layouts we know, used by
+``03_WineMenuExtractor.py`` before its generic line heuristic.
+
+Each extractor is registered with the domains it is written for and/or a
+*fingerprint*, a precompiled pattern that recognises its layout anywhere
+(menu platforms serve many restaurants from the same markup). Dispatch is
+one pass over the registry:
+
+1. the page's own URL (``<link rel="canonical">`` / ``og:url``) against the
+   registered domains;
+2. the raw HTML against the HTML fingerprints (no parsing needed to decide);
+3. the page's text lines against the text fingerprints (also used for PDFs).
+
+The matching extractor returns rows with producer, vintage, region, country
+and glass/bottle prices filled in directly. If nothing matches, or the
+extractor finds no wines, the caller falls back to the generic heuristic.
+
+Registered extractors
+---------------------
+``spothopper``     SpotHopper "food-menu-grid" pages (e.g. Si Cara): one
+                   ``food-item-holder`` per wine, sections named by ``<h2>``
+``vintage_lines``  text lists written as ``‘22 Producer, Wine, Region CC 15``
+                   (e.g. La Royal, Moeca)
+
+Add a site with ``@register(...)`` on a function taking the page markup
+(``kind="html"``) or its text lines (``kind="text"``) and returning rows.
+"""
+
+import re
+from typing import Callable, Dict, List, NamedTuple, Optional, Pattern, Sequence, Tuple
+from urllib.parse import urlparse
+
+import soupsieve as sv
+from bs4 import BeautifulSoup
+
+Row = Dict[str, str]
+
+# columns the structured extractors fill in, besides wine_section / wine_name
+STRUCTURED_FIELDS = ["producer", "vintage", "region", "country", "price_glass", "price_bottle"]
+
+
+class SiteExtractor(NamedTuple):
+    name: str
+    kind: str  # "html" or "text"
+    domains: Tuple[str, ...]
+    fingerprint: Optional[Pattern]
+    min_hits: int
+    extract: Callable
+
+
+REGISTRY: List[SiteExtractor] = []
+
+
+def register(name: str, kind: str, domains: Sequence[str] = (), fingerprint: Optional[str] = None,
+             min_hits: int = 1, flags: int = 0):
+    """Decorator adding an extractor to :data:`REGISTRY`."""
+    def decorator(fn: Callable) -> Callable:
+        pattern = re.compile(fingerprint, flags) if fingerprint else None
+        REGISTRY.append(SiteExtractor(name, kind, tuple(domains), pattern, min_hits, fn))
+        return fn
+    return decorator
+
+
+# ---------------------------------------------------------------------------
+# Dispatch
+# ---------------------------------------------------------------------------
+
+PAGE_URL_RE = re.compile(
+    r"""<link[^>]+rel=["']canonical["'][^>]*href=["']([^"']+)"""
+    r"""|<meta[^>]+property=["']og:url["'][^>]*content=["']([^"']+)""",
+    re.I,
+)
+
+
+def page_domain(html: str) -> str:
+    """Host of the page's canonical URL (``""`` if it does not declare one)."""
+    match = PAGE_URL_RE.search(html)
+    if not match:
+        return ""
+    host = urlparse(match.group(1) or match.group(2)).netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def _fingerprint_hits(extractor: SiteExtractor, content: str) -> bool:
+    if extractor.fingerprint is None:
+        return False
+    hits = 0
+    for _ in extractor.fingerprint.finditer(content):
+        hits += 1
+        if hits >= extractor.min_hits:
+            return True
+    return False
+
+
+def for_domain(domain: str) -> Optional[SiteExtractor]:
+    if not domain:
+        return None
+    for extractor in REGISTRY:
+        if any(domain == d or domain.endswith("." + d) for d in extractor.domains):
+            return extractor
+    return None
+
+
+def for_content(kind: str, content: str) -> Optional[SiteExtractor]:
+    for extractor in REGISTRY:
+        if extractor.kind == kind and _fingerprint_hits(extractor, content):
+            return extractor
+    return None
+
+
+def make_row(section: str, name: str, **fields: str) -> Row:
+    row = {"wine_section": section, "wine_name": name}
+    row.update({field: fields.get(field, "") for field in STRUCTURED_FIELDS})
+    return row
+
+
+# ---------------------------------------------------------------------------
+# SpotHopper menu grids (from extract_menu_pdf/03_SiCara.py and drafts/03_LaRoyal.py)
+# ---------------------------------------------------------------------------
+
+SH_SECTION = sv.compile("div.food-menu-grid-item section")
+SH_HEADER = sv.compile("h2")
+SH_ITEM = sv.compile("div.food-item-holder")
+SH_TITLE = sv.compile("div.food-item-title h3")
+SH_PRICE = sv.compile("div.food-price")
+SH_DESCRIPTION = sv.compile("div.food-item-description")
+
+WINE_CATEGORY_RE = re.compile(
+    r"wine|\bred\b|white|sparkling|ros[eé]|orange|bubbl|champagne|by the (?:glass|bottle)", re.I
+)
+PRICE_VALUE_RE = re.compile(r"\d+(?:\.\d\d)?")  # "$14.00/Glass" -> "14.00"
+
+
+def _split_description(description: str) -> Tuple[str, str, str]:
+    """``"Grape, Region, Country"`` → (grape, region, country); the last part is the country."""
+    parts = [p.strip() for p in description.split(",") if p.strip()]
+    if len(parts) >= 3:
+        return parts[0], ", ".join(parts[1:-1]), parts[-1]
+    if len(parts) == 2:
+        return parts[0], "", parts[1]
+    return (parts[0] if parts else ""), "", ""
+
+
+@register("spothopper", "html", domains=["sicarapizza.com"],
+          fingerprint=r"""class=["']food-item-holder["']""")
+def spothopper(html: str) -> List[Row]:
+    soup = BeautifulSoup(html, "html.parser")
+    out: List[Row] = []
+    for section in SH_SECTION.select(soup):
+        header = SH_HEADER.select_one(section)
+        category = header.get_text(strip=True) if header else ""
+        if not WINE_CATEGORY_RE.search(category):
+            continue
+        for item in SH_ITEM.select(section):
+            title = SH_TITLE.select_one(item)
+            if title is None:
+                continue
+            producer = title.get_text(strip=True)
+
+            glass = bottle = ""
+            for price in SH_PRICE.select(item):
+                text = price.get_text(strip=True)
+                number = PRICE_VALUE_RE.search(text)
+                if number is None:
+                    continue
+                value = number.group()
+                if "bottle" in text.lower() or "multiple-price" in price.get("class", []):
+                    bottle = value
+                else:
+                    glass = value
+
+            desc = SH_DESCRIPTION.select_one(item)
+            description = desc.get_text(strip=True) if desc else ""
+            _, region, country = _split_description(description)
+            name = f"{producer}, {description}" if description else producer
+            out.append(make_row(category, name, producer=producer, region=region, country=country,
+                            price_glass=glass, price_bottle=bottle))
+    return out
+
+
+# ---------------------------------------------------------------------------
+# "‘22 Producer, Wine, Region CC 15" lists (from drafts/draft_03_Moeca.py)
+# ---------------------------------------------------------------------------
+
+CATEGORY_HEADINGS = ("SPARKLING", "WHITE", "RED", "ROSE", "ROSÉ", "ORANGE", "DESSERT", "SKIN CONTACT")
+VINTAGE_LINE_RE = re.compile(
+    rf"^(?:(?P<heading>{'|'.join(CATEGORY_HEADINGS)})\s+)?\$?\s*[‘'’]?(?P<vintage>\d{{2}}|NV)\s+"
+    r"(?P<producer>[^,]+),\s*(?P<wine>[^,]+?),\s*(?P<region>[^,]*?)\s*(?P<country>\b[A-Z]{2})"
+    r"\s+\$?(?P<price>\d+(?:\.\d\d)?)(?:\s*/\s*\$?(?P<bottle>\d+(?:\.\d\d)?))?\s*$",
+    re.M,
+)
+SERVING_RE = re.compile(r"\b(half bottle|by the glass|by the bottle)\b", re.I)
+
+
+@register("vintage_lines", "text", domains=["laroyalcambridge.com"],
+          fingerprint=VINTAGE_LINE_RE.pattern, min_hits=3, flags=re.M)
+def vintage_lines(lines: List[str]) -> List[Row]:
+    serving = "by the glass"
+    category = ""
+    out: List[Row] = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if line.upper() in CATEGORY_HEADINGS:
+            category = line.upper()
+            continue
+        serving_match = SERVING_RE.search(line)
+        if serving_match and len(line) < 40:
+            serving = serving_match.group(1).lower()
+            continue
+
+        m = VINTAGE_LINE_RE.match(line)
+        if not m:
+            continue
+        if m.group("heading"):
+            category = m.group("heading")
+        price, bottle = m.group("price"), m.group("bottle") or ""
+        if bottle:
+            glass = price
+        elif "bottle" in serving:
+            glass, bottle = "", price
+        else:
+            glass = price
+        name = line[m.end("heading"):] if m.group("heading") else line
+        out.append(make_row(f"{serving} {category}".strip(), name.strip().lstrip("$").strip(),
+                            producer=m.group("producer").strip(), vintage=m.group("vintage"),
+                            region=m.group("region").strip(), country=m.group("country"),
+                            price_glass=glass, price_bottle=bottle))
+    return out
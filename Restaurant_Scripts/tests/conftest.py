@@ -0,0 +1,13 @@
+# conftest.py
+"""
+Shared test setup: the scripts import each other as top-level modules
+(``import crawl_scheduler``), so their folder goes on ``sys.path``. Numbered
+scripts (``02_WineList.py``) are imported with ``script_utils.load_script``.
+"""
+
+import os
+import sys
+
+SCRIPTS = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS not in sys.path:
+    sys.path.insert(0, SCRIPTS)
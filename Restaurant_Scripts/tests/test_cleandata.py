@@ -0,0 +1,226 @@
+import csv
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("openai")
+pytest.importorskip("dotenv")
+
+import llm_metrics
+from script_utils import load_script
+
+cleandata = load_script("04_cleandata0427.py", "cleandata")
+
+ROWS_RE = re.compile(r"^Rows: (\[.*\])$", re.M)
+LINES = [
+    "Tolpuddle Pinot Noir, Tasmania, Australia 2021   200",
+    "Movia Cabernet Sauvignon, Brda, Slovenia, 2019   80",
+]
+
+
+def write_input(path, lines=LINES):
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.DictWriter(fh, fieldnames=["city", "restaurant", "wine_section", "wine_name"])
+        writer.writeheader()
+        for line in lines:
+            writer.writerow({"city": "Austin", "restaurant": "Nido", "wine_section": "Red", "wine_name": line})
+
+
+def answer(row_id, brand="Producer"):
+    return {"id": row_id, **cleandata.empty_row(), "Brand": brand, "Sources": []}
+
+
+def null_answer(row_id):
+    return {"id": row_id, **cleandata.empty_row(), "Sources": []}
+
+
+class FakeModel:
+    """Stands in for ``openai.ChatCompletion.acreate``; *reply* maps a batch's ids to reply objects."""
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.sent = []
+
+    async def __call__(self, model, messages, temperature):
+        ids = [item["id"] for item in json.loads(ROWS_RE.search(messages[0]["content"]).group(1))]
+        self.sent.append(ids)
+        content = json.dumps([self.reply(row_id) for row_id in ids])
+        return {"choices": [{"message": {"content": content}}], "usage": {}}
+
+
+@pytest.fixture
+def run(tmp_path, monkeypatch):
+    monkeypatch.setattr(cleandata, "BACKOFF_BASE", 0.0)
+    src, out = tmp_path / "in.csv", tmp_path / "out.csv"
+    write_input(src)
+
+    def run(reply, retries=0):
+        model = FakeModel(reply)
+        monkeypatch.setattr(cleandata.openai.ChatCompletion, "acreate", model)
+        cleandata.process_csv(str(src), str(out), retries=retries, memo_path=None, fast_path=False)
+        with open(out, encoding="utf-8") as fh:
+            return model, list(csv.DictReader(fh))
+
+    return run, out
+
+
+def journal_statuses(out):
+    with open(f"{out}.journal.jsonl", encoding="utf-8") as fh:
+        return [json.loads(line)["status"] for line in fh if line.strip()]
+
+
+def test_all_null_answers_are_journaled_as_failed_and_resent(run):
+    run, out = run
+    run(null_answer)
+    assert journal_statuses(out) == ["failed", "failed"]
+
+    model, rows = run(answer)
+    assert sorted(sum(model.sent, [])) == [0, 1]
+    assert [row["Brand"] for row in rows] == ["Producer", "Producer"]
+
+
+def test_all_null_ok_entries_from_an_older_journal_are_resent(run):
+    run, out = run
+    run(null_answer)
+    with open(f"{out}.journal.jsonl", encoding="utf-8") as fh:
+        entries = [json.loads(line) for line in fh if line.strip()]
+    with open(f"{out}.journal.jsonl", "w", encoding="utf-8") as fh:
+        for entry in entries:
+            fh.write(json.dumps({**entry, "status": "ok"}) + "\n")
+
+    model, _ = run(answer)
+    assert sorted(sum(model.sent, [])) == [0, 1]
+
+
+class StubServer:
+    """OpenAI-compatible ``/chat/completions`` endpoint answering from a script of replies.
+
+    Each reply is a function of the request's row ids returning ``(status, body)``; the
+    last one is repeated once the script runs out.
+    """
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                prompt = body["messages"][0]["content"]
+                ids = [item["id"] for item in json.loads(ROWS_RE.search(prompt).group(1))]
+                stub.requests.append(ids)
+                reply = stub.replies[min(len(stub.requests), len(stub.replies)) - 1]
+                status, payload = reply(ids)
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def completion(content):
+    return 200, {"choices": [{"message": {"role": "assistant", "content": content}}],
+                 "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}}
+
+
+def rows_reply(make=answer, only=None, extra=()):
+    def reply(ids):
+        chosen = [i for i in ids if only is None or i in only]
+        return completion(json.dumps([make(i) for i in chosen] + [make(i) for i in extra]))
+    return reply
+
+
+def server_error(ids):
+    return 500, {"error": {"message": "overloaded", "type": "server_error"}}
+
+
+def malformed(ids):
+    return completion('[{"id": 0, "Brand": ')
+
+
+@pytest.fixture
+def stub_run(tmp_path, monkeypatch):
+    """``process_csv`` against a :class:`StubServer`; returns ``(server, output rows)``."""
+    monkeypatch.setattr(cleandata, "BACKOFF_BASE", 0.01)
+    monkeypatch.setattr(cleandata.openai, "api_key", "test-key")
+    src, out = tmp_path / "in.csv", tmp_path / "out.csv"
+    write_input(src, LINES + ["Domaine Tempier Bandol Rosé, Provence, France 2022  15 / 60"])
+    servers = []
+
+    def run(*replies, retries=3, batch_size=20):
+        server = StubServer(*replies)
+        servers.append(server)
+        monkeypatch.setattr(cleandata.openai, "api_base", server.url)
+        cleandata.process_csv(str(src), str(out), batch_size=batch_size, retries=retries,
+                              memo_path=None, fast_path=False)
+        with open(out, encoding="utf-8") as fh:
+            return server, list(csv.DictReader(fh))
+
+    yield run, out
+    for server in servers:
+        server.close()
+
+
+def test_server_errors_are_retried_with_backoff(stub_run, capsys):
+    run, _ = stub_run
+    server, rows = run(server_error, server_error, rows_reply())
+    assert server.requests == [[0, 1, 2]] * 3
+    assert [row["Brand"] for row in rows] == ["Producer"] * 3
+    assert capsys.readouterr().out.count("retrying in") == 2
+
+
+def test_missing_ids_are_resent_and_extra_ids_ignored(stub_run):
+    run, _ = stub_run
+    server, rows = run(rows_reply(only={0}, extra=[7]), rows_reply())
+    assert server.requests == [[0, 1, 2], [1, 2]]
+    assert [row["Brand"] for row in rows] == ["Producer"] * 3
+
+
+def test_malformed_json_is_retried(stub_run):
+    run, _ = stub_run
+    server, rows = run(malformed, rows_reply())
+    assert len(server.requests) == 2
+    assert [row["Brand"] for row in rows] == ["Producer"] * 3
+
+
+def test_rows_that_fail_every_attempt_are_requeued_on_the_next_run(stub_run):
+    run, out = stub_run
+    server, rows = run(rows_reply(only={1}), retries=1)
+    assert server.requests == [[0, 1, 2], [0, 2]]
+    assert [row["Brand"] for row in rows] == ["", "Producer", ""]
+    assert sorted(journal_statuses(out)) == ["failed", "failed", "ok"]
+
+    server, rows = run(rows_reply(make=lambda i: answer(i, "Second run")))
+    assert server.requests == [[0, 1]]  # only the two failed rows; the answered one is not paid for again
+    assert [row["Brand"] for row in rows] == ["Second run", "Producer", "Second run"]
+
+
+def test_replies_with_no_usable_row_are_logged_as_parse_errors(stub_run, tmp_path):
+    run, _ = stub_run
+    events = str(tmp_path / "llm_events.jsonl")
+    llm_metrics.log.open(events)
+    try:
+        run(rows_reply(make=lambda i: {"id": i, "Brand": "Producer"}), rows_reply(only={0}), retries=1)
+    finally:
+        llm_metrics.log.close()
+
+    calls = [e for e in llm_metrics.load_events(events, all_runs=True) if e["kind"] == "call"]
+    assert [e["outcome"] for e in calls] == ["parse-error", "partial"]
+    report = llm_metrics.summarize(llm_metrics.load_events(events, all_runs=True), top=3)
+    assert "Outcomes: ok 0, partial 1, parse-error 1, error 0" in report
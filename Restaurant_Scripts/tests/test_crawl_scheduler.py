@@ -0,0 +1,16 @@
+import argparse
+
+import pytest
+
+from crawl_scheduler import positive_rate
+
+
+def test_positive_rate_accepts_rates_above_zero():
+    assert positive_rate("2") == 2.0
+    assert positive_rate("0.5") == 0.5
+
+
+@pytest.mark.parametrize("value", ["0", "-1", "nan", "abc"])
+def test_positive_rate_rejects_the_rest(value):
+    with pytest.raises(argparse.ArgumentTypeError):
+        positive_rate(value)
@@ -0,0 +1,23 @@
+import pytest
+
+from normalize_memo import canonical_line
+
+
+@pytest.mark.parametrize("line, key", [
+    ("ORIN SWIFT 8 YEARS IN THE DESERT CALIFORNIA RED BLEND 25./88.",
+     "orin swift 8 years in the desert california red blend"),
+    ("ETUDE, NAPA PINOT NOIR 16./56.", "etude napa pinot noir"),
+    ("• Duckhorn — Chardonnay, Napa Valley $18", "duckhorn chardonnay napa valley"),
+    ("Duckhorn Chardonnay Napa Valley $14/$56", "duckhorn chardonnay napa valley"),
+    ("Duckhorn Chardonnay Napa Valley 14 / 56", "duckhorn chardonnay napa valley"),
+    ("Duckhorn Chardonnay Napa Valley 14.50", "duckhorn chardonnay napa valley"),
+    ("Château Musar, Bekaa Valley 2016", "chateau musar bekaa valley 2016"),  # a vintage, not a price
+])
+def test_canonical_line(line, key):
+    assert canonical_line(line) == key
+
+
+def test_same_wine_at_another_price_shares_a_key():
+    assert (canonical_line("ORIN SWIFT 8 YEARS IN THE DESERT CALIFORNIA RED BLEND 25./88.")
+            == canonical_line("Orin Swift 8 Years in the Desert California Red Blend 16./56."))
+
@@ -0,0 +1,40 @@
+import os
+
+import pytest
+
+pytest.importorskip("bs4")
+pytest.importorskip("lxml")
+pytest.importorskip("requests")
+
+from script_utils import load_script
+
+restaurant_list = load_script("01_RestaurantList.py", "restaurant_list")
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "eater_city_page.html")
+
+
+@pytest.fixture(scope="module")
+def html():
+    with open(FIXTURE, encoding="utf-8") as fh:
+        return fh.read()
+
+
+def test_targeted_parse_matches_full_parse(html):
+    assert (restaurant_list.parse_restaurants_by_slug(html, targeted=True)
+            == restaurant_list.parse_restaurants_by_slug(html, targeted=False))
+
+
+def test_cards_outside_the_rules_are_skipped(html):
+    rows = restaurant_list.parse_restaurants(html)
+    # duplicate slug, empty slug and nameless cards are dropped; page chrome is ignored
+    assert [row["name"] for row in rows] == ["La Royal", "Si Cara", "Oleana"]
+    assert rows[0] == {
+        "name": "La Royal",
+        "description": "Peruvian cooking in Cambridge.",
+        "address": "221 Concord Ave, Cambridge, MA 02138",
+        "phone": "(617) 555-1234",
+        "website": "https://www.laroyalcambridge.com/",
+        "image": "https://cdn.example/la-royal.jpg",
+    }
+    assert rows[1]["image"] == "https://cdn.example/si-cara.jpg"
+    assert rows[2]["website"] == "https://www.oleanarestaurant.com/"
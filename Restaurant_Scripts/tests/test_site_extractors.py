@@ -0,0 +1,44 @@
+import os
+
+import pytest
+
+pytest.importorskip("bs4")
+
+import site_extractors
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as fh:
+        return fh.read()
+
+
+def test_spothopper_rows_have_bare_prices():
+    html = read_fixture("spothopper_menu.html")
+    assert site_extractors.for_domain(site_extractors.page_domain(html)).name == "spothopper"
+
+    rows = site_extractors.spothopper(html)
+    assert [(r["producer"], r["price_glass"], r["price_bottle"]) for r in rows] == [
+        ("Cantina Giardino", "14.00", "56.00"),
+        ("Foradori", "15", ""),
+        ("Arianna Occhipinti", "", "72.00"),
+    ]
+    assert rows[0] == site_extractors.make_row(
+        "Red Wine", "Cantina Giardino, Aglianico, Campania, Italy", producer="Cantina Giardino",
+        region="Campania", country="Italy", price_glass="14.00", price_bottle="56.00")
+
+
+def test_vintage_lines_rows():
+    text = read_fixture("vintage_lines_menu.txt")
+    assert site_extractors.for_content("text", text).name == "vintage_lines"
+
+    rows = site_extractors.vintage_lines(text.splitlines())
+    assert [(r["wine_section"], r["producer"], r["vintage"], r["country"], r["price_glass"], r["price_bottle"])
+            for r in rows] == [
+        ("by the glass SPARKLING", "Vita Vivet", "21", "SP", "14", ""),
+        ("by the glass WHITE", "Passionate Wines", "22", "AR", "13", ""),
+        ("by the glass RED", "Bodega Chacra", "NV", "AR", "16", "62"),
+        ("by the bottle RED", "Domaine Tempier", "19", "FR", "", "95"),
+    ]
+    assert rows[1]["region"] == "Mendoza"
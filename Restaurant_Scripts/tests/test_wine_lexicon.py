@@ -0,0 +1,35 @@
+import pytest
+
+from wine_lexicon import mentions_wine
+
+
+@pytest.mark.parametrize("line", [
+    "Duckhorn Chardonnay Napa Valley $18",
+    "Whispering Angel, Côtes de Provence Rosé 14",
+    "Billecart-Salmon Champagne 30",
+    "House Wine 12",
+    "Grüner Veltliner, Kamptal 2021 15",
+    "Lucien Crochet  Sauvignon Blanc Sancerre  2022  72",
+    "Sauvingnon Blanc  Famille Natter , Sancerre, Loire, FR 21",  # OCR typo; the country code counts
+    "Bodega Ugabe \"Balea\" Txakoli",
+    "Barolo, Vietti 2019 95",
+    "Rioja Crianza, glass 14",
+    "FERRARI-CARANO, SONOMA FUMÉ BLANC 16./56.",
+])
+def test_wine_lines_match(line):
+    assert mentions_wine(line)
+
+
+@pytest.mark.parametrize("line", [
+    "Clams white wine, calabrian chili, parsley 18",  # Boston_SRV.html
+    "RED WINE-BRAISED SHORT RIBS Sharp Cheddar Grits | Balsamic Brussels Sprouts 39.",
+    "Moules frites, champagne cream 24",
+    "Herbes de Provence roasted chicken 28",
+    "Rosemary focaccia, olive oil 9",
+    "Don Julio Rosado 38",
+    "Grapes of Wrath gin, lemon, Lillet Blanc, St. Germain, Sancerre 19",  # Austin_Nido.pdf
+    "Jerez Manhattan Bourbon, Sherry, Walnut Bitters $ 17",
+    "Pescados/Fish Pescado de Rueda al Gusto Fried King Fish Steak $17.00",
+])
+def test_dishes_do_not_match(line):
+    assert not mentions_wine(line)
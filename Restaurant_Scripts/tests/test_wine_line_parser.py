@@ -0,0 +1,52 @@
+import pytest
+
+from wine_line_parser import parse_line
+
+# bottle prices listed under Nido's "wine by the glass" section
+BOTTLES_UNDER_GLASS_SECTION = [
+    "NEW ZEALAND Pyramid Valley Chardonnay, Cantebury, New Zealand, 2018   115",
+    "Tolpuddle Pinot Noir, Tasmania, Australia 2021   200",
+    "Movia Cabernet Sauvignon, Brda, Slovenia, 2019   80",
+    "GERMANY Weingut Spreitzer, Estate Trocken Riesling, Rheingau 2020                                70",
+]
+
+
+@pytest.mark.parametrize("line", BOTTLES_UNDER_GLASS_SECTION)
+def test_section_alone_does_not_place_a_lone_price(line):
+    parsed = parse_line(line, "wine by the glass")
+    assert parsed.price
+    assert (parsed.price_glass, parsed.price_bottle) == ("", "")
+
+
+@pytest.mark.parametrize("line, expected", [
+    ("‘22 Passionate Wines, Del Mono Blanco Sauvignon Blanc, AR 13",
+     {"producer": "Passionate Wines", "varietal": "Sauvignon Blanc", "vintage": "2022",
+      "country": "Argentina", "price": "13"}),
+    ("—  Sauvignon Blanc  — Monte Xanic 2021, Baja California, Mexico $ 13",
+     {"producer": "Monte Xanic", "varietal": "Sauvignon Blanc", "vintage": "2021",
+      "region": "Baja California", "country": "Mexico", "price": "13"}),
+])
+def test_lone_price_lines_resolve_without_a_serving(line, expected):
+    parsed = parse_line(line, "WINE BY THE GLASS")
+    assert {field: getattr(parsed, field) for field in expected} == expected
+    assert (parsed.price_glass, parsed.price_bottle) == ("", "")
+    assert parsed.resolved
+
+
+def test_serving_word_on_the_line_places_the_price():
+    parsed = parse_line("Malbec ( Finca El Origen, Argentina ) Glass $10.00", "Red")
+    assert parsed.price_glass == "10.00"
+    assert parsed.price_bottle == ""
+    assert parsed.region == ""  # "Glass" is not a region
+    assert parsed.producer == "Finca El Origen"
+
+    parsed = parse_line("Movia Cabernet Sauvignon, Brda, Slovenia, 2019 btl 80", "wine by the glass")
+    assert (parsed.price_glass, parsed.price_bottle) == ("", "80")
+    assert parsed.region == "Brda"
+    assert parsed.resolved
+
+
+def test_two_prices_are_glass_then_bottle():
+    parsed = parse_line("Cabernet Sauvignon  Cakebread , Napa, US, 2021 25 | 42", "wine by the glass")
+    assert (parsed.price_glass, parsed.price_bottle) == ("25", "42")
+    assert parsed.resolved
@@ -0,0 +1,96 @@
+import asyncio
+import datetime
+import threading
+
+import pytest
+
+pytest.importorskip("bs4")
+pytest.importorskip("requests")
+
+import crawl_scheduler
+import http_cache
+import transport
+from script_utils import load_script
+
+wine_list = load_script("02_WineList.py", "wine_list")
+
+
+def restaurants(n, hosts=3):
+    return [{"name": f"R{i}", "website": f"https://host{i % hosts}.example/", "city": "Boston"}
+            for i in range(n)]
+
+
+def run_crawl(rows, concurrency, search=None, timeout=10.0):
+    """``crawl()`` on its own thread, so a livelock fails the test instead of hanging it."""
+    search = search or wine_list.search_restaurant
+    out = {}
+    thread = threading.Thread(
+        target=lambda: out.setdefault("rows", asyncio.run(wine_list.crawl(rows, concurrency, search))),
+        daemon=True,
+    )
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "crawl() did not finish"
+    return out["rows"]
+
+
+@pytest.fixture
+def stubbed(monkeypatch):
+    monkeypatch.setattr(wine_list, "scheduler", crawl_scheduler.DomainScheduler())
+    monkeypatch.setattr(wine_list, "pull", lambda url: "<html></html>")
+    monkeypatch.setattr(wine_list, "parse_html", lambda html, url: object())
+    monkeypatch.setattr(wine_list, "homepage_fingerprint", lambda soup: "")
+    monkeypatch.setattr(wine_list, "search_homepage",
+                        lambda soup, url, city, name: (url + "wine", "Wine link found"))
+    return wine_list.scheduler
+
+
+@pytest.mark.parametrize("n, concurrency", [(1, 1), (2, 1), (2, 16), (20, 16)])
+def test_crawl_finishes_every_restaurant_in_order(stubbed, n, concurrency):
+    rows = restaurants(n)
+    out = run_crawl(rows, concurrency)
+    assert [r["name"] for r in out] == [r["name"] for r in rows]
+    assert all(r["status"] == "Wine link found" for r in out)
+
+
+def test_crawl_serves_ready_hosts_before_a_held_one(stubbed):
+    rows = restaurants(6)
+    stubbed.backoff("https://host0.example/", 0.3)
+    order = []
+    search = wine_list.search_restaurant
+
+    def recording(rest):
+        order.append(rest["name"])
+        return search(rest)
+
+    assert len(run_crawl(rows, 1, recording)) == 6
+    assert set(order[-2:]) == {"R0", "R3"}  # the held host's restaurants go last
+
+
+class ThrottledResponse:
+    status_code = 429
+    headers = {"Retry-After": "3600"}
+    content = b""
+    elapsed = datetime.timedelta(0)
+
+    def raise_for_status(self):
+        raise RuntimeError("429 Too Many Requests")
+
+
+def test_huge_retry_after_skips_the_host_instead_of_waiting(tmp_path, monkeypatch):
+    monkeypatch.setattr(wine_list, "scheduler", crawl_scheduler.DomainScheduler())
+    monkeypatch.setattr(http_cache, "cache", http_cache.HttpCache(folder=str(tmp_path / "cache")))
+    sent = []
+
+    def get(url, headers, timeout, stream):
+        sent.append(url)
+        return ThrottledResponse()
+
+    monkeypatch.setattr(transport.session, "get", get)
+    rows = restaurants(2, hosts=1)
+
+    out = run_crawl(rows, 1)
+
+    assert len(sent) == 1  # the second restaurant on the host never hits the network
+    assert all(r["status"].startswith("Error fetching homepage") for r in out)
+    assert wine_list.scheduler.ready_in(rows[0]["website"]) <= crawl_scheduler.MAX_RETRY_WAIT
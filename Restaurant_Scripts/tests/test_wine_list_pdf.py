@@ -0,0 +1,104 @@
+import datetime
+import os
+
+import pytest
+
+pytest.importorskip("bs4")
+pytest.importorskip("requests")
+
+import crawl_scheduler
+import http_cache
+import link_ranker
+import transport
+from script_utils import load_script
+
+wine_list = load_script("02_WineList.py", "wine_list")
+
+URL = "https://example.com/menus/wine.pdf"
+PDF = b"%PDF-1.4 wine list " + b"x" * 200_000
+
+
+class FakeResponse:
+    def __init__(self, status, body=b"", headers=None, fail_after=None):
+        self.status_code = status
+        self.headers = headers or {}
+        self.elapsed = datetime.timedelta(0)
+        self._body = body
+        self._fail_after = fail_after
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(self.status_code)
+
+    def iter_content(self, size):
+        for n, i in enumerate(range(0, len(self._body), size)):
+            if self._fail_after is not None and n >= self._fail_after:
+                raise ConnectionError("connection reset")
+            yield self._body[i:i + size]
+
+
+@pytest.fixture
+def env(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(http_cache, "cache", http_cache.HttpCache(folder=str(tmp_path / "cache")))
+    monkeypatch.setattr(wine_list, "scheduler", crawl_scheduler.DomainScheduler())
+    sent = []
+
+    def serve(response):
+        def get(url, headers, timeout, stream):
+            sent.append(headers)
+            return response
+        monkeypatch.setattr(transport.session, "get", get)
+
+    return serve, sent
+
+
+def test_stale_pdf_is_revalidated_and_304_saves_cached_copy(env):
+    serve, sent = env
+    http_cache.cache.store(URL, 200, {"ETag": '"v1"'}, PDF)
+    http_cache.cache.fresh_for = 0
+
+    serve(FakeResponse(304, headers={"ETag": '"v1"'}))
+    path = wine_list.stream_pdf(URL, "Boston", "Test Place")
+
+    assert sent[0]["If-None-Match"] == '"v1"'
+    with open(path, "rb") as fh:
+        assert fh.read() == PDF
+    assert not os.path.exists(path + ".part")
+
+
+def test_failed_stream_removes_part_file(env):
+    serve, _ = env
+    serve(FakeResponse(200, PDF, fail_after=1))
+    with pytest.raises(ConnectionError):
+        wine_list.stream_pdf(URL, "Boston", "Test Place")
+    assert os.listdir(os.path.join("data", "Boston_Menus")) == []
+
+
+def test_bytes_read_are_charged_to_the_budget(env):
+    serve, _ = env
+    budget = link_ranker.CrawlBudget(10, 8 * 1024 * 1024)
+
+    serve(FakeResponse(200, PDF))
+    assert wine_list.stream_pdf(URL, "Boston", "Test Place", budget=budget)
+    assert (budget.pages, budget.bytes) == (1, len(PDF))
+
+    not_a_menu = b"%PDF-1.4 " + b"x" * (2 * wine_list.PDF_SNIFF_BYTES)
+    serve(FakeResponse(200, not_a_menu))
+    assert wine_list.stream_pdf(URL.replace("wine", "other"), "Boston", "Other", sniff=True, budget=budget) == ""
+    assert (budget.pages, budget.bytes) == (2, len(PDF) + wine_list.PDF_SNIFF_BYTES)
+
+
+def test_failed_stream_charges_what_was_read(env):
+    serve, _ = env
+    budget = link_ranker.CrawlBudget(10, 8 * 1024 * 1024)
+    serve(FakeResponse(200, PDF, fail_after=2))
+    with pytest.raises(ConnectionError):
+        wine_list.stream_pdf(URL, "Boston", "Test Place", budget=budget)
+    assert (budget.pages, budget.bytes) == (1, 2 * wine_list.PDF_CHUNK_BYTES)
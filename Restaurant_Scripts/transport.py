@@ -0,0 +1,145 @@
+# transport.py
+"""
+Shared HTTP Transport
+=====================
+A single pooled ``requests.Session`` used by the scraping scripts
+(``01_RestaurantList.py`` and ``02_WineList.py``).
+
+* Per-host connection pools with keep-alive, so the homepage, menu pages and
+  PDFs of one restaurant share a TCP connection and its TLS session instead of
+  handshaking for every request.
+* ``gzip``/``deflate`` decoding always, ``br`` when ``brotli`` is installed.
+* Counts requests and newly opened connections so a run can report how often
+  a pooled connection was reused (:func:`report`), and times each new
+  connection (DNS + TCP + TLS) for :func:`take_connect_time`.
+"""
+
+import threading
+import time
+
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.request import ACCEPT_ENCODING
+
+# Both scripts already skip certificate checks; keep the warnings quiet.
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+DEFAULT_POOL_HOSTS = 64
+DEFAULT_PER_HOST = 4
+
+
+class TransportStats:
+    """Thread-safe counters for requests sent and connections opened."""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+
+    def add_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def add_connection(self) -> None:
+        with self._lock:
+            self.connections += 1
+
+    @property
+    def reuse_ratio(self) -> float:
+        """Share of requests that went out on an already open connection."""
+        if not self.requests:
+            return 0.0
+        return max(0, self.requests - self.connections) / self.requests
+
+
+stats = TransportStats()
+_timing = threading.local()
+
+
+def take_connect_time() -> float:
+    """Seconds this thread spent opening connections since the last call."""
+    spent = getattr(_timing, "connect", 0.0)
+    _timing.connect = 0.0
+    return spent
+
+
+def _timed_connect(connect):
+    def wrapper(self):
+        start = time.perf_counter()
+        try:
+            return connect(self)
+        finally:
+            _timing.connect = getattr(_timing, "connect", 0.0) + time.perf_counter() - start
+    return wrapper
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    connect = _timed_connect(HTTPConnection.connect)
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    connect = _timed_connect(HTTPSConnection.connect)
+
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+    def _new_conn(self):
+        stats.add_connection()
+        return super()._new_conn()
+
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+    def _new_conn(self):
+        stats.add_connection()
+        return super()._new_conn()
+
+
+class PooledAdapter(HTTPAdapter):
+    """``HTTPAdapter`` whose pools count the connections they open."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CountingHTTPConnectionPool,
+            "https": _CountingHTTPSConnectionPool,
+        }
+
+    def send(self, request, **kwargs):
+        stats.add_request()
+        return super().send(request, **kwargs)
+
+
+def build_session(pool_hosts: int = DEFAULT_POOL_HOSTS, per_host: int = DEFAULT_PER_HOST) -> requests.Session:
+    """Create a keep-alive session keeping up to *per_host* idle connections per host."""
+    sess = requests.Session()
+    adapter = PooledAdapter(pool_connections=pool_hosts, pool_maxsize=per_host)
+    sess.mount("http://", adapter)
+    sess.mount("https://", adapter)
+    sess.verify = False
+    sess.headers["Accept-Encoding"] = ACCEPT_ENCODING
+    return sess
+
+
+session = build_session()
+
+
+def configure(per_host: int) -> requests.Session:
+    """Resize the per-host pools to match the caller's concurrency limit."""
+    global session
+    session.close()
+    session = build_session(per_host=max(1, per_host))
+    return session
+
+
+def report() -> str:
+    """One-line summary of connection reuse for the end of a run."""
+    return (
+        f"HTTP: {stats.requests} requests over {stats.connections} connections "
+        f"({stats.reuse_ratio:.0%} reused)"
+    )
@@ -0,0 +1,239 @@
+# wine_lexicon.py
+"""
+Wine Lexicon
+============
+Grape varieties, wine styles and appellations used to recognise wine lines
+in menu text, compiled into a single prefix-tree regular expression so a line is checked
+against every term in one pass.
+
+Matching is case- and accent-insensitive (``Rosé`` matches ``rose``,
+``Grüner`` matches ``gruner``) and works on whole words, so ``rose`` no longer
+fires on ``rosemary``.
+
+Generic words that dishes use too (``wine``, ``champagne``, ``provence`` …)
+only count on a line without food words, so "Clams white wine, calabrian
+chili, parsley" is not taken for a wine. Appellations and ``rosado`` /
+``rosato``, which also turn up in spirits and cocktails ("Don Julio Rosado",
+"gin, lemon, Lillet Blanc, St. Germain, Sancerre"), need a second sign of a
+wine: another lexicon term, a vintage, a glass/bottle marker, a winery word
+(``domaine``, ``bodega`` …) or a wine country.
+"""
+
+import hashlib
+import re
+import unicodedata
+from typing import Dict, List
+
+# Terms are written folded (lower case, no accents). Words that double as food
+# (pecorino, toro, napa, marsala …) are left out or only listed in a longer
+# form so dishes are not mistaken for wines.
+
+# Grape varieties and common synonyms
+GRAPES = [
+    "aglianico", "airen", "albana", "albarino", "alicante bouschet", "aligote", "alvarinho",
+    "ansonica", "aragonez", "arinto", "arneis", "assyrtiko", "athiri", "auxerrois", "baga",
+    "barbera", "bical", "blaufrankisch", "bobal", "bombino", "bonarda", "bourboulenc",
+    "brachetto", "cabernet", "cabernet franc", "cabernet sauvignon", "canaiolo", "cannonau",
+    "carignan", "carignane", "carinena", "carmenere", "castelao", "catarratto", "cesanese",
+    "chardonnay", "chasselas", "chenin", "chenin blanc", "cinsault", "cinsaut", "clairette",
+    "colombard", "cortese", "corvina", "counoise", "croatina", "dolcetto", "dornfelder",
+    "durif", "encruzado", "falanghina", "fer servadou", "fiano", "friulano", "frappato",
+    "fume blanc", "furmint", "gamay", "garganega", "garnacha", "garnacha blanca", "gewurztraminer",
+    "glera", "godello", "graciano", "grechetto", "greco di tufo", "grenache", "grenache blanc",
+    "grignolino", "grillo", "gros manseng", "gruner veltliner", "hondarrabi zuri",
+    "inzolia", "jacquere", "kadarka", "kerner", "lagrein", "lambrusco", "lemberger",
+    "loureiro", "macabeo", "malagousia", "malbec", "malvasia", "mantonico", "marsanne",
+    "marselan", "marzemino", "mataro", "mauzac", "melon de bourgogne", "mencia", "merlot",
+    "monastrell", "mondeuse", "montepulciano", "moschofilero", "mourvedre", "muller thurgau",
+    "muscadelle", "muscadet", "muscat", "moscato", "moscatel", "nebbiolo", "negroamaro",
+    "nerello mascalese", "nero d'avola", "nero di troia", "negrette", "palomino",
+    "parellada", "pedro ximenez", "petit manseng", "petit verdot", "petite sirah",
+    "picpoul", "piedirosso", "pinot", "pinot blanc", "pinot bianco", "pinot grigio",
+    "pinot gris", "pinot meunier", "pinot noir", "pinotage", "poulsard", "primitivo",
+    "prieto picudo", "refosco", "ribolla gialla", "riesling", "rkatsiteli", "rolle",
+    "roussanne", "ruche", "sagrantino", "sangiovese", "saperavi", "savagnin", "sauvignon",
+    "sauvignon blanc", "schiava", "sciaccerellu", "semillon", "sercial", "sylvaner",
+    "silvaner", "spatburgunder", "st. laurent", "syrah", "shiraz", "tannat", "tempranillo",
+    "teroldego", "tinta de toro", "tinta roriz", "tinto fino", "tocai friulano", "torrontes",
+    "touriga nacional", "trebbiano", "treixadura", "trousseau", "ugni blanc", "verdejo",
+    "verdelho", "verdicchio", "verduzzo", "vermentino", "vernaccia", "vespaiolo", "viognier",
+    "viura", "welschriesling", "xarel-lo", "xarello", "xinomavro", "zibibbo", "zierfandler",
+    "zinfandel", "zweigelt", "chambourcin", "vidal blanc", "seyval blanc",
+    "marquette", "la crescent", "frontenac", "traminette", "cayuga", "baco noir",
+    "saint laurent", "blanc de noirs", "blanc de blancs",
+]
+
+# Styles and generic wine words
+STYLES = [
+    "wine", "wines", "vino", "vin", "vinho", "wein", "rose", "rosato", "rosado",
+    "orange wine", "skin contact", "sparkling", "bubbles", "champagne", "cremant", "cava",
+    "prosecco", "franciacorta", "sekt", "pet nat", "pet-nat", "petillant naturel", "lambrusco",
+    "frizzante", "spumante", "brut", "brut nature", "extra brut", "demi-sec", "dessert wine",
+    "late harvest", "ice wine", "icewine", "sauternes", "tokaji", "tawny port", "ruby port", "madeira",
+    "fino sherry", "manzanilla", "amontillado", "oloroso", "palo cortado", "claret", "meritage",
+    "field blend", "red blend", "white blend", "natural wine",
+]
+
+# Regions and appellations
+APPELLATIONS = [
+    "bordeaux", "bourgogne", "burgundy", "chablis", "beaujolais", "morgon", "fleurie",
+    "brouilly", "julienas", "moulin-a-vent", "macon", "pouilly-fuisse", "pouilly-fume",
+    "sancerre", "vouvray", "chinon", "bourgueil", "saumur", "savennieres", "anjou",
+    "muscadet", "touraine", "alsace", "savoie", "cotes du rhone", "cote du rhone",
+    "cote-rotie", "hermitage", "crozes-hermitage", "saint-joseph", "cornas", "condrieu",
+    "gigondas", "vacqueyras", "chateauneuf-du-pape", "chateauneuf du pape", "tavel",
+    "provence", "bandol", "languedoc", "roussillon", "minervois", "corbieres", "fitou",
+    "cahors", "madiran", "jurancon", "gaillac", "bergerac", "medoc", "haut-medoc", "pauillac",
+    "margaux", "saint-julien", "saint-estephe", "pessac-leognan", "graves", "saint-emilion",
+    "pomerol", "entre-deux-mers", "meursault", "puligny-montrachet", "chassagne-montrachet",
+    "montrachet", "pommard", "volnay", "gevrey-chambertin", "chambolle-musigny",
+    "nuits-saint-georges", "vosne-romanee", "santenay", "marsannay", "mercurey", "givry",
+    "rully", "barolo", "barbaresco", "langhe", "roero", "gattinara", "ghemme", "valtellina",
+    "chianti", "chianti classico", "brunello", "brunello di montalcino", "rosso di montalcino",
+    "vino nobile", "bolgheri", "maremma", "morellino", "montefalco", "valpolicella",
+    "amarone", "ripasso", "soave", "bardolino", "lugana", "alto adige", "sudtirol",
+    "trentino", "friuli", "collio", "etna", "cerasuolo di vittoria", "taurasi", "irpinia",
+    "salice salentino", "cannonau di sardegna", "rioja", "ribera del duero", "priorat",
+    "montsant", "rueda", "rias baixas", "bierzo", "ribeira sacra", "valdeorras",
+    "jumilla", "yecla", "navarra", "penedes", "txakoli", "jerez", "douro",
+    "vinho verde", "alentejo", "bairrada", "mosel", "rheingau", "rheinhessen", "pfalz",
+    "nahe", "franken", "wachau", "kamptal", "kremstal", "burgenland", "santorini",
+    "naoussa", "nemea", "tokaj", "napa valley", "sonoma", "sonoma coast",
+    "russian river", "alexander valley", "dry creek", "carneros", "anderson valley",
+    "mendocino", "paso robles", "santa barbara", "santa rita hills", "sta. rita hills",
+    "santa cruz mountains", "lodi", "sierra foothills", "central coast", "willamette",
+    "willamette valley", "dundee hills", "columbia valley", "walla walla", "yakima valley",
+    "finger lakes", "north fork", "texas hill country", "mendoza",
+    "uco valley", "maipo", "colchagua", "itata",
+    "maule", "bio bio", "valle de guadalupe", "baja california", "barossa", "mclaren vale",
+    "clare valley", "eden valley", "yarra valley", "margaret river", "coonawarra",
+    "hunter valley", "tasmania", "marlborough", "central otago", "hawke's bay",
+    "martinborough", "stellenbosch", "swartland", "franschhoek", "paarl",
+    "walker bay", "okanagan", "niagara", "kakheti", "bekaa valley",
+]
+
+# Lexicon terms that also show up in dishes ("white wine sauce", "champagne
+# vinaigrette", "herbes de provence"); on their own they only count when the
+# line has none of FOOD_WORDS
+GENERIC_TERMS = ["wine", "wines", "vino", "vin", "vinho", "wein", "champagne", "provence"]
+
+# Lexicon terms that also name spirits or go into cocktails; they need a second
+# wine signal (another term, a vintage, a glass/bottle marker, a winery word or a country)
+AMBIGUOUS_TERMS = ["rosado", "rosato"] + [
+    term for term in APPELLATIONS if term not in GRAPES and term not in GENERIC_TERMS
+]
+
+WINERY_WORDS = [
+    "bodega", "bodegas", "cantina", "cellars", "chateau", "clos", "domaine", "estate",
+    "quinta", "tenuta", "vineyard", "vineyards", "weingut", "winery",
+]
+WINE_COUNTRIES = [
+    "argentina", "australia", "austria", "chile", "france", "germany", "greece", "italy",
+    "new zealand", "portugal", "south africa", "spain", "california", "oregon", "washington",
+]
+
+VINTAGE_RE = re.compile(r"(?<![\d.])(?:19[4-9]\d|20[0-4]\d)(?![\d.])|[‘’'`]\d{2}(?!\d)|\bNV\b")
+SERVING_RE = re.compile(r"\b(?:glass|gl|bottle|btl|half bottle|magnum|carafe)\b")
+COUNTRY_CODE_RE = re.compile(r"\b(?:AR|AT|AU|CL|DE|ES|FR|GR|IT|NZ|PT|SP|US|ZA)\b")  # "…, Loire, FR 21"
+
+FOOD_WORDS = [
+    "aioli", "bacon", "basil", "beef", "braised", "bread", "broth", "butter", "calamari",
+    "cheese", "chicken", "chile", "chili", "clams", "cream", "duck", "fish", "fried", "garlic",
+    "glaze", "grilled", "ham", "herbs", "jus", "lamb", "lemon", "mushroom", "mushrooms",
+    "mussels", "octopus", "onion", "onions", "oysters", "parsley", "pasta", "pork", "potato",
+    "potatoes", "prosciutto", "reduction", "risotto", "roasted", "salad", "sauce",
+    "sausage", "scallops", "shallot", "shallots", "shrimp", "soup", "squid", "steak",
+    "steamed", "thyme", "tomato", "tomatoes", "tuna", "veal", "vinaigrette",
+]
+
+LEXICON: Dict[str, List[str]] = {
+    "grape": GRAPES,
+    "style": STYLES,
+    "appellation": APPELLATIONS,
+}
+
+
+def fold(text: str) -> str:
+    """Lower-case *text* and strip accents (ASCII text skips the Unicode work)."""
+    if text.isascii():
+        return text.lower()
+    # dropping what is left outside ASCII after decomposition removes the accents
+    return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii").lower()
+
+
+def _trie_pattern(terms: List[str]) -> str:
+    """Regex for *terms* factored by common prefix.
+
+    Python's ``re`` tries alternatives one by one, so a flat ``a|b|c`` over
+    hundreds of words is slow; a prefix tree only follows the branch that
+    matches the next character.
+    """
+    trie: Dict[str, dict] = {}
+    for term in terms:
+        node = trie
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node: Dict[str, dict]) -> str:
+        branches = [
+            (r"[\s-]+" if ch == " " else re.escape(ch)) + emit(child)
+            for ch, child in sorted(node.items()) if ch
+        ]
+        if not branches:
+            return ""
+        ends_here = "" in node
+        if len(branches) == 1 and not ends_here:
+            return branches[0]
+        group = "(?:" + "|".join(branches) + ")"
+        return group + "?" if ends_here else group
+
+    return emit(trie)
+
+
+def _compile(terms: List[str]) -> "re.Pattern[str]":
+    return re.compile(rf"\b(?:{_trie_pattern(terms)})\b")
+
+
+ALL_TERMS = sorted({term for terms in LEXICON.values() for term in terms})
+SPECIFIC_TERMS = [term for term in ALL_TERMS if term not in GENERIC_TERMS and term not in AMBIGUOUS_TERMS]
+# changes whenever a term is added or removed; part of the extraction cache key
+DIGEST = hashlib.sha1(
+    "\n".join(ALL_TERMS + ["#generic"] + GENERIC_TERMS + ["#ambiguous"] + AMBIGUOUS_TERMS
+              + ["#food"] + FOOD_WORDS + ["#signals"] + WINERY_WORDS + WINE_COUNTRIES
+              + [VINTAGE_RE.pattern, SERVING_RE.pattern, COUNTRY_CODE_RE.pattern]).encode("utf-8")
+).hexdigest()[:12]
+WINE_TERM_RE = _compile(ALL_TERMS)
+SPECIFIC_RE = _compile(SPECIFIC_TERMS)
+GENERIC_RE = _compile(GENERIC_TERMS)
+AMBIGUOUS_RE = _compile(AMBIGUOUS_TERMS)
+SIGNAL_RE = _compile(WINERY_WORDS + WINE_COUNTRIES)
+FOOD_RE = _compile(FOOD_WORDS)
+GRAPE_RE = _compile(GRAPES)
+APPELLATION_RE = _compile(APPELLATIONS)
+
+
+def mentions_wine(text: str) -> bool:
+    """True if *text* names a grape, wine style or appellation.
+
+    A generic word (:data:`GENERIC_TERMS`) alone is not enough on a line that
+    also has food words, and an :data:`AMBIGUOUS_TERMS` one needs another
+    term, a vintage, a glass/bottle marker, a winery word or a country next
+    to it.
+    """
+    folded = fold(text)
+    if WINE_TERM_RE.search(folded) is None:  # most lines: one pass and done
+        return False
+    if SPECIFIC_RE.search(folded):
+        return True
+    generic = GENERIC_RE.search(folded) is not None and FOOD_RE.search(folded) is None
+    if generic or not AMBIGUOUS_RE.search(folded):
+        return generic
+    return (len(set(AMBIGUOUS_RE.findall(folded))) > 1 or VINTAGE_RE.search(text) is not None
+            or SERVING_RE.search(folded) is not None or SIGNAL_RE.search(folded) is not None
+            or COUNTRY_CODE_RE.search(text) is not None)
+
+
+def find_terms(text: str) -> List[str]:
+    """Every lexicon term found in *text*, in order of appearance (folded)."""
+    return WINE_TERM_RE.findall(fold(text))
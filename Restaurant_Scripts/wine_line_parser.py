@@ -0,0 +1,270 @@
+# wine_line_parser.py
+"""
+Wine Line Parser
+================
+Deterministic parser for menu lines, run by ``04_cleandata0427.py`` before any
+LLM call. Many lines already carry their facts in predictable places::
+
+    ‘22 Passionate Wines, Del Mono Blanco Sauvignon Blanc, AR 13
+    —  Sauvignon Blanc  — Monte Xanic 2021, Baja California, Mexico $ 13
+    ETUDE, NAPA PINOT NOIR 25./88.
+
+One lexer pass over the line (a single compiled regex with named groups)
+yields vintages (``2021``, ``‘22``, ``NV``), prices (``$ 13``, ``25./88.``,
+``14 / 56``, ``25 | 42``), upper-case country and state codes (``AR``,
+``FR``, ``CA``) and separators (commas, dashes, bullets); the text between
+separators forms the line's segments. The segments are then matched against
+``wine_lexicon.py`` for the varietal and appellation, a list of country and
+state names, and the producer (the first segment, minus any varietal and
+upper-case section heading in front of it).
+
+A line is *resolved* when producer, varietal, vintage, country and a price
+were all found. Two prices are read as glass and bottle; a lone price is only
+placed when the line says so itself (``Glass $10.00``, ``btl 48``) and is
+otherwise kept as ``price`` with glass and bottle left empty. The section
+heading alone doesn't place it, since "by the glass" sections list bottle
+prices too. ``04_cleandata0427.py`` writes resolved rows straight from the
+parser without asking the model. The descriptive columns (body, taste,
+sweetness …) stay empty for them.
+
+Rows from ``site_extractors.py`` already carry producer, vintage, region,
+country and prices; :func:`parse_row` prefers those columns when present.
+"""
+
+import re
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from wine_lexicon import APPELLATION_RE, GRAPES, GRAPE_RE, fold
+
+COUNTRY_CODES = {
+    "AR": "Argentina", "AT": "Austria", "AU": "Australia", "CL": "Chile", "DE": "Germany",
+    "ES": "Spain", "FR": "France", "GE": "Georgia", "GR": "Greece", "HR": "Croatia",
+    "HU": "Hungary", "IT": "Italy", "LB": "Lebanon", "MX": "Mexico", "NZ": "New Zealand",
+    "PT": "Portugal", "SI": "Slovenia", "SP": "Spain", "US": "United States", "UY": "Uruguay",
+    "ZA": "South Africa",
+}
+STATE_CODES = {"CA": "California", "OR": "Oregon", "WA": "Washington", "NY": "New York"}
+
+COUNTRY_NAMES = {
+    "argentina": "Argentina", "australia": "Australia", "austria": "Austria", "chile": "Chile",
+    "croatia": "Croatia", "england": "England", "france": "France", "georgia": "Georgia",
+    "germany": "Germany", "greece": "Greece", "hungary": "Hungary", "israel": "Israel",
+    "italy": "Italy", "lebanon": "Lebanon", "mexico": "Mexico", "new zealand": "New Zealand",
+    "portugal": "Portugal", "slovenia": "Slovenia", "south africa": "South Africa",
+    "spain": "Spain", "uruguay": "Uruguay", "usa": "United States", "united states": "United States",
+}
+STATE_NAMES = {"california": "California", "oregon": "Oregon", "washington": "Washington",
+               "new york": "New York"}
+
+COUNTRY_NAME_RE = re.compile(r"\b(?:%s)\b" % "|".join(sorted(COUNTRY_NAMES, key=len, reverse=True)))
+STATE_NAME_RE = re.compile(r"\b(?:%s)\b" % "|".join(sorted(STATE_NAMES, key=len, reverse=True)))
+
+WINE_TYPES = [  # checked in order against the section and the line's heading
+    ("Sparkling", re.compile(r"\b(?:sparkling|bubbles?|champagne|cava|prosecco|cremant|spumante)\b")),
+    ("Rosé", re.compile(r"\brose\b")),
+    ("Orange", re.compile(r"\b(?:orange|skin contact)\b")),
+    ("Dessert", re.compile(r"\b(?:dessert|sweet|port|sherry)\b")),
+    ("Red", re.compile(r"\breds?\b")),
+    ("White", re.compile(r"\bwhites?\b")),
+]
+
+TOKEN_RE = re.compile(
+    r"""
+    (?=[‘’'`\d$/|A-Z,;•·–—()-])  # cheap first-character check before the alternatives
+    (?:
+    (?P<vintage>[‘’'`]\d{2}(?!\d)|(?<![\d.])(?:19[4-9]\d|20[0-4]\d)(?![\d.])|\bNV\b)
+  | (?P<price>\$\s*\d{1,4}(?:\.\d{0,2})?
+      |(?<![\w.$])\d{1,4}\.(?:\d\d)?(?=\s*(?:[/|]|$))
+      |(?<![\w.$])\d{1,3}(?=\s*(?:[/|]|$)))
+  | (?P<slash>[/|])
+  | (?P<code>\b[A-Z]{2}\b(?=\s*(?:[,$\d]|$)))
+  | (?P<sep>[,;•·–—()]|(?<=\s)-(?=\s))
+    )
+    """,
+    re.X,
+)
+TYPE_WORD_RE = re.compile("|".join(pattern.pattern for _, pattern in WINE_TYPES))
+HEADING_RE = re.compile(r"^(?:[A-Z][A-Z&'’]+\s+)+(?=\S*[a-z])")  # "BORDEAUX LEFT BANK Château …"
+SERVING_RE = re.compile(r"\b(?:(?P<glass>glass|gl)|(?P<bottle>bottle|btl))\b", re.I)  # "Glass $10.00", "btl 48"
+PRICE_NUMBER_RE = re.compile(r"\d{1,4}(?:\.\d\d)?")
+
+GRAPE_SET = frozenset(GRAPES)
+MAX_GRAPE_WORDS = max(len(grape.split()) for grape in GRAPES)
+
+
+class ParsedLine(NamedTuple):
+    producer: str = ""
+    wine_name: str = ""
+    vintage: str = ""
+    region: str = ""
+    state: str = ""
+    country: str = ""
+    varietal: str = ""
+    wine_type: str = ""
+    price: str = ""
+    price_glass: str = ""
+    price_bottle: str = ""
+
+    @property
+    def resolved(self) -> bool:
+        """True when the line needs no model call."""
+        return all((self.producer, self.varietal, self.vintage, self.country, self.price))
+
+
+def _vintage(token: str) -> str:
+    if token == "NV":
+        return token
+    digits = token.lstrip("‘’'`")
+    return digits if len(digits) == 4 else ("20" if int(digits) <= 40 else "19") + digits
+
+
+def tokenize(line: str) -> Tuple[List[str], List[str], List[str], List[str]]:
+    """One pass over *line*: its text segments, vintages, prices and upper-case codes."""
+    segments: List[str] = []
+    vintages: List[str] = []
+    prices: List[str] = []
+    codes: List[str] = []
+    current: List[str] = []
+    pos = 0
+    for match in TOKEN_RE.finditer(line):
+        current.append(line[pos:match.start()])
+        pos = match.end()
+        kind = match.lastgroup
+        if kind == "vintage":
+            vintages.append(_vintage(match.group()))
+            current.append(" ")
+        elif kind == "price":
+            prices.append(PRICE_NUMBER_RE.search(match.group()).group().rstrip("."))
+            current.append(" ")
+        elif kind == "code":
+            if match.group() in COUNTRY_CODES or match.group() in STATE_CODES:
+                codes.append(match.group())
+                current.append(" ")
+            else:
+                current.append(match.group())
+        elif kind == "sep":
+            segments.append(" ".join("".join(current).split()))
+            current = []
+        else:  # a slash or pipe between prices
+            current.append(" ")
+    current.append(line[pos:])
+    segments.append(" ".join("".join(current).split()))
+    return [s for s in segments if s], vintages, prices, codes
+
+
+def _grape_span(words: List[str]) -> Optional[Tuple[int, int]]:
+    """Word range of the first (longest) grape name in *words*."""
+    folded = [fold(word) for word in words]
+    for i in range(len(words)):
+        for j in range(min(len(words), i + MAX_GRAPE_WORDS), i, -1):
+            if " ".join(folded[i:j]) in GRAPE_SET:
+                return i, j
+    return None
+
+
+def _place(folded: str, pattern: "re.Pattern[str]", names: Dict[str, str]) -> str:
+    match = pattern.search(folded)
+    return names[match.group()] if match else ""
+
+
+def _is_producer(text: str) -> bool:
+    """False for headings, places and leftovers that would otherwise pass for a producer
+    ("California reds", "PREMIUM POURS 3oz", "“O Positivo” Cabernet-Syrah")."""
+    folded = fold(text)
+    return not (any(ch.isdigit() for ch in folded) or COUNTRY_NAME_RE.search(folded)
+                or STATE_NAME_RE.search(folded) or APPELLATION_RE.search(folded)
+                or GRAPE_RE.search(folded) or TYPE_WORD_RE.search(folded))
+
+
+def parse_line(line: str, section: str = "") -> ParsedLine:
+    # serving words say which price is which but are never part of a name or region
+    serving = SERVING_RE.search(line)
+    line = SERVING_RE.sub(" ", line)
+    heading = HEADING_RE.match(line)
+    heading_text = heading.group() if heading else ""
+    segments, vintages, prices, codes = tokenize(line[len(heading_text):])
+
+    folded = fold(line)
+    grape = GRAPE_RE.search(folded)
+    varietal = grape.group().title() if grape else ""
+    appellation = APPELLATION_RE.search(folded)
+
+    # place names inside an appellation ("Baja California") don't count
+    places = APPELLATION_RE.sub(" ", folded)
+    country = (next((COUNTRY_CODES[c] for c in codes if c in COUNTRY_CODES), "")
+               or _place(places, COUNTRY_NAME_RE, COUNTRY_NAMES))
+    state = (next((STATE_CODES[c] for c in codes if c in STATE_CODES), "")
+             or _place(places, STATE_NAME_RE, STATE_NAMES))
+    if state and not country:
+        country = "United States"
+
+    # producer: the first segment that is not just a varietal, minus that varietal
+    producer = wine_name = ""
+    rest: List[str] = []
+    for k, segment in enumerate(segments):
+        words = segment.split()
+        span = _grape_span(words)
+        name_words = (words[:span[0]] or words[span[1]:]) if span else words
+        if not name_words:
+            continue
+        candidate = " ".join(name_words)
+        if _is_producer(candidate):
+            producer = candidate
+            if span and span[0]:
+                wine_name = " ".join(words[span[0]:span[1]])
+            rest = segments[k + 1:]
+        break
+
+    region = appellation.group().title() if appellation else ""
+    for segment in rest:
+        if not region and not _grape_span(segment.split()) and not COUNTRY_NAME_RE.search(fold(segment)):
+            region = segment
+        elif not wine_name and _grape_span(segment.split()):
+            wine_name = segment
+
+    context = fold(f"{section} {heading_text}")
+    wine_type = next((name for name, pattern in WINE_TYPES if pattern.search(context)), "")
+
+    # a lone price is only placed by a marker on the line itself: a "by the glass"
+    # section often lists bottle prices too, so that is left to the model
+    price = glass = bottle = ""
+    if prices:
+        price = prices[0]
+        if len(prices) >= 2:
+            glass, bottle = prices[0], prices[1]
+        elif serving and serving.group("bottle"):
+            bottle = price
+        elif serving:
+            glass = price
+
+    return ParsedLine(
+        producer=producer,
+        wine_name=wine_name or varietal,
+        vintage=vintages[0] if vintages else "",
+        region=region,
+        state=state,
+        country=country,
+        varietal=varietal,
+        wine_type=wine_type,
+        price=price,
+        price_glass=glass,
+        price_bottle=bottle,
+    )
+
+
+def parse_row(row: Dict[str, str]) -> ParsedLine:
+    """Parse an extracted CSV row, preferring the columns a site extractor filled in."""
+    parsed = parse_line(row.get("wine_name", ""), row.get("wine_section", ""))
+    country = row.get("country", "")
+    known = {
+        "producer": row.get("producer", ""),
+        "vintage": _vintage(row["vintage"]) if row.get("vintage", "").strip("‘’'`").isdigit() else row.get("vintage", ""),
+        "region": row.get("region", ""),
+        "country": COUNTRY_CODES.get(country, country),
+        "price_glass": row.get("price_glass", ""),
+        "price_bottle": row.get("price_bottle", ""),
+    }
+    known = {field: value for field, value in known.items() if value}
+    if "price_glass" in known or "price_bottle" in known:
+        known["price"] = known.get("price_glass") or known.get("price_bottle")
+    return parsed._replace(**known)
@@ -1,26 +1,73 @@
 # extract_wines.py
 """
-CLI tool that downloads a beverage‑menu PDF, OCRs it, extracts only the wine offerings,
+CLI tool that downloads a beverage‑menu PDF, reads its text, extracts only the wine offerings,
 and saves them to a text file named `<restaurant_name>_wine_names.txt`.
 
 Updated to extract from "wines by the glass" and "wines by the bottle" sections.
+
+Each page's embedded text layer is used when ``pdf_text.text_layer_pages``
+finds it usable; only pages without one (scans, broken fonts) are OCRed.
+``--force-ocr`` ignores the text layer and OCRs every page.
+
+OCR streams the PDF one page at a time: a renderer thread puts pages into a
+small bounded queue and a pool of workers OCRs them, each Tesseract limited
+to one thread, so memory stays at a few pages and throughput scales with
+cores. Pages are first read at 150 dpi and only re-rendered at 300 dpi when
+Tesseract's mean word confidence is low (``--dpi`` forces a single DPI).
+
+Every page's OCR is stored in the shared OCR cache (``data/ocr_cache.sqlite``,
+see ``Restaurant_Scripts/ocr_cache.py``), keyed by PDF hash, page, DPI and
+Tesseract config, so re-running on the same menu, e.g. after tuning
+``WINE_SECTION_START_RE``, skips rendering and OCR. ``--no-ocr-cache`` disables it.
+
+With ``--two-phase`` a cheap pre-pass (the PDF's text layer, or OCR at 100 dpi
+for pages without one) finds the pages that hold "wines by the glass/bottle"
+sections and the pages they continue on; pages outside them are not read at
+all. The run reports the pages skipped and the time saved. If the pre-pass
+finds no wine section, every page is read as before.
+
+Usage: python extract.py <pdf_url> [--workers 4] [--dpi 300] [--two-phase] [--force-ocr] [--no-ocr-cache]
 """
 
+import argparse
+import os
+import queue
 import re
 import sys
 import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import Dict, List, NamedTuple, Optional, Tuple
 import requests
-from pdf2image import convert_from_path
+from pdf2image import convert_from_path, pdfinfo_from_path
 from PIL import Image
-import pytesseract
 from urllib.parse import urlparse
 
+# The OCR cache and page OCR helper are shared with the main pipeline scripts.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Restaurant_Scripts"))
+import ocr_cache  # noqa: E402
+from script_utils import file_digest  # noqa: E402
+from pdf_text import TESSERACT_CONFIG, ocr_image  # noqa: E402
+
+# One Tesseract thread per page; the parallelism comes from OCRing several pages at once.
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
 # Regular expressions for parsing wine data
 WINE_SECTION_START_RE = re.compile(r"^(wines by the glass|wines by the bottle)", re.I)
 WINE_SECTION_END_RE = re.compile(r"^(beer|cocktails?|spirits?|mocktails|non[- ]?alcoholic|sake|vermouth|liqueur|brandy|whiskey|scotch|tequila|rum|cider)\b", re.I)
 
+# OCR settings
+LOW_DPI = 150
+HIGH_DPI = 300
+MIN_CONFIDENCE = 70.0  # mean word confidence (0-100) below which a page is re-read at HIGH_DPI
+QUEUE_PAGES = 2  # rendered pages waiting for a worker
+PREPASS_DPI = 100  # quick read used by --two-phase to find the wine pages
+
+# looser than WINE_SECTION_START_RE: low-DPI OCR often garbles the start of a line
+WINE_HINT_RE = re.compile(r"wines?\s+by\s+the\s+(glass|bottle)", re.I)
+
 
 def extract_restaurant_name(url: str) -> str:
     """Extract the restaurant name from the URL."""
@@ -41,26 +88,151 @@ def download_pdf(url: str) -> bytes:
     return r.content
 
 
-def pdf_to_images(pdf_bytes: bytes) -> List[Image.Image]:
-    """Convert PDF bytes to a list of images."""
-    print("Converting PDF pages to images…")
-    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp_pdf:
-        tmp_pdf.write(pdf_bytes)
-        tmp_pdf_path = tmp_pdf.name
+class PageOcr(NamedTuple):
+    """OCR result for one page (1-based) at the DPI that was kept."""
+    page: int
+    dpi: int
+    text: str
+    confidences: List[float]
+    seconds: float
+
+    @property
+    def confidence(self) -> float:
+        return sum(self.confidences) / len(self.confidences) if self.confidences else 0.0
+
+
+def render_page(pdf_path: str, page: int, dpi: int) -> Image.Image:
+    """Render a single page (1-based) to an image."""
+    return convert_from_path(pdf_path, dpi=dpi, first_page=page, last_page=page, fmt="png")[0]
+
+
+def read_page(pdf_path: str, pdf_sha: str, page: int, dpi: int,
+              img: Optional[Image.Image] = None) -> PageOcr:
+    """OCR one page at *dpi*; answered from the OCR cache when possible, rendering only on a miss."""
+    start = time.perf_counter()
+    cached = ocr_cache.cache.get(pdf_sha, page, dpi, TESSERACT_CONFIG)
+    if cached is not None:
+        if img is not None:
+            img.close()
+        return PageOcr(page, dpi, cached.text, cached.confidences, time.perf_counter() - start)
+
+    if img is None:
+        img = render_page(pdf_path, page, dpi)
+    try:
+        text, confidences = ocr_image(img)
+    finally:
+        img.close()
+    ocr_cache.cache.put(pdf_sha, page, dpi, TESSERACT_CONFIG, text, confidences)
+    return PageOcr(page, dpi, text, confidences, time.perf_counter() - start)
 
-    images = convert_from_path(tmp_pdf_path, dpi=300, fmt="png")
-    Path(tmp_pdf_path).unlink(missing_ok=True)
-    return images
 
+def ocr_page(pdf_path: str, pdf_sha: str, page: int, img: Optional[Image.Image], dpi: int,
+             adaptive: bool) -> PageOcr:
+    """OCR a page, re-reading it at HIGH_DPI if the first read is not confident."""
+    result = read_page(pdf_path, pdf_sha, page, dpi, img)
+    if adaptive and dpi < HIGH_DPI and result.confidence < MIN_CONFIDENCE:
+        sharper = read_page(pdf_path, pdf_sha, page, HIGH_DPI)
+        seconds = result.seconds + sharper.seconds
+        result = sharper if sharper.confidence >= result.confidence else result
+        result = result._replace(seconds=seconds)
+    return result
 
-def ocr_images(images: List[Image.Image]) -> str:
-    """Perform OCR on the images and return the extracted text."""
-    print("Running OCR with Tesseract… (this may take a moment)")
-    full_text = []
-    for img in images:
-        text = pytesseract.image_to_string(img, config="--psm 6")
-        full_text.append(text)
-    return "\n".join(full_text)
+
+def ocr_pdf(pdf_path: str, workers: int, dpi: Optional[int] = None,
+            pdf_sha: Optional[str] = None, page_numbers: Optional[List[int]] = None) -> List[PageOcr]:
+    """OCR every page (or just *page_numbers*), rendering one page at a time into a bounded queue.
+
+    Pages already in the OCR cache are queued without rendering.
+    """
+    pdf_sha = pdf_sha or file_digest(pdf_path)
+    if page_numbers is None:
+        page_numbers = list(range(1, pdfinfo_from_path(pdf_path)["Pages"] + 1))
+    first_dpi = dpi or LOW_DPI
+    adaptive = dpi is None
+    print(f"Running OCR with Tesseract on {len(page_numbers)} pages at {first_dpi} dpi, {workers} workers…")
+
+    pages: "queue.Queue[Optional[Tuple[int, Optional[Image.Image]]]]" = queue.Queue(maxsize=QUEUE_PAGES)
+    results: Dict[int, PageOcr] = {}
+    errors: List[BaseException] = []
+    stop = threading.Event()
+
+    def produce() -> None:
+        try:
+            for page in page_numbers:
+                if stop.is_set():
+                    break
+                if ocr_cache.cache.has(pdf_sha, page, first_dpi, TESSERACT_CONFIG):
+                    pages.put((page, None))
+                else:
+                    pages.put((page, render_page(pdf_path, page, first_dpi)))
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            for _ in range(workers):
+                pages.put(None)
+
+    def consume() -> None:
+        while True:
+            item = pages.get()
+            if item is None:
+                return
+            page, img = item
+            if stop.is_set():
+                if img is not None:
+                    img.close()
+                continue  # keep draining so the renderer never blocks
+            try:
+                results[page] = ocr_page(pdf_path, pdf_sha, page, img, first_dpi, adaptive)
+            except BaseException as e:
+                errors.append(e)
+                stop.set()
+
+    with ThreadPoolExecutor(max_workers=workers + 1) as pool:
+        pool.submit(produce)
+        for _ in range(workers):
+            pool.submit(consume)
+    if errors:
+        raise errors[0]
+    return [results[page] for page in sorted(results)]
+
+
+def text_layer(pdf_path: str) -> Dict[int, str]:
+    """Usable text layer per page (1-based); pages without one are left out."""
+    try:
+        from pdf_text import text_layer_pages
+        return {i + 1: text for i, text in enumerate(text_layer_pages(pdf_path)) if text}
+    except ImportError:
+        print("PyPDF2 not installed; every page is OCRed.")
+    except Exception as e:
+        print(f"Could not read the PDF text layer ({e}); every page is OCRed.")
+    return {}
+
+
+def prepass(pdf_path: str, pdf_sha: str, workers: int, layer: Dict[int, str], n_pages: int) -> Dict[int, str]:
+    """Cheap text for every page: the PDF's own text layer, else a low-DPI OCR read."""
+    texts = dict(layer)
+    missing = [page for page in range(1, n_pages + 1) if page not in texts]
+    if missing:
+        for result in ocr_pdf(pdf_path, workers, PREPASS_DPI, pdf_sha, missing):
+            texts[result.page] = result.text
+    return texts
+
+
+def wine_pages(page_texts: Dict[int, str]) -> List[int]:
+    """Pages holding part of a wine section: where one starts and the pages it runs on to."""
+    selected: List[int] = []
+    capture = False
+    for page in sorted(page_texts):
+        keep = capture
+        for ln in page_texts[page].splitlines():
+            ln = ln.strip()
+            if WINE_HINT_RE.search(ln):
+                capture = keep = True
+            elif capture and WINE_SECTION_END_RE.match(ln):
+                capture = False
+        if keep:
+            selected.append(page)
+    return selected
 
 
 def extract_wine_lines(raw_text: str) -> List[str]:
@@ -87,12 +259,51 @@ def save_wine_names(wine_lines: List[str], output_path: Path):
     print(f"Wine names saved to {output_path}")
 
 
-def main(url: str):
+def main(url: str, workers: int, dpi: Optional[int] = None, two_phase: bool = False,
+         force_ocr: bool = False):
     """Main function to process the PDF and save wine names."""
     restaurant_name = extract_restaurant_name(url)
     pdf_bytes = download_pdf(url)
-    images = pdf_to_images(pdf_bytes)
-    raw_text = ocr_images(images)
+    pdf_sha = ocr_cache.pdf_digest(pdf_bytes)
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp_pdf:
+        tmp_pdf.write(pdf_bytes)
+        tmp_pdf_path = tmp_pdf.name
+    try:
+        n_pages = pdfinfo_from_path(tmp_pdf_path)["Pages"]
+        layer = {} if force_ocr else text_layer(tmp_pdf_path)
+        selected = list(range(1, n_pages + 1))
+        prepass_seconds = 0.0
+        if two_phase:
+            start = time.perf_counter()
+            texts = prepass(tmp_pdf_path, pdf_sha, workers, layer, n_pages)
+            prepass_seconds = time.perf_counter() - start
+            wine = wine_pages(texts)
+            if wine:
+                selected = wine
+            else:
+                print("Pre-pass found no wine section; reading every page.")
+        to_ocr = [page for page in selected if page not in layer]
+        start = time.perf_counter()
+        pages = ocr_pdf(tmp_pdf_path, workers, dpi, pdf_sha, to_ocr) if to_ocr else []
+    finally:
+        Path(tmp_pdf_path).unlink(missing_ok=True)
+    elapsed = time.perf_counter() - start
+    print(f"Text layer used for {len(selected) - len(to_ocr)} of {len(selected)} pages")
+    if pages:
+        upgraded = sum(1 for p in pages if p.dpi == HIGH_DPI and dpi is None)
+        print(f"OCR finished: {len(pages)} pages in {elapsed:.1f}s "
+              f"({len(pages) / max(elapsed, 1e-9):.2f} pages/s, {upgraded} re-read at {HIGH_DPI} dpi)")
+    if len(selected) < n_pages:
+        skipped = n_pages - len(selected)
+        # only skipped pages without a text layer would have cost OCR time
+        skipped_ocr = sum(1 for page in range(1, n_pages + 1) if page not in selected and page not in layer)
+        saved = (elapsed / len(pages) * skipped_ocr if pages else 0.0) - prepass_seconds
+        print(f"Two-phase: pages {', '.join(map(str, selected))} of {n_pages} hold wine; "
+              f"{skipped} skipped, pre-pass {prepass_seconds:.1f}s, about {saved:.1f}s saved")
+    print(ocr_cache.cache.report())
+    page_texts = {page: layer[page] for page in selected if page in layer}
+    page_texts.update((p.page, p.text) for p in pages)
+    raw_text = "\n".join(page_texts[page] for page in sorted(page_texts))
 
     wine_lines = extract_wine_lines(raw_text)
     if not wine_lines:
@@ -104,7 +315,16 @@ def main(url: str):
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python extract.py <pdf_url>")
-        sys.exit(1)
-    main(sys.argv[1])
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Read a beverage-menu PDF and save its wine lines")
+    parser.add_argument("url", help="URL of the menu PDF")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="pages OCRed at once")
+    parser.add_argument("--dpi", type=int, help=f"render every page at this DPI (default: {LOW_DPI}, "
+                                               f"re-read at {HIGH_DPI} when confidence is low)")
+    parser.add_argument("--two-phase", action="store_true",
+                        help="find the wine pages with a cheap pre-pass and fully OCR only those")
+    parser.add_argument("--force-ocr", action="store_true",
+                        help="OCR every page even when the PDF has a usable text layer")
+    parser.add_argument("--no-ocr-cache", action="store_true", help="always OCR; don't read or write the OCR cache")
+    args = parser.parse_args()
+    ocr_cache.cache.enabled = not args.no_ocr_cache
+    main(args.url, max(1, args.workers), args.dpi, args.two_phase, args.force_ocr)